@@ -0,0 +1,39 @@
+"""denormalized posts.comments_count
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("posts") as batch:
+        batch.add_column(sa.Column("comments_count", sa.Integer(), nullable=False, server_default="0"))
+        batch.create_index("ix_posts_created_at_id", ["created_at", "id"])
+    # backfill from existing comments
+    op.execute(
+        "UPDATE posts SET comments_count = "
+        "(SELECT COUNT(*) FROM comments WHERE comments.post_id = posts.id)"
+    )
+    op.execute("UPDATE posts SET approvals = 0 WHERE approvals IS NULL")
+    op.execute("UPDATE posts SET shares = 0 WHERE shares IS NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("posts") as batch:
+        batch.drop_index("ix_posts_created_at_id")
+        batch.drop_column("comments_count")
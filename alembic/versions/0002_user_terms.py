@@ -0,0 +1,40 @@
+"""user_terms inverted index for skill/location search
+
+Backfill existing profiles afterwards with `python -m app.core.user_index`.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_terms",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("kind", sa.String(16), nullable=False),
+        sa.Column("term", sa.String(200), nullable=False),
+    )
+    op.create_index("ix_user_terms_user_id", "user_terms", ["user_id"])
+    op.create_index("ix_user_terms_kind_term", "user_terms", ["kind", "term", "user_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_user_terms_kind_term", table_name="user_terms")
+    op.drop_index("ix_user_terms_user_id", table_name="user_terms")
+    op.drop_table("user_terms")
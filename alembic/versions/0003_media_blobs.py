@@ -0,0 +1,38 @@
+"""media_blobs reference counts for content-addressed uploads
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "media_blobs",
+        sa.Column("key", sa.String(80), primary_key=True),
+        sa.Column("size", sa.Integer()),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    # collect_garbage() scans for unreferenced rows
+    op.create_index("ix_media_blobs_ref_count_updated_at", "media_blobs", ["ref_count", "updated_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_media_blobs_ref_count_updated_at", table_name="media_blobs")
+    op.drop_table("media_blobs")
@@ -0,0 +1,43 @@
+"""analytics counters and hourly/daily rollups
+
+Rows are backfilled from posts/comments/users by the first
+/analytics/summary call (app.core.analytics.backfill).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 13:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "analytics_counters",
+        sa.Column("metric", sa.String(32), primary_key=True),
+        sa.Column("value", sa.BigInteger(), nullable=False),
+    )
+    op.create_table(
+        "analytics_rollups",
+        sa.Column("granularity", sa.String(8), primary_key=True),
+        sa.Column("metric", sa.String(32), primary_key=True),
+        sa.Column("bucket", sa.DateTime(), primary_key=True),
+        sa.Column("value", sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("analytics_rollups")
+    op.drop_table("analytics_counters")
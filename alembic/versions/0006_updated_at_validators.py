@@ -0,0 +1,41 @@
+"""posts/users.updated_at for ETag and Last-Modified validators
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 15:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("posts") as batch:
+        batch.add_column(sa.Column("updated_at", sa.DateTime(), nullable=True))
+        batch.create_index("ix_posts_updated_at", ["updated_at"])
+    with op.batch_alter_table("users") as batch:
+        batch.add_column(sa.Column("updated_at", sa.DateTime(), nullable=True))
+        batch.create_index("ix_users_updated_at", ["updated_at"])
+    # existing rows start at their creation time
+    op.execute("UPDATE posts SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+    op.execute("UPDATE users SET updated_at = CURRENT_TIMESTAMP")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("users") as batch:
+        batch.drop_index("ix_users_updated_at")
+        batch.drop_column("updated_at")
+    with op.batch_alter_table("posts") as batch:
+        batch.drop_index("ix_posts_updated_at")
+        batch.drop_column("updated_at")
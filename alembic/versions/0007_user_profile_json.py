@@ -0,0 +1,96 @@
+"""users.skills/portfolio/photos/companies as native JSON columns, plus the
+rate/availability/avatar_url profile fields /me already serves
+
+JSON1 text on SQLite, JSONB on Postgres. Columns that already exist as
+json.dumps text are converted in place; values that are not JSON lists
+are cleared rather than failing the migration. The columns this revision
+adds are recorded in ADDED_TABLE, so downgrade drops only those and turns
+pre-existing ones back into Text.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 17:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIST_COLUMNS = ("skills", "portfolio", "photos", "companies")
+PROFILE_COLUMNS = (
+    ("rate", sa.Numeric(10, 2)),
+    ("availability", sa.String(120)),
+    ("avatar_url", sa.String(500)),
+)
+ADDED_TABLE = "alembic_0007_added_columns"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    postgres = bind.dialect.name == "postgresql"
+    json_type = postgresql.JSONB() if postgres else sa.JSON()
+    existing = {c["name"] for c in sa.inspect(bind).get_columns("users")}
+    added = op.create_table(ADDED_TABLE, sa.Column("name", sa.String(64), primary_key=True))
+
+    for name in LIST_COLUMNS:
+        if name not in existing:
+            op.add_column("users", sa.Column(name, json_type, nullable=True))
+            op.bulk_insert(added, [{"name": name}])
+        elif postgres:
+            # only lists were ever written; anything else (blank, comma text) becomes NULL
+            op.execute(
+                f"ALTER TABLE users ALTER COLUMN {name} TYPE JSONB "
+                f"USING CASE WHEN btrim({name}::text) LIKE '[%' THEN {name}::text::jsonb END"
+            )
+        else:
+            # SQLite stores JSON as text already; only the declared type and bad rows change
+            op.execute(
+                f"UPDATE users SET {name} = NULL WHERE {name} IS NOT NULL "
+                f"AND CASE WHEN json_valid({name}) THEN json_type({name}) END IS NOT 'array'"
+            )
+            with op.batch_alter_table("users") as batch:
+                batch.alter_column(name, type_=json_type, existing_nullable=True)
+
+    for name, type_ in PROFILE_COLUMNS:
+        if name not in existing:
+            op.add_column("users", sa.Column(name, type_, nullable=True))
+            op.bulk_insert(added, [{"name": name}])
+
+    if postgres:
+        op.create_index(
+            "ix_users_skills_gin", "users", ["skills"],
+            postgresql_using="gin", postgresql_ops={"skills": "jsonb_path_ops"},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    postgres = bind.dialect.name == "postgresql"
+    if postgres:
+        op.drop_index("ix_users_skills_gin", table_name="users")
+    added = set()
+    if sa.inspect(bind).has_table(ADDED_TABLE):
+        added = set(bind.execute(sa.text(f"SELECT name FROM {ADDED_TABLE}")).scalars())
+        op.drop_table(ADDED_TABLE)
+    with op.batch_alter_table("users") as batch:
+        for name, _ in reversed(PROFILE_COLUMNS):
+            if name in added:
+                batch.drop_column(name)
+        for name in reversed(LIST_COLUMNS):
+            if name in added:
+                batch.drop_column(name)
+            elif postgres:
+                batch.alter_column(name, type_=sa.Text(), existing_nullable=True, postgresql_using=f"{name}::text")
+            else:
+                batch.alter_column(name, type_=sa.Text(), existing_nullable=True)
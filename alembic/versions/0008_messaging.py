@@ -0,0 +1,62 @@
+"""conversations, conversation_members and messages for direct messaging
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 18:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "conversations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("direct_key", sa.String(40), nullable=True, unique=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("last_message_id", sa.Integer(), nullable=True),
+        sa.Column("last_message_at", sa.DateTime(), nullable=True),
+        sa.Column("last_message_preview", sa.String(200), nullable=True),
+        sa.Column("last_sender_id", sa.Integer(), nullable=True),
+    )
+    op.create_table(
+        "conversation_members",
+        sa.Column("conversation_id", sa.Integer(), sa.ForeignKey("conversations.id"), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("peer_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("unread_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_read_message_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_message_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index(
+        "ix_conversation_members_inbox", "conversation_members", ["user_id", "last_message_at", "conversation_id"]
+    )
+    op.create_table(
+        "messages",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("conversation_id", sa.Integer(), sa.ForeignKey("conversations.id"), nullable=False),
+        sa.Column("sender_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_messages_conversation_id_id", "messages", ["conversation_id", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_messages_conversation_id_id", table_name="messages")
+    op.drop_table("messages")
+    op.drop_index("ix_conversation_members_inbox", table_name="conversation_members")
+    op.drop_table("conversation_members")
+    op.drop_table("conversations")
@@ -0,0 +1,60 @@
+"""follow graph, users.followers_count and materialized home timelines
+
+Existing posts are copied into their authors' own timelines; there are no
+follow edges yet, so nothing else needs fanning out.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 19:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, Sequence[str], None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("users") as batch:
+        batch.add_column(sa.Column("followers_count", sa.Integer(), nullable=False, server_default="0"))
+    op.create_index("ix_posts_user_id_created_at_id", "posts", ["user_id", "created_at", "id"])
+    op.create_table(
+        "follows",
+        sa.Column("follower_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("followee_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_follows_followee_id_follower_id", "follows", ["followee_id", "follower_id"])
+    op.create_table(
+        "timeline_entries",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("post_id", sa.Integer(), sa.ForeignKey("posts.id"), primary_key=True),
+        sa.Column("author_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_timeline_entries_user_id_created_at_post_id", "timeline_entries", ["user_id", "created_at", "post_id"]
+    )
+    op.execute(
+        "INSERT INTO timeline_entries (user_id, post_id, author_id, created_at) "
+        "SELECT user_id, id, user_id, COALESCE(created_at, CURRENT_TIMESTAMP) FROM posts"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_timeline_entries_user_id_created_at_post_id", table_name="timeline_entries")
+    op.drop_table("timeline_entries")
+    op.drop_index("ix_follows_followee_id_follower_id", table_name="follows")
+    op.drop_table("follows")
+    op.drop_index("ix_posts_user_id_created_at_id", table_name="posts")
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("followers_count")
@@ -0,0 +1,74 @@
+"""posts.hot_score for the trending feed
+
+Existing posts are scored from their current counters, decayed by age
+(app.core.trending.initial_score), so old popular posts do not start on top.
+The decay clock (analytics_counters "_trending_decayed_at") starts at the
+same instant, so the first `flask decay-trending` ages them from here.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 20:00:00
+
+"""
+import calendar
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, Sequence[str], None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+HALF_LIFE_HOURS = 12.0
+FLOOR = 0.01
+DECAY_CLOCK = "_trending_decayed_at"
+
+
+def _score(approvals, shares, comments, created_at, now):
+    # frozen copy of trending.initial_score at the time of this migration
+    raw = 1.0 + (approvals or 0) + 2.0 * (shares or 0) + 3.0 * (comments or 0)
+    if created_at is None:
+        return 0.0
+    age = max((now - created_at).total_seconds(), 0)
+    score = raw * 0.5 ** (age / (HALF_LIFE_HOURS * 3600.0))
+    return score if score >= FLOOR else 0.0
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("posts") as batch:
+        batch.add_column(sa.Column("hot_score", sa.Float(), nullable=False, server_default="0"))
+        batch.create_index("ix_posts_hot_score_id", ["hot_score", "id"])
+
+    bind = op.get_bind()
+    now = datetime.utcnow()
+    rows = bind.execute(sa.text("SELECT id, approvals, shares, comments_count, created_at FROM posts")).all()
+    params = []
+    for row_id, approvals, shares, comments, created_at in rows:
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        if created_at is not None and created_at.tzinfo is not None:
+            created_at = created_at.replace(tzinfo=None) - created_at.utcoffset()
+        score = _score(approvals, shares, comments, created_at, now)
+        if score:
+            params.append({"id": row_id, "score": score})
+    if params:
+        bind.execute(sa.text("UPDATE posts SET hot_score = :score WHERE id = :id"), params)
+    bind.execute(sa.text("DELETE FROM analytics_counters WHERE metric = :metric"), {"metric": DECAY_CLOCK})
+    bind.execute(
+        sa.text("INSERT INTO analytics_counters (metric, value) VALUES (:metric, :value)"),
+        {"metric": DECAY_CLOCK, "value": calendar.timegm(now.utctimetuple())},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.get_bind().execute(sa.text("DELETE FROM analytics_counters WHERE metric = :metric"), {"metric": DECAY_CLOCK})
+    with op.batch_alter_table("posts") as batch:
+        batch.drop_index("ix_posts_hot_score_id")
+        batch.drop_column("hot_score")
@@ -0,0 +1,63 @@
+"""analytics_counters/analytics_rollups sharded by a `shard` key column
+
+Each logical counter becomes up to app.core.analytics.SHARDS rows that
+writers pick at random and readers sum, so concurrent posts/comments no
+longer queue on one total row and one hour/day row. Existing rows become
+shard 0.
+
+History is no longer backfilled by the first /analytics request; run
+`flask backfill-analytics` once against the primary.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, Sequence[str], None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KEYS = {
+    "analytics_counters": ["metric"],
+    "analytics_rollups": ["granularity", "metric", "bucket"],
+}
+
+
+def _rekey(table, columns):
+    postgres = op.get_bind().dialect.name == "postgresql"
+    with op.batch_alter_table(table, recreate="always" if not postgres else "auto") as batch:
+        if postgres:
+            batch.drop_constraint(f"{table}_pkey", type_="primary")
+        batch.create_primary_key(f"{table}_pkey", columns)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, key in KEYS.items():
+        op.add_column(table, sa.Column("shard", sa.SmallInteger(), nullable=False, server_default="0"))
+        _rekey(table, key + ["shard"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, key in KEYS.items():
+        # fold the shards back into one row per key before dropping the column
+        cols = ", ".join(key)
+        op.execute(
+            f"CREATE TEMPORARY TABLE {table}_folded AS "
+            f"SELECT {cols}, SUM(value) AS value FROM {table} GROUP BY {cols}"
+        )
+        op.execute(f"DELETE FROM {table}")
+        op.execute(f"INSERT INTO {table} ({cols}, value) SELECT {cols}, value FROM {table}_folded")
+        op.execute(f"DROP TABLE {table}_folded")
+        _rekey(table, key)
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("shard")
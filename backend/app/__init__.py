@@ -1,17 +1,27 @@
+import atexit
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from config import Config
+from app.core.replicas import RoutingSession, init_read_replicas
+from app.core.serialization import init_json
+from app.core.metrics import init_metrics
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 jwt = JWTManager()
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    # shared pool sizing; importing app.core.database also installs the SQLite pragmas
+    from app.core.database import engine_options
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config["SQLALCHEMY_DATABASE_URI"]))
 
     # Extensions
+    init_metrics(app)
+    init_json(app)
     db.init_app(app)
     jwt.init_app(app)
     CORS(app)
@@ -19,12 +29,147 @@ def create_app():
     # Register blueprints
     from app.routes.auth import auth_bp
     from app.routes.posts import posts_bp
+    from app.routes.analytics import analytics_bp
+    from app.routes.messages import messages_bp
+    from app.routes.follows import follows_bp
 
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
     app.register_blueprint(posts_bp, url_prefix="/api/posts")
+    app.register_blueprint(analytics_bp, url_prefix="/api/analytics")
+    app.register_blueprint(messages_bp, url_prefix="/api/messages")
+    app.register_blueprint(follows_bp, url_prefix="/api/users")
+
+    init_response_cache(app)
+    init_hub(app)
+    init_counter_buffer(app)
+    init_read_replicas(app, engine_options)
+    init_media_pipeline(app)
 
     @app.route("/")
     def index():
         return {"message": "VSXchangeZA backend running."}
 
-    return app
\ No newline at end of file
+    @app.cli.command("reconcile-counters")
+    def reconcile_counters():
+        """Repair drift in denormalized post counters."""
+        from app.models import Post, Comment
+        from app.core.counters import reconcile_comment_counts
+        fixed = reconcile_comment_counts(db.session, Post, Comment)
+        db.session.commit()
+        click.echo(f"repaired comments_count on {fixed} posts")
+
+    @app.cli.command("backfill-analytics")
+    @click.option("--force", is_flag=True, help="Rebuild even if a backfill already ran.")
+    def backfill_analytics(force):
+        """Rebuild analytics totals and rollups from the source tables (full scan); run once after migrating."""
+        from app.core import analytics
+        from app.routes.analytics import SOURCES
+        done = analytics.backfill(db.session, SOURCES, force=force)
+        click.echo("analytics backfilled" if done else "analytics already backfilled; --force to rebuild")
+
+    @app.cli.command("decay-trending")
+    def decay_trending():
+        """Age trending scores by the time since the last run; cron it every TRENDING_DECAY_INTERVAL_MINUTES."""
+        from app.models import Post
+        from app.core.trending import decay_since_last
+        from app.core.response_cache import invalidate
+        decayed, elapsed = decay_since_last(db.session, Post, app.config["TRENDING_HALF_LIFE_HOURS"])
+        db.session.commit()
+        if decayed:
+            # ?sort=trending pages are cached under the feed tag
+            invalidate("feed")
+        click.echo(f"decayed {decayed} trending scores over {elapsed}s")
+
+    @app.cli.command("trim-timelines")
+    def trim_timelines():
+        """Keep only the newest TIMELINE_MAX_ENTRIES rows of each home timeline."""
+        from app.models import TimelineEntry
+        from app.core.timeline import trim
+        removed = trim(db.session, TimelineEntry, app.config["TIMELINE_MAX_ENTRIES"])
+        db.session.commit()
+        click.echo(f"removed {removed} timeline entries")
+
+    @app.cli.command("purge-uploads")
+    def purge_uploads():
+        """Delete resumable upload sessions older than UPLOAD_SESSION_TTL; cron it hourly."""
+        from app.core.upload_stream import ResumableUploads
+        uploads = ResumableUploads(app.config["UPLOAD_FOLDER"], app.config["MAX_CONTENT_LENGTH"], ttl=app.config["UPLOAD_SESSION_TTL"])
+        removed = uploads.purge_stale()
+        click.echo(f"removed {removed} expired upload sessions")
+
+    @app.cli.command("gc-media")
+    def gc_media():
+        """Delete stored uploads that nothing references any more."""
+        from app.models import MediaBlob
+        from app.core.media_store import collect_garbage
+        from app.routes.posts import media_store
+        removed = collect_garbage(db.session, MediaBlob, media_store)
+        db.session.commit()
+        click.echo(f"removed {removed} unreferenced files")
+
+    return app
+
+
+def init_response_cache(app):
+    """Shared cache for anonymous feed pages; writers invalidate by tag."""
+    from app.core import response_cache
+
+    cache = response_cache.from_config(app.config)
+    app.extensions["response_cache"] = cache
+    return cache
+
+
+def init_hub(app):
+    """Pub/sub hub behind /api/posts/stream; Redis broker when STREAM_BROKER_URL is set."""
+    from app.core import pubsub
+
+    hub = pubsub.from_config(app.config)
+    app.extensions["hub"] = hub
+    hub.start()
+    atexit.register(hub.stop)
+    return hub
+
+
+def init_counter_buffer(app):
+    """Coalesce approval/share clicks and write them in batched transactions."""
+    from app.models import Post
+    from app.core.counters import increment_many
+    from app.core import analytics, trending
+    from app.core.response_cache import invalidate
+    from app.core.pubsub import publish
+    from app.core.write_behind import CounterBuffer
+
+    def flush(batch):
+        with app.app_context():
+            for column, deltas in batch.items():
+                increment_many(db.session, Post, column, deltas)
+                trending.bump_many(db.session, Post, column, deltas)
+            analytics.record(db.session, "approvals", sum(batch.get("approvals", {}).values()))
+            db.session.commit()
+            # one invalidation per flush, not per click
+            post_ids = {post_id for deltas in batch.values() for post_id in deltas}
+            invalidate("feed", *(f"post:{post_id}" for post_id in post_ids))
+            # streams get the new totals, again once per flush
+            rows = db.session.query(Post.id, Post.approvals, Post.shares).filter(Post.id.in_(post_ids)).all()
+            for row_id, approvals, shares in rows:
+                publish("feed", {"type": "post.counters", "id": row_id, "approvals": approvals or 0, "shares": shares or 0})
+
+    buffer = CounterBuffer(
+        flush,
+        interval_ms=app.config["COUNTER_FLUSH_INTERVAL_MS"],
+        max_events=app.config["COUNTER_FLUSH_MAX_EVENTS"],
+    )
+    app.extensions["counter_buffer"] = buffer
+    if app.config["COUNTER_WRITE_BEHIND"]:
+        buffer.start()
+        atexit.register(buffer.stop)
+    return buffer
+
+
+def init_media_pipeline(app):
+    """Worker pool that builds thumbnails/variants after uploads return."""
+    from app.core.media_pipeline import shared_pipeline
+
+    pipeline = shared_pipeline(workers=app.config["MEDIA_WORKERS"], max_pending=app.config["MEDIA_QUEUE_MAX"])
+    app.extensions["media_pipeline"] = pipeline
+    return pipeline
\ No newline at end of file
@@ -0,0 +1,198 @@
+# backend/app/core/analytics.py
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import (
+    BigInteger, Column, DateTime, MetaData, SmallInteger, String, Table,
+    and_, delete, func, insert, literal, select, union_all, update,
+)
+from sqlalchemy.exc import IntegrityError
+
+# Core tables shared by the Flask apps and the FastAPI routers, whichever
+# declarative base their own models use. Created by migrations 0005/0011
+# (main.py: create_all); nothing here issues DDL.
+metadata = MetaData()
+
+# Each logical counter is spread over SHARDS rows so concurrent writers
+# rarely update the same row; readers sum the shards.
+SHARDS = 8
+
+counters = Table(
+    "analytics_counters", metadata,
+    Column("metric", String(32), primary_key=True),
+    Column("shard", SmallInteger, primary_key=True, default=0, server_default="0"),
+    Column("value", BigInteger, nullable=False, default=0),
+)
+
+rollups = Table(
+    "analytics_rollups", metadata,
+    Column("granularity", String(8), primary_key=True),  # "hour" or "day"
+    Column("metric", String(32), primary_key=True),
+    Column("bucket", DateTime, primary_key=True),  # UTC bucket start
+    Column("shard", SmallInteger, primary_key=True, default=0, server_default="0"),
+    Column("value", BigInteger, nullable=False, default=0),
+)
+
+METRICS = ("users", "posts", "comments", "approvals")
+GRANULARITIES = ("hour", "day")
+_BACKFILLED = "_backfilled"
+
+
+def floor(at, granularity):
+    at = at.replace(minute=0, second=0, microsecond=0, tzinfo=None)
+    return at.replace(hour=0) if granularity == "day" else at
+
+
+# -----------------------------
+# Backfill (`flask backfill-analytics`)
+# -----------------------------
+def _recorded(session, metric, source):
+    """
+    What record() has counted for `metric` so far (total and per rollup
+    bucket) plus the `source` aggregate, in one statement so all three come
+    from the same snapshot.
+    """
+    rows = session.execute(union_all(
+        select(literal("total"), literal(None, DateTime), func.coalesce(func.sum(counters.c.value), 0))
+        .where(counters.c.metric == metric),
+        select(literal("source"), literal(None, DateTime), func.coalesce(source, 0)),
+        select(rollups.c.granularity, rollups.c.bucket, func.sum(rollups.c.value))
+        .where(rollups.c.metric == metric).group_by(rollups.c.granularity, rollups.c.bucket),
+    )).all()
+    total, source_value = 0, 0
+    buckets = {g: Counter() for g in GRANULARITIES}
+    for kind, bucket, value in rows:
+        if kind == "total":
+            total = int(value)
+        elif kind == "source":
+            source_value = int(value)
+        else:
+            buckets[kind][bucket] = int(value)
+    return total, source_value, buckets
+
+
+def backfill(session, sources, batch_size=5000, force=False):
+    """
+    Rebuild totals and rollups from the source tables; a no-op once done
+    unless `force`. `sources` maps metric -> model with `id` and
+    `created_at`. Approvals have no per-event rows, so sources["approvals"]
+    is the post model and only its total (sum of posts.approvals) is rebuilt.
+    Counters are corrected, not overwritten: the scan covers rows up to the
+    newest id seen when it starts, and shard 0 gets the difference from
+    what record() had counted at that moment, so events recorded while the
+    scan runs are kept. Full scans: run it from the CLI against the
+    primary, never from a request.
+    """
+    if not force and session.execute(select(counters.c.value).where(counters.c.metric == _BACKFILLED)).first():
+        return False
+
+    for metric, model in sources.items():
+        if metric == "approvals":
+            recorded, total, _ = _recorded(session, metric, select(func.sum(model.approvals)).scalar_subquery())
+            if total != recorded:
+                _bump(session, counters, {"metric": metric, "shard": 0}, total - recorded)
+            continue
+
+        recorded, max_id, recorded_buckets = _recorded(session, metric, select(func.max(model.id)).scalar_subquery())
+        buckets = {g: Counter() for g in GRANULARITIES}
+        total, last_id = 0, 0
+        while last_id < max_id:
+            rows = session.execute(
+                select(model.id, model.created_at)
+                .where(model.id > last_id, model.id <= max_id).order_by(model.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            for row_id, created_at in rows:
+                total += 1
+                if created_at is not None:
+                    for g in GRANULARITIES:
+                        buckets[g][floor(created_at, g)] += 1
+            last_id = rows[-1][0]
+
+        if total != recorded:
+            _bump(session, counters, {"metric": metric, "shard": 0}, total - recorded)
+        for g, counts in buckets.items():
+            for bucket in counts.keys() | recorded_buckets[g].keys():
+                delta = counts[bucket] - recorded_buckets[g][bucket]
+                if delta:
+                    _bump(session, rollups, {"granularity": g, "metric": metric, "bucket": bucket, "shard": 0}, delta)
+
+    session.execute(delete(counters).where(counters.c.metric == _BACKFILLED))
+    session.execute(insert(counters).values(metric=_BACKFILLED, value=1))
+    session.commit()
+    return True
+
+
+# -----------------------------
+# Recording
+# -----------------------------
+def _bump(session, table, key, delta):
+    cond = and_(*(table.c[k] == v for k, v in key.items()))
+    stmt = update(table).where(cond).values(value=table.c.value + delta)
+    if session.execute(stmt).rowcount:
+        return
+    try:
+        with session.begin_nested():
+            session.execute(insert(table).values(**key, value=delta))
+    except IntegrityError:
+        # a concurrent writer created the row first
+        session.execute(stmt)
+
+
+def record(session, metric, delta=1, at=None):
+    """
+    Count `delta` events for `metric` in the caller's transaction: total +
+    hourly + daily bucket, all in one randomly picked shard. Rows are
+    always taken in that order, so two writers never wait on each other
+    in a cycle.
+    """
+    if not delta:
+        return
+    at = at or datetime.utcnow()
+    shard = random.randrange(SHARDS)
+    _bump(session, counters, {"metric": metric, "shard": shard}, delta)
+    for g in GRANULARITIES:
+        _bump(session, rollups, {"granularity": g, "metric": metric, "bucket": floor(at, g), "shard": shard}, delta)
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+def summary(session, now=None):
+    """Totals plus posts in the last 24 hourly buckets: a few primary-key range reads, no table scans."""
+    now = now or datetime.utcnow()
+    totals = {metric: int(value) for metric, value in session.execute(
+        select(counters.c.metric, func.sum(counters.c.value))
+        .where(counters.c.metric.in_(METRICS)).group_by(counters.c.metric)
+    )}
+    last_24h = session.execute(
+        select(func.coalesce(func.sum(rollups.c.value), 0)).where(
+            rollups.c.granularity == "hour",
+            rollups.c.metric == "posts",
+            rollups.c.bucket > floor(now - timedelta(hours=24), "hour"),
+        )
+    ).scalar()
+    return {
+        "users": totals.get("users", 0),
+        "posts": totals.get("posts", 0),
+        "comments": totals.get("comments", 0),
+        "approvals": totals.get("approvals", 0),
+        "posts_last_24h": int(last_24h),
+    }
+
+
+def timeseries(session, metric, granularity="day", since=None, until=None):
+    """[(bucket, value)] for one metric; empty buckets are omitted."""
+    until = until or datetime.utcnow()
+    since = since or until - (timedelta(days=2) if granularity == "hour" else timedelta(days=30))
+    rows = session.execute(
+        select(rollups.c.bucket, func.sum(rollups.c.value)).where(
+            rollups.c.granularity == granularity,
+            rollups.c.metric == metric,
+            rollups.c.bucket >= floor(since, granularity),
+            rollups.c.bucket <= until,
+        ).group_by(rollups.c.bucket).order_by(rollups.c.bucket)
+    ).all()
+    return [(b, int(v)) for b, v in rows]
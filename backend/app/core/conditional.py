@@ -0,0 +1,95 @@
+# backend/app/core/conditional.py
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from sqlalchemy import func, select
+
+
+def weak_etag(*parts):
+    """W/"…" from row versions (ids, updated_at, counters, query args); cheap to compute, no payload needed."""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _utc(dt):
+    if dt is None:
+        return None
+    dt = dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+    return dt.replace(microsecond=0)
+
+
+def http_date(dt):
+    return format_datetime(_utc(dt), usegmt=True) if dt is not None else None
+
+
+def is_not_modified(headers, etag, last_modified=None):
+    """
+    True when the client's cached copy is still current. If-None-Match
+    wins when present (weak comparison, RFC 9110 §13.1.2); otherwise
+    If-Modified-Since is compared at one-second resolution.
+    """
+    inm = headers.get("If-None-Match")
+    if inm:
+        if inm.strip() == "*":
+            return True
+        wanted = etag[2:] if etag.startswith("W/") else etag
+        for tag in inm.split(","):
+            tag = tag.strip()
+            if (tag[2:] if tag.startswith("W/") else tag) == wanted:
+                return True
+        return False
+    ims = headers.get("If-Modified-Since")
+    if ims and last_modified is not None:
+        try:
+            return _utc(last_modified) <= parsedate_to_datetime(ims)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def validator_headers(etag, last_modified=None):
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}  # always revalidate, but reuse on 304
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+# -----------------------------
+# Row versions
+# -----------------------------
+def table_version(session, model):
+    """(max(updated_at), max(id)) — two index lookups that move on any insert or update."""
+    return session.execute(select(func.max(model.updated_at), func.max(model.id))).one()
+
+
+def latest(*stamps):
+    """Newest non-null timestamp, for Last-Modified over several tables."""
+    return max((s for s in stamps if s is not None), default=None)
+
+
+def row_version(session, model, row_id, *columns):
+    """(updated_at, *columns) of one row, or None when it does not exist."""
+    cols = [model.updated_at, *(getattr(model, c) for c in columns)]
+    return session.execute(select(*cols).where(model.id == row_id)).first()
+
+
+# -----------------------------
+# Flask
+# -----------------------------
+def not_modified(etag, last_modified=None):
+    """A 304 for the current Flask request if its validators match, else None."""
+    from flask import current_app, request
+
+    if not is_not_modified(request.headers, etag, last_modified):
+        return None
+    return current_app.response_class(status=304, headers=validator_headers(etag, last_modified))
+
+
+def with_validators(rv, etag, last_modified=None):
+    """Attach ETag/Last-Modified to a Flask view's return value."""
+    from flask import current_app
+
+    response = current_app.make_response(rv)
+    response.headers.update(validator_headers(etag, last_modified))
+    return response
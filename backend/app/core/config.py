@@ -14,15 +14,105 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Connection pool (server databases) and per-connection SQLite pragmas (app.core.database)
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))  # below typical server idle timeouts
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", 64 * 1024))
+
+    # Read replicas: comma-separated URLs that serve GET/HEAD reads. Clients read from the
+    # primary for REPLICA_STICKY_SECONDS after their own write; a failing replica is
+    # skipped for REPLICA_RETRY_SECONDS. Flask writes set the sticky cookie in
+    # init_read_replicas; the FastAPI routers call set_sticky on each write
+    DATABASE_REPLICA_URLS = os.environ.get("DATABASE_REPLICA_URLS", "")
+    REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", 5))
+    REPLICA_RETRY_SECONDS = int(os.environ.get("REPLICA_RETRY_SECONDS", 30))
+
     # JWT
     JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", os.environ.get("SECRET_KEY", "change-me-in-prod"))
 
+    # Password hashing: bounded worker pool; stored hashes below these costs are redone on login
+    BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+    PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt")
+    HASH_WORKERS = int(os.environ.get("HASH_WORKERS", 0)) or None  # None -> half the CPUs
+    HASH_QUEUE_MAX = int(os.environ.get("HASH_QUEUE_MAX", 32))
+
     # Uploads
     UPLOAD_FOLDER = os.environ.get("UPLOAD_FOLDER", str(basedir / "uploads"))
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB max upload size
+    # resumable uploads are refused after this; `flask purge-uploads` deletes their partial files
+    UPLOAD_SESSION_TTL = int(os.environ.get("UPLOAD_SESSION_TTL", 24 * 3600))
+
+    # Media serving: legacy (non content-addressed) files revalidate after MEDIA_MAX_AGE;
+    # MEDIA_ACCEL_REDIRECT (e.g. "/_uploads") hands bodies to an nginx internal location,
+    # USE_X_SENDFILE does the same for Apache/lighttpd
+    MEDIA_MAX_AGE = int(os.environ.get("MEDIA_MAX_AGE", 3600))
+    MEDIA_ACCEL_REDIRECT = os.environ.get("MEDIA_ACCEL_REDIRECT")
+    USE_X_SENDFILE = os.environ.get("USE_X_SENDFILE", "0") == "1"
+
+    # Background thumbnail/variant generation (needs Pillow; pillow-heif for HEIC)
+    MEDIA_WORKERS = int(os.environ.get("MEDIA_WORKERS", 2))
+    MEDIA_QUEUE_MAX = int(os.environ.get("MEDIA_QUEUE_MAX", 256))
+
+    # Response cache for the public feed/post detail: in-process LRU, or Redis when
+    # RESPONSE_CACHE_URL is set. Entries are fresh for TTL seconds, then served stale for
+    # up to STALE_TTL more while one request rebuilds them
+    RESPONSE_CACHE_URL = os.environ.get("RESPONSE_CACHE_URL")
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+    RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", 5))
+    RESPONSE_CACHE_STALE_TTL = int(os.environ.get("RESPONSE_CACHE_STALE_TTL", 30))
+
+    # gzip (or brotli, if installed) for JSON/text responses at least COMPRESS_MIN_SIZE bytes
+    RESPONSE_COMPRESSION = os.environ.get("RESPONSE_COMPRESSION", "1") == "1"
+    COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 1024))
+
+    # Home timelines: authors below TIMELINE_FANOUT_LIMIT followers are copied into each
+    # follower's timeline at post time, bigger ones are merged in at read time;
+    # `flask trim-timelines` caps each timeline at TIMELINE_MAX_ENTRIES rows
+    TIMELINE_FANOUT_LIMIT = int(os.environ.get("TIMELINE_FANOUT_LIMIT", 10000))
+    TIMELINE_BACKFILL_POSTS = int(os.environ.get("TIMELINE_BACKFILL_POSTS", 50))
+    TIMELINE_MAX_ENTRIES = int(os.environ.get("TIMELINE_MAX_ENTRIES", 800))
+
+    # Trending (?sort=trending): engagement score halves every TRENDING_HALF_LIFE_HOURS;
+    # `flask decay-trending` decays by the real time since its last run; cron it every DECAY_INTERVAL minutes
+    TRENDING_HALF_LIFE_HOURS = float(os.environ.get("TRENDING_HALF_LIFE_HOURS", 12))
+    TRENDING_DECAY_INTERVAL_MINUTES = float(os.environ.get("TRENDING_DECAY_INTERVAL_MINUTES", 10))
+
+    # Live updates (/api/posts/stream): per-connection queue of STREAM_QUEUE_SIZE events before
+    # a slow client is told to resync; STREAM_BROKER_URL (Redis) fans out across workers.
+    # An open stream holds its worker thread, so serve it from an async worker:
+    #   gunicorn -k gevent -w 4 'app:create_app()'                  (STREAM_MAX_SUBSCRIBERS per worker)
+    #   gunicorn -k gthread --threads 32 'app:create_app()'  with WEB_THREADS=32
+    # On gthread at most WEB_THREADS - STREAM_RESERVED_THREADS streams are held per worker;
+    # the default sync worker (WEB_THREADS=1) answers /posts/stream with 503
+    STREAM_BROKER_URL = os.environ.get("STREAM_BROKER_URL")
+    STREAM_QUEUE_SIZE = int(os.environ.get("STREAM_QUEUE_SIZE", 100))
+    STREAM_MAX_SUBSCRIBERS = int(os.environ.get("STREAM_MAX_SUBSCRIBERS", 1000))
+    WEB_THREADS = int(os.environ.get("WEB_THREADS", 1))
+    STREAM_RESERVED_THREADS = int(os.environ.get("STREAM_RESERVED_THREADS", 4))
+    STREAM_HEARTBEAT_SECONDS = int(os.environ.get("STREAM_HEARTBEAT_SECONDS", 15))
+    STREAM_MAX_SECONDS = int(os.environ.get("STREAM_MAX_SECONDS", 300))
+
+    # Instrumentation: /metrics (Prometheus text) and Server-Timing on every response;
+    # ?__profile=1 with an X-Profile-Token matching PROFILE_TOKEN writes folded stacks
+    # (flamegraph.pl / speedscope) to PROFILE_DIR. Profiling is off while PROFILE_TOKEN is unset
+    PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN")
+    PROFILE_DIR = os.environ.get("PROFILE_DIR", str(basedir / "profiles"))
+    PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", 1))
 
     # Cloudinary (optional) - use CLOUDINARY_URL or set CLOUDINARY_CLOUD_NAME, API_KEY, API_SECRET
     CLOUDINARY_URL = os.environ.get("CLOUDINARY_URL")
 
+    # Write-behind buffer for approval/share counters
+    COUNTER_WRITE_BEHIND = os.environ.get("COUNTER_WRITE_BEHIND", "1") == "1"
+    COUNTER_FLUSH_INTERVAL_MS = int(os.environ.get("COUNTER_FLUSH_INTERVAL_MS", 250))
+    COUNTER_FLUSH_MAX_EVENTS = int(os.environ.get("COUNTER_FLUSH_MAX_EVENTS", 500))
+
     # Other
-    ALLOWED_IMAGE_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp"}
\ No newline at end of file
+    ALLOWED_IMAGE_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp", "heic", "heif"}
+
+# Module-level names used by the FastAPI routers
+UPLOAD_DIR = Config.UPLOAD_FOLDER
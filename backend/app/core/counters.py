@@ -0,0 +1,64 @@
+# backend/app/core/counters.py
+from sqlalchemy import bindparam, func, select, update
+
+
+# -----------------------------
+# Atomic increments
+# -----------------------------
+def increment(session, model, row_id, column, delta=1):
+    """
+    Add `delta` to `column` in a single UPDATE (col = col + delta), so
+    concurrent writers never overwrite each other's counts.
+    Returns the new value, or None when the row does not exist.
+    """
+    table = model.__table__
+    col = table.c[column]
+    stmt = update(table).where(table.c.id == row_id).values({column: func.coalesce(col, 0) + delta})
+
+    if getattr(session.get_bind().dialect, "update_returning", False):
+        return session.execute(stmt.returning(col)).scalar()
+
+    result = session.execute(stmt)
+    if result.rowcount == 0:
+        return None
+    return session.execute(select(col).where(table.c.id == row_id)).scalar()
+
+
+def increment_many(session, model, column, deltas):
+    """Apply {row_id: delta} to `column` inside the caller's transaction."""
+    table = model.__table__
+    col = table.c[column]
+    stmt = update(table).where(table.c.id == bindparam("row_id")).values({column: func.coalesce(col, 0) + bindparam("delta")})
+    params = [{"row_id": row_id, "delta": delta} for row_id, delta in deltas.items() if delta]
+    if params:
+        # one executemany round trip for the whole batch
+        session.execute(stmt, params)
+    return len(params)
+
+
+# -----------------------------
+# Reconciliation
+# -----------------------------
+def reconcile_comment_counts(session, post_model, comment_model):
+    """
+    Repair drift in posts.comments_count against the comments table with a
+    single correlated UPDATE. Only rows whose stored count is wrong are
+    rewritten. Returns the number of posts fixed.
+    """
+    posts = post_model.__table__
+    comments = comment_model.__table__
+    actual = (
+        select(func.count(comments.c.id))
+        .where(comments.c.post_id == posts.c.id)
+        .scalar_subquery()
+    )
+    result = session.execute(
+        update(posts)
+        .where(func.coalesce(posts.c.comments_count, -1) != actual)
+        .values(comments_count=actual)
+    )
+    # approvals/shares have no source table to recount from; just clear NULLs
+    for column in ("approvals", "shares"):
+        if column in posts.c:
+            session.execute(update(posts).where(posts.c[column].is_(None)).values({column: 0}))
+    return result.rowcount
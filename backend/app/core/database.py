@@ -1,25 +1,122 @@
 # backend/app/core/database.py
-from sqlalchemy import create_engine
+import sqlite3
+
+try:
+    from fastapi import Request
+except ImportError:  # Flask-only deployments import this module for engine_options
+    Request = None
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from app.core.replicas import ReplicaSet, is_sticky
 from config import Config  # Import your unified configuration
 
 # Use SQLAlchemy connection string from Config class
 DATABASE_URL = Config.SQLALCHEMY_DATABASE_URI
 
-# For SQLite, allow multi-thread access
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+
+def engine_options(url, config=Config):
+    """
+    create_engine() keyword arguments for `url`. Also used as
+    SQLALCHEMY_ENGINE_OPTIONS by the Flask apps so every stack shares
+    one pool policy.
+    """
+    if url.startswith("sqlite"):
+        # allow multi-thread access; sqlite3's own timeout backs up busy_timeout
+        return {"connect_args": {"check_same_thread": False, "timeout": config.SQLITE_BUSY_TIMEOUT_MS / 1000}}
+    return {
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+
+@event.listens_for(Engine, "connect")
+def _sqlite_pragmas(dbapi_conn, _record):
+    """
+    Per-connection SQLite tuning. WAL lets feed reads proceed while a
+    comment insert holds the write lock; NORMAL sync is durable across
+    app crashes in WAL mode and skips an fsync per commit.
+    """
+    # sqlite3 directly, or aiosqlite's adapter (sync facade) on the async engine
+    if not isinstance(dbapi_conn, sqlite3.Connection) and "aiosqlite" not in type(dbapi_conn).__module__:
+        return
+    cur = dbapi_conn.cursor()
+    try:
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+        cur.execute(f"PRAGMA busy_timeout={int(Config.SQLITE_BUSY_TIMEOUT_MS)}")
+        cur.execute(f"PRAGMA mmap_size={int(Config.SQLITE_MMAP_SIZE)}")
+        cur.execute(f"PRAGMA cache_size=-{int(Config.SQLITE_CACHE_SIZE_KB)}")  # negative = KiB
+        cur.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cur.close()
+
+
+def async_url(url):
+    """Same database through an asyncio driver: aiosqlite for SQLite, asyncpg for Postgres."""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    for prefix in ("postgresql://", "postgres://", "postgresql+psycopg2://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
+def pool_stats(engine):
+    """Snapshot of the connection pool, for metrics endpoints."""
+    pool = getattr(engine, "sync_engine", engine).pool
+    stats = {"class": type(pool).__name__, "status": pool.status()}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, name, None)
+        if callable(fn):
+            stats[name] = fn()
+    return stats
+
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+REPLICA_URLS = [u.strip() for u in Config.DATABASE_REPLICA_URLS.split(",") if u.strip()]
+
+# -----------------------------
+# Async path for the FastAPI routers
+# -----------------------------
+# Same database, pool policy and pragmas as `engine`, driven by aiosqlite/asyncpg so
+# handlers await queries instead of tying up a threadpool slot per request.
+async_engine = create_async_engine(async_url(DATABASE_URL), **engine_options(DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+async_replicas = ReplicaSet(
+    [async_url(u) for u in REPLICA_URLS],
+    options=lambda url: engine_options(url.replace("+aiosqlite", "").replace("+asyncpg", "")),
+    retry_seconds=Config.REPLICA_RETRY_SECONDS,
+    factory=create_async_engine,
+)
+
 def get_db():
     """Dependency that provides a database session and closes it automatically."""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """
+    AsyncSession dependency. Reuse sync helpers (analytics, user_index,
+    fts, principals) through `await db.run_sync(fn, ...)`.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db(request: Request):
+    """get_async_db on a healthy replica unless the client has written recently."""
+    replica = None if is_sticky(request.cookies) else async_replicas.pick()
+    async with (AsyncSessionLocal(bind=replica) if replica is not None else AsyncSessionLocal()) as db:
+        yield db
@@ -0,0 +1,178 @@
+# backend/app/core/fts.py
+"""
+Full-text search over posts, comments and profiles.
+
+SQLite uses external-content FTS5 tables kept current by triggers;
+Postgres uses generated tsvector columns with GIN indexes. Either way
+the index is updated incrementally by the database on every write.
+Migration 0012 installs and backfills it; `python -m app.core.fts` does
+the same for a database outside alembic. search() never runs DDL, since
+it is served from read replicas.
+"""
+import html
+import re
+
+from sqlalchemy import text
+
+# kind -> (table, indexed columns)
+SOURCES = {
+    "posts": ("posts", ("text",)),
+    "comments": ("comments", ("text",)),
+    "users": ("users", ("first_name", "last_name", "bio")),
+}
+
+MARK_START, MARK_END = "<mark>", "</mark>"
+# private-use sentinels the database wraps matches in; swapped for the
+# <mark> tags only after the snippet text has been HTML-escaped
+_HL_START, _HL_END = "\ue000", "\ue001"
+RRF_K = 60  # reciprocal-rank-fusion damping; the usual constant
+MAX_WINDOW = 1000  # deepest hit (offset + limit) served across kinds
+
+
+# -----------------------------
+# Installation
+# -----------------------------
+def _sqlite_ddl(table, columns):
+    fts = f"{table}_fts"
+    cols = ", ".join(columns)
+    new_vals = ", ".join(f"new.{c}" for c in columns)
+    old_vals = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); END",
+        # only re-index when an indexed column changes, not on counter updates
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_vals}); END",
+    ]
+
+
+def _postgres_ddl(table, columns):
+    doc = " || ' ' || ".join(f"coalesce({c}, '')" for c in columns)
+    return [
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_tsv tsvector "
+        f"GENERATED ALWAYS AS (to_tsvector('simple', {doc})) STORED",
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_search_tsv ON {table} USING GIN (search_tsv)",
+    ]
+
+
+def install(engine):
+    """Create the search indexes for every source (idempotent)."""
+    dialect = engine.dialect.name
+    with engine.begin() as conn:
+        for table, columns in SOURCES.values():
+            if dialect == "sqlite":
+                fresh = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :n"),
+                    {"n": f"{table}_fts"},
+                ).first() is None
+                for stmt in _sqlite_ddl(table, columns):
+                    conn.execute(text(stmt))
+                if fresh:
+                    conn.execute(text(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')"))
+            elif dialect == "postgresql":
+                for stmt in _postgres_ddl(table, columns):
+                    conn.execute(text(stmt))
+            else:
+                raise RuntimeError(f"full-text search is not supported on {dialect}")
+
+
+# -----------------------------
+# Query building
+# -----------------------------
+def _tokens(q):
+    return re.findall(r"\w+", (q or "").lower())[:16]
+
+
+def fts5_query(q):
+    """'web des' -> '"web"* "des"*' (every word must match, each as a prefix)."""
+    return " ".join(f'"{t}"*' for t in _tokens(q))
+
+
+def tsquery(q):
+    """'web des' -> 'web:* & des:*'."""
+    return " & ".join(f"{t}:*" for t in _tokens(q))
+
+
+def _sqlite_sql(kind, table):
+    fts = f"{table}_fts"
+    where = f"{fts} MATCH :q"
+    if kind == "users":
+        where += " AND coalesce(t.discoverable, 1) = 1"
+    return (
+        f"SELECT t.id AS id, snippet({fts}, -1, :ms, :me, '…', 12) AS snippet, bm25({fts}) AS score "
+        f"FROM {fts} JOIN {table} t ON t.id = {fts}.rowid "
+        f"WHERE {where} ORDER BY score LIMIT :limit OFFSET :offset"
+    )
+
+
+def _postgres_sql(kind, table):
+    columns = SOURCES[kind][1]
+    doc = " || ' ' || ".join(f"coalesce(t.{c}, '')" for c in columns)
+    where = "t.search_tsv @@ query"
+    if kind == "users":
+        where += " AND t.discoverable IS NOT FALSE"
+    return (
+        f"SELECT t.id AS id, "
+        f"ts_headline('simple', {doc}, query, 'StartSel=' || :ms || ', StopSel=' || :me || ', MaxWords=24') AS snippet, "
+        f"-ts_rank(t.search_tsv, query) AS score "
+        f"FROM {table} t, to_tsquery('simple', :q) query "
+        f"WHERE {where} ORDER BY score LIMIT :limit OFFSET :offset"
+    )
+
+
+# -----------------------------
+# Search
+# -----------------------------
+def _highlight(snippet):
+    """Escape the stored text, then turn the match sentinels into <mark> tags."""
+    text_ = html.escape(snippet or "", quote=False)
+    return text_.replace(_HL_START, MARK_START).replace(_HL_END, MARK_END)
+
+
+def search(db, q, kinds=None, limit=20, offset=0):
+    """
+    Ranked hits for `q` across the requested kinds (posts, comments, users).
+    Each hit is {"type", "id", "snippet", "score"}, best first; snippets
+    are HTML-escaped text with matches in <mark>.
+
+    bm25/ts_rank values from different tables are not on one scale, so
+    kinds are merged by rank instead (reciprocal rank fusion): "score" is
+    1/(RRF_K + position within its kind). Every kind is read from its
+    first hit to offset + limit and the merged list is sliced, so pages
+    neither skip nor repeat hits.
+    """
+    dialect = db.get_bind().dialect.name
+    query = fts5_query(q) if dialect == "sqlite" else tsquery(q)
+    if not query:
+        return []
+
+    window = min(offset + limit, MAX_WINDOW)
+    if offset >= window:
+        return []
+
+    hits = []
+    for order, kind in enumerate(kinds or SOURCES):
+        table = SOURCES[kind][0]
+        sql = _sqlite_sql(kind, table) if dialect == "sqlite" else _postgres_sql(kind, table)
+        rows = db.execute(text(sql), {
+            "q": query, "ms": _HL_START, "me": _HL_END, "limit": window, "offset": 0,
+        }).all()
+        hits.extend(
+            (1.0 / (RRF_K + rank), -order, {"type": kind, "id": r.id, "snippet": _highlight(r.snippet)})
+            for rank, r in enumerate(rows, start=1)
+        )
+
+    # ties (same position in two kinds) go to the kind listed first
+    hits.sort(key=lambda h: h[:2], reverse=True)
+    return [dict(hit, score=round(score, 6)) for score, _, hit in hits[offset:window]]
+
+
+if __name__ == "__main__":
+    from app.core.database import engine
+    install(engine)
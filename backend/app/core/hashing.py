@@ -0,0 +1,121 @@
+# backend/app/core/hashing.py
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing pool's queue is full; map to 503 + Retry-After."""
+    retry_after = 1
+
+
+class HashPool:
+    """
+    Dedicated, size-bounded pool for password hashing.
+
+    bcrypt and hashlib's pbkdf2/scrypt release the GIL, so a few threads
+    are enough to use the cores we allow while request workers stay free.
+    At most `workers + max_queue` hashes are in flight; anything beyond
+    that fails fast with HasherBusy instead of piling up behind a login
+    burst and starving other endpoints.
+
+    `backend` supplies hash(password) and verify_and_update(password, hash)
+    -> (ok, new_hash_or_None); see PasslibBackend / WerkzeugBackend.
+    """
+
+    def __init__(self, backend, workers=None, max_queue=32, timeout=10.0):
+        self.backend = backend
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwhash")
+        self._slots = threading.BoundedSemaphore(self.workers + max_queue)
+        self._lock = threading.Lock()
+        self.stats = {"in_flight": 0, "completed": 0, "rejected": 0}
+
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats["rejected"] += 1
+            raise HasherBusy()
+        with self._lock:
+            self.stats["in_flight"] += 1
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, _future):
+        with self._lock:
+            self.stats["in_flight"] -= 1
+            self.stats["completed"] += 1
+        self._slots.release()
+
+    def _wait(self, future):
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise HasherBusy()
+
+    # blocking API, for sync Flask/FastAPI handlers
+    def hash(self, password):
+        return self._wait(self._submit(self.backend.hash, password))
+
+    def verify_and_update(self, password, hashed):
+        """(ok, new_hash) — new_hash is set when the stored hash uses outdated cost parameters."""
+        return self._wait(self._submit(self.backend.verify_and_update, password, hashed))
+
+    # async API, for `async def` handlers
+    async def hash_async(self, password):
+        return await asyncio.wait_for(asyncio.wrap_future(self._submit(self.backend.hash, password)), self.timeout)
+
+    async def verify_and_update_async(self, password, hashed):
+        future = self._submit(self.backend.verify_and_update, password, hashed)
+        return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+class PasslibBackend:
+    """bcrypt via passlib; hashes below `rounds` are upgraded on the next login."""
+
+    def __init__(self, rounds=12):
+        from passlib.context import CryptContext
+        self.context = CryptContext(
+            schemes=["bcrypt"], deprecated="auto",
+            bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds,
+        )
+
+    def hash(self, password):
+        return self.context.hash(password)
+
+    def verify_and_update(self, password, hashed):
+        try:
+            return self.context.verify_and_update(password, hashed)
+        except (ValueError, TypeError):
+            return False, None
+
+
+class WerkzeugBackend:
+    """werkzeug pbkdf2/scrypt; hashes made with a different method string are redone on login."""
+
+    def __init__(self, method="scrypt"):
+        from werkzeug.security import generate_password_hash, check_password_hash
+        self._generate = generate_password_hash
+        self._check = check_password_hash
+        self.method = method
+        # e.g. "scrypt:32768:8:1" — the part of a hash that encodes its cost
+        self.prefix = generate_password_hash("", method).split("$", 1)[0]
+
+    def hash(self, password):
+        return self._generate(password, self.method)
+
+    def verify_and_update(self, password, hashed):
+        if not hashed or not self._check(hashed, password):
+            return False, None
+        if hashed.split("$", 1)[0] != self.prefix:
+            return True, self._generate(password, self.method)
+        return True, None
@@ -0,0 +1,181 @@
+# backend/app/core/media_pipeline.py
+import atexit
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Optional image stack: Pillow for resizing, pillow-heif for iPhone HEIC originals
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except Exception:
+    PIL_AVAILABLE = False
+
+try:
+    import pillow_heif
+    pillow_heif.register_heif_opener()
+    HEIF_AVAILABLE = True
+except Exception:
+    HEIF_AVAILABLE = False
+
+log = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (320, 640, 1280)
+THUMB_SIZE = 160
+IMAGE_EXTS = {"png", "jpg", "jpeg", "gif", "webp", "heic", "heif"}
+HEIC_EXTS = {"heic", "heif"}
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+
+def variants_dir(root, digest):
+    return Path(root) / "variants" / digest
+
+
+def processable(rel_path):
+    """True when process_image() can build variants for this file."""
+    ext = rel_path.rsplit(".", 1)[-1].lower()
+    return ext in IMAGE_EXTS and (ext not in HEIC_EXTS or HEIF_AVAILABLE)
+
+
+def _save_pair(im, out_dir, stem):
+    """Write `stem`.webp and `stem`.jpg; no exif= argument, so metadata is dropped."""
+    im.save(out_dir / f"{stem}.webp", "WEBP", quality=WEBP_QUALITY, method=4)
+    rgb = im if im.mode == "RGB" else im.convert("RGB")
+    rgb.save(out_dir / f"{stem}.jpg", "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    base = f"/uploads/variants/{out_dir.name}/{stem}"
+    return {"webp": f"{base}.webp", "jpeg": f"{base}.jpg"}
+
+
+def process_image(root, rel_path, digest):
+    """
+    Build thumbnail + width variants for one stored image and return the
+    manifest recorded on the owning row. Output lives in
+    variants/<digest>/, so identical uploads are processed only once.
+    Returns None for files that are not images. An image Pillow cannot
+    decode gets a manifest holding only "error", so clients polling for
+    it stop, and the exception propagates.
+    """
+    if not processable(rel_path):
+        return None
+    ext = rel_path.rsplit(".", 1)[-1].lower()
+
+    out_dir = variants_dir(root, digest)
+    manifest_path = out_dir / "manifest.json"
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+        return None if "error" in manifest else manifest
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        manifest = _build_variants(Path(root) / rel_path, out_dir, ext)
+    except Exception:
+        _write_manifest(manifest_path, {"error": "unreadable image"})
+        raise
+    _write_manifest(manifest_path, manifest)
+    return manifest
+
+
+def _write_manifest(manifest_path, manifest):
+    tmp = manifest_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest))
+    os.replace(tmp, manifest_path)
+
+
+def _build_variants(path, out_dir, ext):
+    with Image.open(path) as src:
+        src.seek(0)  # first frame of animated gif/webp
+        # bake EXIF orientation into the pixels before the metadata is discarded
+        im = ImageOps.exif_transpose(src)
+        if im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA" if "A" in im.getbands() else "RGB")
+
+        manifest = {"width": im.width, "height": im.height, "sizes": {}}
+        manifest["thumb"] = _save_pair(ImageOps.fit(im, (THUMB_SIZE, THUMB_SIZE)), out_dir, "thumb")
+        for width in VARIANT_WIDTHS:
+            if width >= im.width and width != VARIANT_WIDTHS[0]:
+                break
+            resized = im.copy()
+            resized.thumbnail((width, width * 10), Image.LANCZOS)
+            manifest["sizes"][str(width)] = _save_pair(resized, out_dir, f"w{width}")
+        if ext in HEIC_EXTS:
+            # browsers can't show HEIC; keep a full-size transcode as the display original
+            manifest["original"] = _save_pair(im, out_dir, "full")
+    return manifest
+
+
+class MediaPipeline:
+    """
+    Bounded worker pool for variant generation. Upload handlers submit a
+    job once the original is on disk and return immediately; `on_done`
+    receives the manifest from a worker thread (it must open its own
+    app context / DB session). Jobs beyond `max_pending` are dropped with
+    a warning rather than queueing without limit. A job's files live
+    under `root` (per submit, or the pipeline's default). submit() returns
+    False when no manifest will be written: videos, HEIC without
+    pillow-heif, no Pillow, or a full queue.
+    """
+
+    def __init__(self, root=None, workers=2, max_pending=256):
+        self.root = Path(root) if root is not None else None
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="media")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "dropped": 0}
+
+    @property
+    def enabled(self):
+        return PIL_AVAILABLE
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def submit(self, rel_path, digest, on_done=None, root=None):
+        root = Path(root) if root is not None else self.root
+        if not PIL_AVAILABLE or root is None or not processable(rel_path):
+            return False
+        if not self._slots.acquire(blocking=False):
+            log.warning("media queue full; skipping variants for %s", rel_path)
+            self._count("dropped")
+            return False
+        self._count("submitted")
+        future = self._pool.submit(process_image, root, rel_path, digest)
+        future.add_done_callback(lambda f: self._finish(f, rel_path, on_done))
+        return True
+
+    def _finish(self, future, rel_path, on_done):
+        self._slots.release()
+        try:
+            manifest = future.result()
+            if manifest is not None and on_done is not None:
+                on_done(manifest)
+            self._count("completed")
+        except Exception:
+            log.exception("media processing failed for %s", rel_path)
+            self._count("failed")
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_pipeline(workers=2, max_pending=256):
+    """
+    The process's one pipeline. The Flask apps and the upload router all
+    submit here, so MEDIA_WORKERS and MEDIA_QUEUE_MAX bound the process
+    as a whole; the first caller's sizes win. Callers pass their upload
+    root with each job.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = MediaPipeline(workers=workers, max_pending=max_pending)
+            atexit.register(_shared.shutdown)
+        return _shared
@@ -0,0 +1,59 @@
+# backend/app/core/media_serving.py
+import mimetypes
+import os
+import re
+
+from flask import Response, abort, current_app, send_file
+from werkzeug.security import safe_join
+
+from app.core.media_store import key_from_url, digest_of
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+_VARIANT_RE = re.compile(r"^variants/([0-9a-f]{64})/([\w.-]+)$")
+
+
+def _content_etag(filename):
+    """Strong ETag from the content hash in the name, or None for legacy names."""
+    key = key_from_url(filename)
+    if key:
+        return digest_of(key)
+    m = _VARIANT_RE.match(filename)
+    if m:
+        return f"{m.group(1)}-{m.group(2)}"
+    return None
+
+
+def serve_upload(directory, filename):
+    """
+    Serve a file from the upload folder.
+
+    Content-addressed files (ab/cd/<sha256>.ext and variants/<sha256>/…)
+    never change, so they get a year-long immutable Cache-Control and
+    their hash as a strong ETag. Other files revalidate after
+    MEDIA_MAX_AGE. Conditional requests (If-None-Match/If-Modified-Since
+    -> 304) and byte Range requests (206, for video seeking) are handled
+    by send_file. The body goes out through the server's wsgi.file_wrapper
+    (sendfile on gunicorn), via X-Sendfile when USE_X_SENDFILE is set, or
+    is handed to nginx entirely when MEDIA_ACCEL_REDIRECT names an
+    internal location.
+    """
+    path = safe_join(directory, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    etag = _content_etag(filename)
+    max_age = IMMUTABLE_MAX_AGE if etag else current_app.config.get("MEDIA_MAX_AGE", 3600)
+
+    accel = current_app.config.get("MEDIA_ACCEL_REDIRECT")
+    if accel:
+        # nginx serves the bytes (and Range/304) from its internal location
+        resp = Response(mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream")
+        resp.headers["X-Accel-Redirect"] = f"{accel.rstrip('/')}/{filename}"
+    else:
+        resp = send_file(path, conditional=True, etag=etag or True, max_age=max_age)
+
+    resp.cache_control.public = True
+    resp.cache_control.max_age = max_age
+    if etag:
+        resp.cache_control.immutable = True
+    return resp
@@ -0,0 +1,161 @@
+# backend/app/core/media_store.py
+import hashlib
+import os
+import re
+import shutil
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+CHUNK_SIZE = 1024 * 1024
+GC_GRACE_SECONDS = 3600  # unreferenced blobs survive this long before collection
+
+# uploads/ab/cd/<sha256>.<ext>
+_KEY_RE = re.compile(r"^([0-9a-f]{2})/([0-9a-f]{2})/([0-9a-f]{64})\.([a-z0-9]{1,8})$")
+
+
+def key_from_url(url):
+    """'/uploads/ab/cd/<sha256>.jpg' (or a full URL) -> 'ab/cd/<sha256>.jpg'; None for legacy names."""
+    if not url:
+        return None
+    _, sep, tail = url.partition("/uploads/")
+    key = tail if sep else url
+    return key if _KEY_RE.match(key) else None
+
+
+def digest_of(key):
+    return key.rsplit("/", 1)[-1].split(".", 1)[0]
+
+
+class MediaStore:
+    """
+    Content-addressed file store: every file is named by the sha256 of its
+    bytes and sharded two levels deep, so identical uploads share one file.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def key_for(self, digest, ext):
+        return f"{digest[:2]}/{digest[2:4]}/{digest}.{ext.lower()}"
+
+    def path_for(self, key):
+        return self.root / key
+
+    def save(self, fileobj, ext):
+        """
+        Store a seekable file object. The content is hashed first and only
+        written when no identical file exists yet; an existing file is
+        touched instead, which tells collect_garbage() it is in use again.
+        Returns (key, size, created).
+        """
+        hasher = hashlib.sha256()
+        size = 0
+        fileobj.seek(0)
+        for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+            size += len(chunk)
+
+        key = self.key_for(hasher.hexdigest(), ext)
+        path = self.path_for(key)
+        if path.exists():
+            try:
+                os.utime(path)
+                return key, size, False
+            except FileNotFoundError:
+                pass  # collected between the check and the touch; write it again
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{uuid.uuid4().hex}.tmp")
+        fileobj.seek(0)
+        try:
+            with open(tmp, "wb") as out:
+                shutil.copyfileobj(fileobj, out, CHUNK_SIZE)
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return key, size, True
+
+    def remove(self, key, older_than=None):
+        """Delete a file and its variants; with `older_than`, only if its mtime is older. True when removed."""
+        path = self.path_for(key)
+        if older_than is not None:
+            try:
+                if path.stat().st_mtime >= older_than:
+                    return False
+            except FileNotFoundError:
+                pass
+        path.unlink(missing_ok=True)
+        # thumbnails/widths generated by app.core.media_pipeline
+        shutil.rmtree(self.root / "variants" / digest_of(key), ignore_errors=True)
+        return True
+
+    def iter_keys(self):
+        for path in self.root.glob("??/??/*"):
+            key = path.relative_to(self.root).as_posix()
+            if _KEY_RE.match(key):
+                yield key, path
+
+
+# -----------------------------
+# Reference counts
+# -----------------------------
+def acquire(session, blob_model, key, size=None):
+    """Add one reference to `key`, creating its row on first use. Caller commits."""
+    table = blob_model.__table__
+    now = datetime.utcnow()
+    bump = update(table).where(table.c.key == key).values(ref_count=table.c.ref_count + 1, updated_at=now)
+    if session.execute(bump).rowcount:
+        return
+    try:
+        with session.begin_nested():
+            session.execute(insert(table).values(key=key, size=size, ref_count=1, created_at=now, updated_at=now))
+    except IntegrityError:
+        # another request inserted the row first
+        session.execute(bump)
+
+
+def release(session, blob_model, key):
+    """Drop one reference; the file is reclaimed later by collect_garbage()."""
+    if not key:
+        return
+    table = blob_model.__table__
+    session.execute(
+        update(table).where(table.c.key == key, table.c.ref_count > 0)
+        .values(ref_count=table.c.ref_count - 1, updated_at=datetime.utcnow())
+    )
+
+
+def collect_garbage(session, blob_model, store, grace_seconds=GC_GRACE_SECONDS):
+    """
+    Delete blobs nobody references (after a grace period) and files on disk
+    with no row at all, e.g. left behind by a crashed request.
+    Returns the number of files removed.
+    """
+    table = blob_model.__table__
+    cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    file_cutoff = time.time() - grace_seconds
+    removed = 0
+
+    stale = session.execute(
+        select(table.c.key).where(table.c.ref_count <= 0, table.c.updated_at < cutoff)
+    ).scalars().all()
+    for key in stale:
+        # conditional delete: skip rows re-acquired since the select
+        gone = session.execute(delete(table).where(table.c.key == key, table.c.ref_count <= 0)).rowcount
+        # unlink before the delete commits, and skip files a save() touched
+        # since the cutoff: that upload is about to acquire a fresh row
+        if gone and store.remove(key, older_than=file_cutoff):
+            removed += 1
+        session.commit()
+
+    known = set(session.execute(select(table.c.key)).scalars())
+    for key, path in store.iter_keys():
+        if key not in known and store.remove(key, older_than=file_cutoff):
+            removed += 1
+    return removed
@@ -0,0 +1,195 @@
+# backend/app/core/messaging.py
+from datetime import datetime
+
+from sqlalchemy import and_, bindparam, case, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.pagination import encode_cursor, decode_cursor, DEFAULT_LIMIT
+
+PREVIEW_CHARS = 200
+MAX_MESSAGE_CHARS = 4000
+
+
+class NotAMember(LookupError):
+    pass
+
+
+# -----------------------------
+# Conversations
+# -----------------------------
+def direct_key(user_a, user_b):
+    low, high = sorted((int(user_a), int(user_b)))
+    return f"{low}:{high}"
+
+
+def get_or_create_direct(session, conversation_model, member_model, user_id, peer_id):
+    """
+    The one-to-one conversation between two users, created with both
+    membership rows on first use. direct_key is unique, so two requests
+    racing to open the same thread end up sharing one. Caller commits.
+    """
+    key = direct_key(user_id, peer_id)
+    conversations = conversation_model.__table__
+    find = select(conversations.c.id).where(conversations.c.direct_key == key)
+    conversation_id = session.execute(find).scalar()
+    if conversation_id is not None:
+        return conversation_id
+
+    now = datetime.utcnow()
+    try:
+        with session.begin_nested():
+            conversation_id = session.execute(
+                insert(conversations).values(direct_key=key, created_at=now, last_message_at=now)
+            ).inserted_primary_key[0]
+            # empty threads sort by creation time until the first message
+            session.execute(insert(member_model.__table__), [
+                {"conversation_id": conversation_id, "user_id": user_id, "peer_id": peer_id, "last_message_at": now},
+                {"conversation_id": conversation_id, "user_id": peer_id, "peer_id": user_id, "last_message_at": now},
+            ])
+    except IntegrityError:
+        # the other request created it first
+        conversation_id = session.execute(find).scalar()
+    return conversation_id
+
+
+def membership(session, member_model, conversation_id, user_id):
+    """The caller's membership row (primary-key lookup); raises NotAMember."""
+    member = session.get(member_model, (conversation_id, user_id))
+    if member is None:
+        raise NotAMember(conversation_id)
+    return member
+
+
+# -----------------------------
+# Sending
+# -----------------------------
+def send(session, models, conversation_id, sender_id, text):
+    """
+    Insert a message and keep the denormalized state in step: the
+    conversation's last-message columns, every member's inbox sort key,
+    and +1 unread for everyone but the sender (whose read marker moves to
+    the new message). Three statements, no counting. Caller commits.
+    """
+    conversation_model, member_model, message_model = models
+    now = datetime.utcnow()
+    messages = message_model.__table__
+    message_id = session.execute(
+        insert(messages).values(conversation_id=conversation_id, sender_id=sender_id, text=text, created_at=now)
+    ).inserted_primary_key[0]
+
+    conversations = conversation_model.__table__
+    session.execute(
+        update(conversations).where(conversations.c.id == conversation_id).values(
+            last_message_id=message_id, last_message_at=now,
+            last_message_preview=text[:PREVIEW_CHARS], last_sender_id=sender_id,
+        )
+    )
+    members = member_model.__table__
+    is_sender = members.c.user_id == sender_id
+    session.execute(
+        update(members).where(members.c.conversation_id == conversation_id).values(
+            last_message_at=now,
+            unread_count=case((is_sender, 0), else_=members.c.unread_count + 1),
+            last_read_message_id=case((is_sender, message_id), else_=members.c.last_read_message_id),
+        )
+    )
+    return message_id, now
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+def _greatest(session, a, b):
+    # SQLite's two-argument max() is scalar; Postgres spells it greatest()
+    if session.get_bind().dialect.name == "postgresql":
+        return func.greatest(a, b)
+    return func.max(a, b)
+
+
+def mark_read(session, models, user_id, read_up_to):
+    """
+    Batched read receipts: `read_up_to` maps conversation_id -> newest
+    message id the client has shown (None for "everything"). One
+    executemany UPDATE; read markers never move backwards, and each
+    unread_count is recounted only over the messages still past the
+    marker, a short range scan on (conversation_id, id).
+    Returns the number of conversations in the batch. Caller commits.
+    """
+    if not read_up_to:
+        return 0
+    conversation_model, member_model, message_model = models
+    read_up_to = {int(cid): up_to for cid, up_to in read_up_to.items()}
+    open_ended = [cid for cid, up_to in read_up_to.items() if up_to is None]
+    if open_ended:
+        conversations = conversation_model.__table__
+        newest = dict(session.execute(
+            select(conversations.c.id, conversations.c.last_message_id).where(conversations.c.id.in_(open_ended))
+        ).all())
+        for cid in open_ended:
+            read_up_to[cid] = newest.get(cid) or 0
+
+    members = member_model.__table__
+    messages = message_model.__table__
+    new_marker = _greatest(session, members.c.last_read_message_id, bindparam("up_to"))
+    remaining = (
+        select(func.count(messages.c.id))
+        .where(
+            messages.c.conversation_id == members.c.conversation_id,
+            messages.c.id > new_marker,
+            messages.c.sender_id != members.c.user_id,
+        )
+        .scalar_subquery()
+    )
+    stmt = (
+        update(members)
+        .where(members.c.conversation_id == bindparam("cid"), members.c.user_id == user_id)
+        .values(unread_count=remaining, last_read_message_id=new_marker)
+    )
+    params = [{"cid": cid, "up_to": int(up_to)} for cid, up_to in read_up_to.items()]
+    session.execute(stmt, params)
+    return len(params)
+
+
+def inbox(session, models, user_model, user_id, cursor=None, limit=DEFAULT_LIMIT):
+    """
+    One page of a user's conversations, most recent activity first, as
+    (member, conversation, peer) rows plus (next_cursor, has_more). A
+    single query: range scan on the inbox index, then primary-key joins
+    to the conversation and the other participant.
+    """
+    conversation_model, member_model, _ = models
+    query = (
+        select(member_model, conversation_model, user_model)
+        .join(conversation_model, conversation_model.id == member_model.conversation_id)
+        .outerjoin(user_model, user_model.id == member_model.peer_id)
+        .where(member_model.user_id == user_id)
+    )
+    if cursor:
+        at, conversation_id = decode_cursor(cursor)
+        query = query.where(or_(
+            member_model.last_message_at < at,
+            and_(member_model.last_message_at == at, member_model.conversation_id < conversation_id),
+        ))
+    query = query.order_by(member_model.last_message_at.desc(), member_model.conversation_id.desc()).limit(limit + 1)
+    rows = session.execute(query).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1][0].last_message_at, rows[-1][0].conversation_id) if has_more else None
+    return rows, next_cursor, has_more
+
+
+def history(session, message_model, conversation_id, before=None, limit=DEFAULT_LIMIT):
+    """Newest-first page of messages older than message id `before`; (messages, has_more)."""
+    query = select(message_model).where(message_model.conversation_id == conversation_id)
+    if before:
+        query = query.where(message_model.id < before)
+    rows = session.execute(query.order_by(message_model.id.desc()).limit(limit + 1)).scalars().all()
+    return rows[:limit], len(rows) > limit
+
+
+def unread_total(session, member_model, user_id):
+    """Badge count: a sum over the user's slice of the inbox index."""
+    members = member_model.__table__
+    return session.execute(
+        select(func.coalesce(func.sum(members.c.unread_count), 0)).where(members.c.user_id == user_id)
+    ).scalar()
@@ -0,0 +1,325 @@
+# backend/app/core/metrics.py
+import bisect
+import hmac
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.profiler import SamplingProfiler
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+# -----------------------------
+# Registry
+# -----------------------------
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """
+    Process-local counters and histograms rendered in the Prometheus text
+    format. Each worker process keeps its own; scrape every worker (or
+    sum them) when running more than one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+
+    def describe(self, name, text, kind, buckets=None):
+        self._help[name] = (text, kind, buckets)
+
+    def inc(self, name, labels, value=1):
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        key = (name, labels)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(self._help[name][2])
+            hist.observe(value)
+
+    def render(self):
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                ((k, (tuple(h.counts), h.sum, h.count, h.buckets)) for k, h in self._histograms.items()),
+            )
+        lines, described = [], set()
+
+        def header(name):
+            if name not in described:
+                described.add(name)
+                text, kind, _ = self._help.get(name, ("", "untyped", None))
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            header(name)
+            lines.append(f"{name}{_labels(labels)} {value}")
+        for (name, labels), (counts, total, count, buckets) in histograms:
+            header(name)
+            cumulative = 0
+            for bound, n in zip(buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {total}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    inner = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in labels)
+    return "{" + inner + "}"
+
+
+registry = Registry()
+registry.describe("http_requests_total", "Requests by endpoint, method and status.", "counter")
+registry.describe("http_request_duration_seconds", "Wall time per request.", "histogram", LATENCY_BUCKETS)
+registry.describe("http_request_db_queries", "SQL statements per request.", "histogram", QUERY_BUCKETS)
+registry.describe("http_request_db_seconds", "Time in SQL statements per request.", "histogram", LATENCY_BUCKETS)
+registry.describe("http_request_serialize_seconds", "JSON encoding time per request.", "histogram", LATENCY_BUCKETS)
+registry.describe("http_response_size_bytes", "Response body size.", "histogram", SIZE_BUCKETS)
+
+
+# -----------------------------
+# Per-request stats
+# -----------------------------
+class RequestStats:
+    __slots__ = ("started", "db_queries", "db_seconds", "serialize_seconds")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+    def server_timing(self, total):
+        """Server-Timing header value; browsers show it in the network panel."""
+        app = max(total - self.db_seconds - self.serialize_seconds, 0.0)
+        return (f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries", '
+                f"ser;dur={self.serialize_seconds * 1000:.1f}, app;dur={app * 1000:.1f}, total;dur={total * 1000:.1f}")
+
+
+_current = ContextVar("request_stats", default=None)
+
+
+def begin():
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end(token):
+    try:
+        _current.reset(token)
+    except ValueError:
+        # set in another context (e.g. a streamed body finishing elsewhere); it dies with that context
+        pass
+
+
+@contextmanager
+def timed_serialization():
+    """Charge the wrapped encode to the current request; free outside one."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialize_seconds += time.perf_counter() - start
+
+
+def record(method, endpoint, status, stats, total, size):
+    labels = (("endpoint", endpoint), ("method", method))
+    registry.inc("http_requests_total", labels + (("status", str(status)),))
+    registry.observe("http_request_duration_seconds", labels, total)
+    registry.observe("http_request_db_queries", labels, stats.db_queries)
+    registry.observe("http_request_db_seconds", labels, stats.db_seconds)
+    registry.observe("http_request_serialize_seconds", labels, stats.serialize_seconds)
+    if size is not None:
+        registry.observe("http_response_size_bytes", labels, size)
+
+
+# -----------------------------
+# SQLAlchemy hooks (every engine, like the SQLite pragmas in app.core.database)
+# -----------------------------
+# The start time lives on the statement's ExecutionContext, which is
+# dropped with the statement, so a failed execute (no after_cursor_execute)
+# leaves nothing behind on the pooled connection.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, "_metrics_started", None)
+    if stats is None or started is None:
+        return
+    stats.db_queries += 1
+    stats.db_seconds += time.perf_counter() - started
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # failed statements still cost time; count them, then forget the start
+    stats = _current.get()
+    context = exception_context.execution_context
+    started = getattr(context, "_metrics_started", None)
+    if stats is None or started is None:
+        return
+    context._metrics_started = None
+    stats.db_queries += 1
+    stats.db_seconds += time.perf_counter() - started
+
+
+# -----------------------------
+# Profiling
+# -----------------------------
+def profile_allowed(token, provided):
+    """?__profile=1 needs the PROFILE_TOKEN secret (X-Profile-Token header); disabled when unset."""
+    return bool(token) and bool(provided) and hmac.compare_digest(token, provided)
+
+
+# -----------------------------
+# Flask
+# -----------------------------
+def init_metrics(app):
+    """
+    Per-request timing, query counting and Server-Timing for a Flask app,
+    plus GET /metrics. `?__profile=1` with X-Profile-Token samples the
+    request and writes folded stacks to PROFILE_DIR (X-Profile header
+    names the file).
+    """
+    from flask import g, request
+
+    profile_token = app.config.get("PROFILE_TOKEN")
+    profile_dir = app.config.get("PROFILE_DIR", "profiles")
+    interval = app.config.get("PROFILE_INTERVAL_MS", 1) / 1000.0
+
+    @app.before_request
+    def _metrics_begin():
+        g._metrics, g._metrics_token = begin()
+        if request.args.get("__profile") == "1" and profile_allowed(profile_token, request.headers.get("X-Profile-Token")):
+            g._profiler = SamplingProfiler(interval=interval).start()
+
+    @app.after_request
+    def _metrics_after(response):
+        stats = g.pop("_metrics", None)
+        if stats is None:
+            return response
+        total = time.perf_counter() - stats.started
+        response.headers["Server-Timing"] = stats.server_timing(total)
+        profiler = g.pop("_profiler", None)
+        if profiler is not None:
+            response.headers["X-Profile"] = profiler.stop().dump(profile_dir, request.endpoint or "unmatched")
+        size = None if response.is_streamed else response.calculate_content_length()
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        record(request.method, endpoint, response.status_code, stats, total, size)
+        return response
+
+    @app.teardown_request
+    def _metrics_end(_exc):
+        profiler = g.pop("_profiler", None)
+        if profiler is not None:
+            profiler.stop()
+        token = g.pop("_metrics_token", None)
+        if token is not None:
+            end(token)
+
+    @app.route("/metrics")
+    def metrics():
+        return app.response_class(registry.render(), mimetype="text/plain; version=0.0.4")
+
+
+# -----------------------------
+# FastAPI / ASGI
+# -----------------------------
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware with the same measurements as init_metrics():
+
+        app.add_middleware(MetricsMiddleware, profile_token=Config.PROFILE_TOKEN)
+        app.add_route("/metrics", metrics_endpoint)
+
+    Async SQL runs in SQLAlchemy's greenlet bridge, which carries this
+    request's context, so the engine hooks above count it too.
+    """
+
+    def __init__(self, app, profile_token=None, profile_dir="profiles", profile_interval_ms=1):
+        self.app = app
+        self.profile_token = profile_token
+        self.profile_dir = profile_dir
+        self.interval = profile_interval_ms / 1000.0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats, token = begin()
+        state = {"status": 500, "size": 0}
+        profiler = None
+        headers = {k.decode().lower(): v.decode() for k, v in scope.get("headers", [])}
+        if b"__profile=1" in scope.get("query_string", b"") and profile_allowed(self.profile_token, headers.get("x-profile-token")):
+            profiler = SamplingProfiler(interval=self.interval).start()
+
+        def endpoint():
+            route = scope.get("route")
+            return getattr(route, "path", None) or "unmatched"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                total = time.perf_counter() - stats.started
+                extra = [(b"server-timing", stats.server_timing(total).encode())]
+                if profiler is not None:
+                    name = profiler.stop().dump(self.profile_dir, endpoint())
+                    extra.append((b"x-profile", name.encode()))
+                message = dict(message, headers=list(message.get("headers", [])) + extra)
+            elif message["type"] == "http.response.body":
+                state["size"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profiler is not None:
+                profiler.stop()
+            end(token)
+            record(scope["method"], endpoint(), state["status"], stats, time.perf_counter() - stats.started, state["size"])
+
+
+async def metrics_endpoint(request):
+    from starlette.responses import PlainTextResponse
+
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
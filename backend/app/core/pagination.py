@@ -0,0 +1,98 @@
+# backend/app/core/pagination.py
+import base64
+import json
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+DEFAULT_LIMIT = 12
+MAX_LIMIT = 50
+APPROX_TOTAL_TTL = 60  # seconds an approximate total is reused before recounting
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# -----------------------------
+# Cursor encoding
+# -----------------------------
+def encode_cursor(created_at, row_id):
+    """Opaque cursor for the last row of a page."""
+    raw = json.dumps([created_at.isoformat() if created_at else None, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (datetime.fromisoformat(created_at) if created_at else None), int(row_id)
+    except Exception:
+        raise InvalidCursor("invalid cursor")
+
+
+def clamp_limit(value, default=DEFAULT_LIMIT):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        value = default
+    return max(1, min(value, MAX_LIMIT))
+
+
+# -----------------------------
+# Keyset paging
+# -----------------------------
+def _nulls_first(query):
+    # Postgres sorts NULL as the largest value, so DESC puts NULL created_at
+    # first; SQLite and MySQL sort it as the smallest, so it comes last
+    return query.session.get_bind().dialect.name == "postgresql"
+
+
+def _after(model, created_at, row_id, nulls_first):
+    """Rows past (created_at, row_id) in created_at DESC, id DESC order, NULLs where the dialect puts them."""
+    if created_at is None:
+        same_block = and_(model.created_at.is_(None), model.id < row_id)
+        return or_(same_block, model.created_at.isnot(None)) if nulls_first else same_block
+    older = or_(model.created_at < created_at, and_(model.created_at == created_at, model.id < row_id))
+    return older if nulls_first else or_(older, model.created_at.is_(None))
+
+
+def keyset_page(query, model, cursor=None, limit=DEFAULT_LIMIT):
+    """
+    Newest-first page of `query` keyed on (created_at, id).
+    Returns (items, next_cursor, has_more). The filter + order walk the
+    composite (created_at, id) index, so page N costs the same as page 1.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(_after(model, created_at, row_id, _nulls_first(query)))
+
+    # fetch one extra row to know whether another page exists (no COUNT needed)
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    next_cursor = encode_cursor(items[-1].created_at, items[-1].id) if has_more else None
+    return items, next_cursor, has_more
+
+
+# -----------------------------
+# Approximate totals
+# -----------------------------
+_approx_lock = threading.Lock()
+_approx_totals = {}
+
+
+def approximate_count(key, count_fn, ttl=APPROX_TOTAL_TTL):
+    """Return a cached total for `key`, recounting at most once per `ttl` seconds."""
+    now = time.monotonic()
+    with _approx_lock:
+        hit = _approx_totals.get(key)
+        if hit and now - hit[1] < ttl:
+            return hit[0]
+    value = count_fn()
+    with _approx_lock:
+        _approx_totals[key] = (value, now)
+    return value
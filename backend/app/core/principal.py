@@ -0,0 +1,145 @@
+# backend/app/core/principal.py
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import select
+
+PRINCIPAL_TTL = 30  # seconds a cached user may lag behind another process's update
+PRINCIPAL_MAX = 4096
+_SECRET_COLUMNS = {"password_hash"}
+
+
+class Principal:
+    """
+    Read-only snapshot of a user row (every column but the password hash).
+    Attribute access mirrors the model, so route code can read
+    `principal.id` / `principal.first_name` without touching a session.
+    """
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values):
+        object.__setattr__(self, "_values", values)
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Principal is read-only; load the model to change the user")
+
+    def as_dict(self):
+        return dict(self._values)
+
+
+class PrincipalCache:
+    """
+    Process-local LRU of user snapshots keyed by (table, id), each entry
+    valid for `ttl` seconds. Writers call invalidate() after committing a
+    change to the user row; other processes catch up when the TTL expires.
+    """
+
+    def __init__(self, ttl=PRINCIPAL_TTL, maxsize=PRINCIPAL_MAX):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, session, model, user_id):
+        key = (model.__table__.name, int(user_id))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[1]
+            self.stats["misses"] += 1
+
+        table = model.__table__
+        cols = [c for c in table.c if c.name not in _SECRET_COLUMNS]
+        row = session.execute(select(*cols).where(table.c.id == key[1])).mappings().first()
+        if row is None:
+            return None
+        principal = Principal(dict(row))
+        with self._lock:
+            self._entries[key] = (now + self.ttl, principal)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return principal
+
+    def invalidate(self, model, user_id):
+        with self._lock:
+            self._entries.pop((model.__table__.name, int(user_id)), None)
+            self.stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+principals = PrincipalCache()
+
+
+# -----------------------------
+# Per-request resolution
+# -----------------------------
+def current_principal(session, model):
+    """
+    Flask: the user behind the request's JWT, or None. Memoised on `g`,
+    so helpers called from the same view reuse the first lookup.
+    Call inside a @jwt_required() view.
+    """
+    from flask import g
+    from flask_jwt_extended import get_jwt_identity
+
+    memo = g.setdefault("_principals", {})
+    user_id = get_jwt_identity()
+    if user_id is None:
+        return None
+    if user_id not in memo:
+        memo[user_id] = principals.get(session, model, user_id)
+    return memo[user_id]
+
+
+def _bearer_user_id(request):
+    from jose import JWTError, jwt
+    from app.core.security import SECRET_KEY, ALGORITHM
+
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return int(jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub"))
+    except (JWTError, TypeError, ValueError):
+        return None
+
+
+def principal_from_request(session, model, request):
+    """
+    FastAPI: the user behind the `Authorization: Bearer` token, or None.
+    Memoised on request.state for the lifetime of the request.
+    """
+    if hasattr(request.state, "principal"):
+        return request.state.principal
+    user_id = _bearer_user_id(request)
+    principal = principals.get(session, model, user_id) if user_id is not None else None
+    request.state.principal = principal
+    return principal
+
+
+async def principal_from_request_async(session, model, request):
+    """principal_from_request for an AsyncSession; a cache hit never touches the database."""
+    if hasattr(request.state, "principal"):
+        return request.state.principal
+    user_id = _bearer_user_id(request)
+    principal = None
+    if user_id is not None:
+        principal = await session.run_sync(principals.get, model, user_id)
+    request.state.principal = principal
+    return principal
@@ -0,0 +1,291 @@
+# backend/app/core/pubsub.py
+import logging
+import queue
+import sys
+import threading
+import time
+from collections import deque
+
+from app.core.serialization import dumps, loads
+
+# Optional shared broker so an event published by one worker reaches streams held by the others
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except Exception:
+    REDIS_AVAILABLE = False
+
+log = logging.getLogger(__name__)
+
+# sent in place of dropped events; the client refetches what it is showing
+RESYNC = {"type": "resync"}
+
+
+# -----------------------------
+# Subscriptions
+# -----------------------------
+class Subscription:
+    """
+    One open stream. Events queue here until the connection's writer takes
+    them; at `maxsize` the backlog is discarded and replaced by a single
+    resync event, so a slow client costs bounded memory and never holds
+    up the publisher or other subscribers.
+    """
+
+    def __init__(self, hub, channels, maxsize=100):
+        self.hub = hub
+        self.channels = frozenset(channels)
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._events = deque()
+        self._overflowed = False
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def put(self, event):
+        with self._cond:
+            if self._closed:
+                return
+            if len(self._events) >= self.maxsize:
+                self.dropped += len(self._events)
+                self._events.clear()
+                self._overflowed = True
+            if self._overflowed:
+                self.dropped += 1
+            else:
+                self._events.append(event)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Next event, RESYNC after an overflow, or None on timeout/close."""
+        with self._cond:
+            if not self._events and not self._overflowed and not self._closed:
+                self._cond.wait(timeout)
+            if self._overflowed:
+                self._overflowed = False
+                return RESYNC
+            return self._events.popleft() if self._events else None
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._events.clear()
+            self._cond.notify_all()
+        self.hub.unsubscribe(self)
+
+
+# -----------------------------
+# Brokers
+# -----------------------------
+class LocalBroker:
+    """In-process delivery; enough for one worker, and the stand-in for Redis in dev."""
+
+    def __init__(self):
+        self._deliver = None
+
+    def start(self, deliver):
+        self._deliver = deliver
+
+    def publish(self, channel, event):
+        self._deliver(channel, event)
+
+    def stop(self):
+        pass
+
+
+class RedisBroker:
+    """Redis PUBLISH/PSUBSCRIBE; every worker's hub sees every event."""
+
+    def __init__(self, url, prefix="live:"):
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._pubsub = None
+        self._thread = None
+
+    def start(self, deliver):
+        prefix_len = len(self.prefix)
+
+        def handler(message):
+            channel = message["channel"].decode()[prefix_len:]
+            deliver(channel, loads(message["data"]))
+
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.psubscribe(**{f"{self.prefix}*": handler})
+        self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def publish(self, channel, event):
+        self.client.publish(self.prefix + channel, dumps(event))
+
+    def stop(self):
+        if self._thread is not None:
+            self._thread.stop()
+
+
+# -----------------------------
+# Hub
+# -----------------------------
+class Hub:
+    """
+    Fan-out of small JSON events to open streams. Publishers hand events
+    to the broker and return; a dispatcher thread copies each delivered
+    event into the queue of every subscription listening on its channel.
+    Channels are plain strings ("feed", "post:42").
+    """
+
+    def __init__(self, broker=None, queue_size=100, max_subscribers=1000, inbox_size=10000):
+        self.broker = broker or LocalBroker()
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._inbox = queue.Queue(maxsize=inbox_size)
+        self._channels = {}
+        self._count = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stats = {"published": 0, "delivered": 0, "dropped": 0, "inbox_full": 0}
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.broker.start(self._receive)
+        self._thread = threading.Thread(target=self._run, name="pubsub-hub", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.broker.stop()
+        if self._thread is not None:
+            self._inbox.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # -----------------------------
+    # Publishing
+    # -----------------------------
+    def publish(self, channel, event):
+        """Best effort: a broker failure is logged, never raised into the write path."""
+        try:
+            self.broker.publish(channel, event)
+            self.stats["published"] += 1
+        except Exception:
+            log.exception("publish to %s failed", channel)
+
+    def _receive(self, channel, event):
+        try:
+            self._inbox.put_nowait((channel, event))
+        except queue.Full:
+            self.stats["inbox_full"] += 1
+
+    def _run(self):
+        while True:
+            item = self._inbox.get()
+            if item is None:
+                return
+            channel, event = item
+            with self._lock:
+                subs = list(self._channels.get(channel, ()))
+            for sub in subs:
+                sub.put(event)
+            self.stats["delivered"] += len(subs)
+
+    # -----------------------------
+    # Subscribing
+    # -----------------------------
+    def subscribe(self, channels):
+        """A new Subscription, or None when the hub is at max_subscribers."""
+        sub = Subscription(self, channels, self.queue_size)
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                return None
+            for channel in sub.channels:
+                self._channels.setdefault(channel, set()).add(sub)
+            self._count += 1
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            removed = False
+            for channel in sub.channels:
+                subs = self._channels.get(channel)
+                if subs and sub in subs:
+                    subs.discard(sub)
+                    removed = True
+                    if not subs:
+                        del self._channels[channel]
+            if removed:
+                self._count -= 1
+                self.stats["dropped"] += sub.dropped
+
+    def metrics(self):
+        with self._lock:
+            return dict(self.stats, subscribers=self._count, channels=len(self._channels), inbox=self._inbox.qsize())
+
+
+def _cooperative():
+    """True under gevent/eventlet monkey patching, where a waiting stream holds a greenlet, not a thread."""
+    gevent = sys.modules.get("gevent.monkey")
+    if gevent is not None and gevent.is_module_patched("socket"):
+        return True
+    eventlet = sys.modules.get("eventlet.patcher")
+    return eventlet is not None and eventlet.is_monkey_patched("socket")
+
+
+def stream_capacity(config):
+    """
+    Streams one worker process can hold open. On gevent/eventlet workers
+    that is STREAM_MAX_SUBSCRIBERS. On threaded workers every stream pins
+    a thread for up to STREAM_MAX_SECONDS, so the cap is WEB_THREADS less
+    STREAM_RESERVED_THREADS kept for ordinary requests; a sync worker
+    (one thread) holds none.
+    """
+    limit = config.get("STREAM_MAX_SUBSCRIBERS", 1000)
+    if _cooperative():
+        return limit
+    spare = config.get("WEB_THREADS", 1) - config.get("STREAM_RESERVED_THREADS", 4)
+    return max(0, min(limit, spare))
+
+
+def from_config(config):
+    url = config.get("STREAM_BROKER_URL")
+    broker = RedisBroker(url) if url and REDIS_AVAILABLE else LocalBroker()
+    capacity = stream_capacity(config)
+    if not capacity:
+        log.warning("live streams disabled: run a gevent worker, or gthread with WEB_THREADS above STREAM_RESERVED_THREADS")
+    return Hub(broker, queue_size=config.get("STREAM_QUEUE_SIZE", 100), max_subscribers=capacity)
+
+
+# -----------------------------
+# Server-Sent Events
+# -----------------------------
+def sse_stream(sub, heartbeat=15, max_seconds=300, retry_ms=3000):
+    """
+    Yield text/event-stream frames for `sub` until the client goes away or
+    `max_seconds` pass (EventSource reconnects on its own, which returns
+    the worker thread to the pool now and then). Comment lines keep idle
+    proxies from closing the connection.
+    """
+    deadline = time.monotonic() + max_seconds
+    try:
+        yield f"retry: {retry_ms}\n\n"
+        while not sub.closed and time.monotonic() < deadline:
+            event = sub.get(timeout=heartbeat)
+            if event is None:
+                yield ": ping\n\n"
+                continue
+            yield f"event: {event.get('type', 'message')}\ndata: {dumps(event).decode()}\n\n"
+    finally:
+        sub.close()
+
+
+# -----------------------------
+# Flask helpers
+# -----------------------------
+def publish(channel, event):
+    """Push `event` to streams on `channel`; call after the write commits. Needs an app context."""
+    from flask import current_app
+
+    hub = current_app.extensions.get("hub")
+    if hub is not None:
+        hub.publish(channel, event)
@@ -0,0 +1,45 @@
+# backend/app/core/querycount.py
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Collects every statement an engine executes while attached."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries(engine):
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+
+@contextmanager
+def assert_max_queries(engine, limit):
+    """
+    Fail when the wrapped block runs more than `limit` statements, e.g.
+
+        with assert_max_queries(db.engine, 3):
+            client.get("/api/posts/posts?limit=50")
+
+    Catches endpoints that regress back to per-row (N+1) loading.
+    """
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        listing = "\n".join(f"  {i + 1}. {s}" for i, s in enumerate(counter.statements))
+        raise AssertionError(f"expected at most {limit} queries, ran {counter.count}:\n{listing}")
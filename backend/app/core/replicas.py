@@ -0,0 +1,190 @@
+# backend/app/core/replicas.py
+import itertools
+import logging
+import threading
+import time
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import UpdateBase
+
+try:
+    from flask_sqlalchemy.session import Session as _FlaskSession
+    FLASK_SQLALCHEMY_AVAILABLE = True
+except Exception:
+    _FlaskSession = object
+    FLASK_SQLALCHEMY_AVAILABLE = False
+
+log = logging.getLogger(__name__)
+
+# Set after a successful write; while it is in the future this client reads
+# from the primary, so it sees its own post/comment before replicas catch up.
+STICKY_COOKIE = "db_primary_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ReplicaSet:
+    """
+    Read-only engines for the URLs in DATABASE_REPLICA_URLS, handed out
+    round-robin. A replica that fails to connect or drops a connection is
+    skipped for `retry_seconds`; pick() returns None when none is healthy,
+    which callers treat as "use the primary".
+    """
+
+    def __init__(self, urls, options=None, retry_seconds=30, factory=create_engine):
+        self.retry_seconds = retry_seconds
+        self.engines = []
+        for url in urls:
+            engine = factory(url, **(options(url) if options else {}))
+            # AsyncEngine events live on its sync_engine
+            event.listen(_sync(engine), "handle_error", self._on_error)
+            self.engines.append(engine)
+        self._down = {}  # engine -> monotonic time it may be retried
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+        self.stats = {"reads": 0, "fallbacks": 0, "failures": 0}
+
+    def __bool__(self):
+        return bool(self.engines)
+
+    def _on_error(self, ctx):
+        if ctx.engine in self._down:
+            return
+        if ctx.is_disconnect or ctx.connection is None:
+            self.mark_down(ctx.engine)
+
+    def mark_down(self, engine):
+        engine = _sync(engine)
+        log.warning("read replica %s unavailable; using primary for %ss", engine.url, self.retry_seconds)
+        with self._lock:
+            self._down[engine] = time.monotonic() + self.retry_seconds
+            self.stats["failures"] += 1
+
+    def _healthy(self, engine, now):
+        key = _sync(engine)
+        until = self._down.get(key)
+        if until is None:
+            return True
+        if until > now:
+            return False
+        if key is not engine:
+            # async engine: can't probe from here; the next failure marks it down again
+            with self._lock:
+                self._down.pop(key, None)
+            return True
+        # retry window passed: probe once before sending traffic back
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception:
+            self.mark_down(engine)
+            return False
+        with self._lock:
+            self._down.pop(engine, None)
+        return True
+
+    def pick(self):
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            engine = self.engines[next(self._turn) % len(self.engines)]
+            if self._healthy(engine, now):
+                self.stats["reads"] += 1
+                return engine
+        self.stats["fallbacks"] += 1
+        return None
+
+    def dispose(self):
+        for engine in self.engines:
+            _sync(engine).dispose()
+
+
+def _sync(engine):
+    return getattr(engine, "sync_engine", engine)
+
+
+def from_config(config, options=None):
+    urls = [u.strip() for u in (config.get("DATABASE_REPLICA_URLS") or "").split(",") if u.strip()]
+    return ReplicaSet(urls, options=options, retry_seconds=config.get("REPLICA_RETRY_SECONDS", 30))
+
+
+# -----------------------------
+# Read-your-writes stickiness
+# -----------------------------
+def is_sticky(cookies):
+    try:
+        return float(cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except (TypeError, ValueError):
+        return False
+
+
+def set_sticky(response, seconds):
+    """Pin this client's reads to the primary for `seconds` (Flask or Starlette response)."""
+    until = time.time() + seconds
+    response.set_cookie(STICKY_COOKIE, f"{until:.0f}", max_age=int(seconds) + 1, httponly=True, samesite="Lax")
+
+
+# -----------------------------
+# Flask-SQLAlchemy integration
+# -----------------------------
+class RoutingSession(_FlaskSession):
+    """
+    Sends plain SELECTs to a replica while the current request is marked
+    read-only (g.db_read_only), all of them to the one replica picked for
+    the request. Flushes, DML and anything outside a request go to the
+    primary, and the first flush or DML statement switches the rest of the
+    request to the primary too.
+    Pass as SQLAlchemy(session_options={"class_": RoutingSession}).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or isinstance(clause, UpdateBase):
+                _pin_primary()
+            elif isinstance(clause, Select):
+                engine = _read_engine()
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _read_engine():
+    from flask import current_app, g, has_request_context
+
+    if not has_request_context() or not g.get("db_read_only"):
+        return None
+    # one replica per request: replicas lag by different amounts, so
+    # statements of one request must not straddle two of them
+    if "db_replica" not in g:
+        replicas = current_app.extensions.get("replicas")
+        g.db_replica = replicas.pick() if replicas else None
+    return g.db_replica
+
+
+def _pin_primary():
+    from flask import g, has_request_context
+
+    if has_request_context() and g.get("db_read_only"):
+        g.db_read_only = False
+
+
+def init_read_replicas(app, options=None):
+    """Route GET/HEAD reads to DATABASE_REPLICA_URLS; no-op when none are configured."""
+    from flask import g, request
+
+    replicas = from_config(app.config, options)
+    if not replicas:
+        return None
+    app.extensions["replicas"] = replicas
+    sticky_seconds = app.config.get("REPLICA_STICKY_SECONDS", 5)
+
+    @app.before_request
+    def _route_reads():
+        g.db_read_only = request.method in SAFE_METHODS and not is_sticky(request.cookies)
+
+    @app.after_request
+    def _stick_to_primary(response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            set_sticky(response, sticky_seconds)
+        return response
+
+    return replicas
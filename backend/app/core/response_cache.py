@@ -0,0 +1,214 @@
+# backend/app/core/response_cache.py
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request
+
+from app.core.conditional import is_not_modified
+
+# Optional shared backend so every worker sees the same entries and invalidations
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except Exception:
+    REDIS_AVAILABLE = False
+
+_SKIP_HEADERS = {"set-cookie", "content-length", "date"}
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+class MemoryBackend:
+    """Per-process LRU. Also the stand-in for the shared backend in tests and dev."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def add(self, key, value, ttl):
+        """Set only if absent (or expired); True when this call set it."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[1] >= time.time():
+                return False
+            self._data[key] = (value, time.time() + ttl)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key):
+        with self._lock:
+            value = (self._data.get(key, (0, 0))[0] or 0) + 1
+            self._data[key] = (value, float("inf"))
+            self._data.move_to_end(key)
+            return value
+
+    def version(self, key):
+        return self.get(key) or 0
+
+
+class RedisBackend:
+    """
+    Entries are pickled; tag versions are plain Redis integers (INCR), so
+    they are read back through version(), never get().
+    """
+
+    def __init__(self, url, prefix="respcache:", client=None):
+        self.client = client if client is not None else redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=max(1, int(ttl)))
+
+    def add(self, key, value, ttl):
+        return bool(self.client.set(self.prefix + key, pickle.dumps(value), ex=max(1, int(ttl)), nx=True))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+    def version(self, key):
+        return int(self.client.get(self.prefix + key) or 0)
+
+
+# -----------------------------
+# Cache
+# -----------------------------
+class ResponseCache:
+    """
+    Whole-response cache for anonymous, viewer-independent GETs.
+
+    Entries are fresh for `ttl` seconds, then served stale for up to
+    `stale_ttl` more while a single request (per key, across workers when
+    the backend is shared) rebuilds them. Writes call invalidate(tag): each
+    tag has a version number baked into the keys that depend on it, so a
+    bump orphans every page for that tag at once and old entries simply
+    age out of the LRU.
+    """
+
+    def __init__(self, backend, ttl=5, stale_ttl=30):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stats = {"hit": 0, "stale": 0, "miss": 0, "invalidations": 0}
+
+    def _version(self, tag):
+        return self.backend.version(f"v:{tag}")
+
+    def invalidate(self, *tags):
+        for tag in tags:
+            self.backend.incr(f"v:{tag}")
+        self.stats["invalidations"] += len(tags)
+
+    def key_for(self, path, args, tags):
+        versions = ",".join(f"{t}={self._version(t)}" for t in tags)
+        return f"r:{path}?{args}|{versions}"
+
+    def _replay(self, entry, state):
+        self.stats[state] += 1
+        etag = next((v for k, v in entry["headers"] if k.lower() == "etag"), None)
+        if etag and is_not_modified(request.headers, etag):
+            # validators were stored with the body; skip sending it
+            keep = {"etag", "last-modified", "cache-control"}
+            return current_app.response_class(status=304, headers=[(k, v) for k, v in entry["headers"] if k.lower() in keep])
+        resp = current_app.response_class(entry["body"], status=entry["status"], headers=entry["headers"])
+        resp.headers["X-Cache"] = state.upper()
+        return resp
+
+    def serve(self, view, args, kwargs, tags, vary, ttl):
+        query = "&".join(f"{name}={request.args.get(name, '')}" for name in vary)
+        key = self.key_for(request.path, query, tags)
+        entry = self.backend.get(key)
+        now = time.time()
+        if entry is not None:
+            if entry["fresh_until"] > now:
+                return self._replay(entry, "hit")
+            # stale: one request refreshes, the rest keep getting the old copy
+            if not self.backend.add(f"lock:{key}", 1, ttl=10):
+                return self._replay(entry, "stale")
+
+        try:
+            resp = current_app.make_response(view(*args, **kwargs))
+            if resp.status_code == 200 and not resp.is_streamed:
+                self.backend.set(key, {
+                    "body": resp.get_data(),
+                    "status": resp.status_code,
+                    "headers": [(k, v) for k, v in resp.headers.items() if k.lower() not in _SKIP_HEADERS],
+                    "fresh_until": now + ttl,
+                }, ttl + self.stale_ttl)
+        finally:
+            if entry is not None:
+                self.backend.delete(f"lock:{key}")
+        self.stats["miss"] += 1
+        resp.headers["X-Cache"] = "MISS"
+        return resp
+
+
+def from_config(config):
+    url = config.get("RESPONSE_CACHE_URL")
+    if url and REDIS_AVAILABLE:
+        backend = RedisBackend(url)
+    else:
+        backend = MemoryBackend(config.get("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+    return ResponseCache(backend, ttl=config.get("RESPONSE_CACHE_TTL", 5), stale_ttl=config.get("RESPONSE_CACHE_STALE_TTL", 30))
+
+
+# -----------------------------
+# Flask helpers
+# -----------------------------
+def cached_response(tags, vary=(), ttl=None):
+    """
+    Cache a GET view. `tags` is a list, or a callable taking the view's
+    kwargs and returning one (e.g. lambda post_id: [f"post:{post_id}"]);
+    `vary` names the query args that select different pages. Without a
+    response_cache extension the view runs uncached.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = current_app.extensions.get("response_cache")
+            if cache is None or request.method != "GET":
+                return view(*args, **kwargs)
+            view_tags = tags(**kwargs) if callable(tags) else tags
+            return cache.serve(view, args, kwargs, view_tags, vary, ttl or cache.ttl)
+        return wrapper
+    return decorator
+
+
+def invalidate(*tags):
+    """Drop cached pages for `tags`; call after the write commits. Needs an app context."""
+    cache = current_app.extensions.get("response_cache")
+    if cache is not None:
+        cache.invalidate(*tags)
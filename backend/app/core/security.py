@@ -1,18 +1,20 @@
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import jwt
+from app.core.config import Config
+from app.core.hashing import HashPool, PasslibBackend
 
 SECRET_KEY = "super-secret-key"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt runs on a dedicated bounded pool; raises HasherBusy when saturated
+passwords = HashPool(PasslibBackend(rounds=Config.BCRYPT_ROUNDS), workers=Config.HASH_WORKERS, max_queue=Config.HASH_QUEUE_MAX)
 
 def get_password_hash(password: str):
-    return pwd_context.hash(password)
+    return passwords.hash(password)
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return passwords.verify_and_update(plain_password, hashed_password)[0]
 
 def create_access_token(data: dict, expires_delta: int = ACCESS_TOKEN_EXPIRE_MINUTES):
     to_encode = data.copy()
@@ -0,0 +1,272 @@
+# backend/app/core/serialization.py
+import gzip
+import json
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+
+from app.core.metrics import timed_serialization
+
+# Optional fast paths: orjson for encoding, brotli for compression
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except Exception:
+    ORJSON_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except Exception:
+    BROTLI_AVAILABLE = False
+
+
+# -----------------------------
+# Encoding
+# -----------------------------
+def _default(obj):
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """Compact JSON as bytes; orjson when installed."""
+    with timed_serialization():
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def loads(data):
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+# -----------------------------
+# Precompiled serializers
+# -----------------------------
+def iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def or_zero(value):
+    return value or 0
+
+
+def or_empty(value):
+    return value or []
+
+
+class Serializer:
+    """
+    Object -> dict converter generated once per shape. Fields are
+    "name", (out_key, attr) or (out_key, attr, fn) where fn is a plain
+    function or a nested Serializer. The spec is compiled into a single
+    dict-literal function, so serializing a row costs attribute loads and
+    nothing else: no per-field loop, getattr or branching.
+    A None object serializes to a dict of Nones, matching the old
+    `x.id if x else None` style.
+
+        AUTHOR = Serializer("id", ("firstName", "first_name"))
+        POST = Serializer("id", ("createdAt", "created_at", iso), ("user", "author", AUTHOR))
+    """
+
+    def __init__(self, *fields):
+        self.keys = []
+        env = {}
+        items = []
+        for i, spec in enumerate(fields):
+            out, attr, fn = (spec, spec, None) if isinstance(spec, str) else (tuple(spec) + (None,))[:3]
+            if not all(part.isidentifier() for part in attr.split(".")):
+                raise ValueError(f"bad attribute path {attr!r}")
+            expr = f"o.{attr}"
+            if fn is not None:
+                env[f"f{i}"] = fn.one if isinstance(fn, Serializer) else fn
+                expr = f"f{i}({expr})"
+            items.append(f"{out!r}: {expr}")
+            self.keys.append(out)
+        src = "def one(o):\n    return {" + ", ".join(items) + "}\n"
+        exec(compile(src, f"<serializer {', '.join(self.keys)}>", "exec"), env)
+        self._one = env["one"]
+        self._empty = dict.fromkeys(self.keys)
+
+    def one(self, obj):
+        return self._one(obj) if obj is not None else dict(self._empty)
+
+    def one_or_none(self, obj):
+        """For nested fields where a missing relation should stay null."""
+        return self._one(obj) if obj is not None else None
+
+    def many(self, objs):
+        one = self._one
+        return [one(o) for o in objs]
+
+
+# -----------------------------
+# Compression
+# -----------------------------
+COMPRESSIBLE = ("application/json", "text/")
+
+
+def choose_encoding(accept_encoding):
+    accept = (accept_encoding or "").lower()
+    if BROTLI_AVAILABLE and "br" in accept:
+        return "br"
+    if "gzip" in accept:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding, level=None):
+    if encoding == "br":
+        return brotli.compress(body, quality=level or 4)
+    return gzip.compress(body, compresslevel=level or 5, mtime=0)
+
+
+class _CompressedCache:
+    """Small LRU of compressed bodies keyed by ETag, encoding and body checksum; cached feed pages compress once."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+# -----------------------------
+# Flask integration
+# -----------------------------
+def init_json(app):
+    """orjson-backed app.json (used by jsonify) plus optional gzip/brotli of large responses."""
+    from flask import request
+    from flask.json.provider import DefaultJSONProvider
+
+    class FastJSONProvider(DefaultJSONProvider):
+        # key order follows the serializers; sorting every payload is wasted work
+        sort_keys = False
+
+        def dumps(self, obj, **kwargs):
+            if not ORJSON_AVAILABLE or kwargs:
+                return super().dumps(obj, **kwargs)
+            # datetimes keep Flask's HTTP-date formatting via DefaultJSONProvider.default
+            return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME).decode()
+
+        def response(self, *args, **kwargs):
+            obj = self._prepare_response_obj(args, kwargs)
+            with timed_serialization():
+                if not ORJSON_AVAILABLE:
+                    return super().response(*args, **kwargs)
+                body = orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+            return self._app.response_class(body, mimetype=self.mimetype)
+
+    app.json = FastJSONProvider(app)
+
+    if not app.config.get("RESPONSE_COMPRESSION", True):
+        return
+    min_size = app.config.get("COMPRESS_MIN_SIZE", 1024)
+    compressed = _CompressedCache()
+
+    @app.after_request
+    def _compress(response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or "Content-Encoding" in response.headers
+                or not (response.mimetype or "").startswith(COMPRESSIBLE)):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = choose_encoding(request.headers.get("Accept-Encoding"))
+        body = response.get_data()
+        if encoding is None or len(body) < min_size:
+            return response
+        etag = response.headers.get("ETag")
+        key = (etag, encoding, len(body), zlib.crc32(body)) if etag else None
+        data = compressed.get(key) if key else None
+        if data is None:
+            data = compress(body, encoding)
+            if key:
+                compressed.set(key, data)
+        response.set_data(data)
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+
+@lru_cache(maxsize=None)
+def fastapi_response_class():
+    """ORJSONResponse when orjson is installed, for APIRouter(default_response_class=...)."""
+    from fastapi.responses import JSONResponse, ORJSONResponse
+
+    class TimedJSONResponse(ORJSONResponse if ORJSON_AVAILABLE else JSONResponse):
+        # encode time shows up in Server-Timing / metrics as "ser"
+        def render(self, content):
+            with timed_serialization():
+                return super().render(content)
+
+    return TimedJSONResponse
+
+
+# -----------------------------
+# Benchmark: python -m app.core.serialization
+# -----------------------------
+def _bench(posts=20, rounds=2000):
+    from datetime import datetime
+    from types import SimpleNamespace
+
+    author = SimpleNamespace(id=7, first_name="Thandi", last_name="Mokoena", profile_picture="/uploads/ab/cd/x.jpg")
+    rows = [SimpleNamespace(
+        id=i, text="Looking for a plumber in Soweto this weekend " * 3, media=f"/uploads/ab/cd/{i:064x}.jpg",
+        media_type="image", media_variants={"thumb": {"webp": "/t.webp", "jpeg": "/t.jpg"}, "sizes": {}},
+        approvals=i * 3, shares=i, comments_count=i % 5, created_at=datetime(2026, 10, 17, 12, i % 60), author=author,
+    ) for i in range(posts)]
+
+    def baseline():
+        out = [{
+            "id": p.id, "text": p.text, "media": p.media, "mediaType": p.media_type,
+            "mediaVariants": p.media_variants, "approvals": p.approvals or 0, "shares": p.shares or 0,
+            "commentsCount": p.comments_count or 0,
+            "createdAt": p.created_at.isoformat() if p.created_at else None,
+            "user": {
+                "id": p.author.id if p.author else None,
+                "firstName": getattr(p.author, "first_name", None),
+                "lastName": getattr(p.author, "last_name", None),
+                "avatarUrl": getattr(p.author, "profile_picture", None),
+            },
+        } for p in rows]
+        return json.dumps({"posts": out, "hasMore": True, "nextCursor": "abc"}).encode()
+
+    from app.models import POST_OUT as FEED_POST
+
+    def fast():
+        return dumps({"posts": FEED_POST.many(rows), "hasMore": True, "nextCursor": "abc"})
+
+    assert loads(baseline()) == loads(fast())
+    results = {}
+    for name, fn in (("dict loop + json", baseline), ("serializer + " + ("orjson" if ORJSON_AVAILABLE else "json"), fast)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fn()
+        results[name] = (time.perf_counter() - start) / rounds * 1e6
+    size = len(fast())
+    for name, us in results.items():
+        print(f"{name:<28} {us:8.1f} µs/page")
+    base, new = results.values()
+    print(f"speedup {base / new:.2f}x  ({posts} posts, {size} bytes"
+          + (f", gzip {len(compress(fast(), 'gzip'))} bytes)" if size else ")"))
+
+
+if __name__ == "__main__":
+    _bench()
@@ -0,0 +1,156 @@
+# backend/app/core/timeline.py
+import heapq
+from datetime import datetime
+
+from sqlalchemy import and_, bindparam, delete, func, insert, literal, or_, select
+from sqlalchemy.exc import IntegrityError
+
+from app.core.counters import increment
+from app.core.pagination import encode_cursor, decode_cursor, DEFAULT_LIMIT
+
+FANOUT_LIMIT = 10000  # authors with this many followers are merged in at read time instead
+BACKFILL_POSTS = 50  # recent posts copied into a timeline on follow
+MAX_ENTRIES = 800  # per-user rows kept by trim(); older pages come from nowhere, like most feeds
+
+
+def _older_than(created_col, id_col, cursor):
+    at, row_id = decode_cursor(cursor)
+    return or_(created_col < at, and_(created_col == at, id_col < row_id))
+
+
+# -----------------------------
+# Follow graph
+# -----------------------------
+def follow(session, models, follower_id, followee_id, fanout_limit=FANOUT_LIMIT, backfill=BACKFILL_POSTS):
+    """
+    Add the edge, bump followers_count and copy the author's recent posts
+    into the follower's timeline (skipped for fan-out-on-read authors,
+    whose posts are merged at read time anyway). Following twice is a
+    no-op. Returns False when the edge already existed. Caller commits.
+    """
+    user_model, post_model, follow_model, entry_model = models
+    try:
+        with session.begin_nested():
+            session.execute(insert(follow_model.__table__).values(
+                follower_id=follower_id, followee_id=followee_id, created_at=datetime.utcnow(),
+            ))
+    except IntegrityError:
+        return False
+    followers = increment(session, user_model, followee_id, "followers_count")
+    if followers is not None and followers < fanout_limit:
+        posts = post_model.__table__
+        recent = (
+            select(literal(follower_id), posts.c.id, posts.c.user_id, posts.c.created_at)
+            .where(posts.c.user_id == followee_id)
+            .order_by(posts.c.created_at.desc(), posts.c.id.desc())
+            .limit(backfill)
+        )
+        entries = entry_model.__table__
+        session.execute(insert(entries).from_select(["user_id", "post_id", "author_id", "created_at"], recent))
+    return True
+
+
+def unfollow(session, models, follower_id, followee_id):
+    """Remove the edge and the author's rows from the follower's timeline. Caller commits."""
+    user_model, _, follow_model, entry_model = models
+    follows = follow_model.__table__
+    removed = session.execute(
+        delete(follows).where(follows.c.follower_id == follower_id, follows.c.followee_id == followee_id)
+    ).rowcount
+    if not removed:
+        return False
+    increment(session, user_model, followee_id, "followers_count", -1)
+    entries = entry_model.__table__
+    session.execute(delete(entries).where(entries.c.user_id == follower_id, entries.c.author_id == followee_id))
+    return True
+
+
+# -----------------------------
+# Fan-out on write
+# -----------------------------
+def fan_out(session, models, post_id, author_id, created_at, followers_count, fanout_limit=FANOUT_LIMIT):
+    """
+    Write a new post into its author's timeline and, below `fanout_limit`
+    followers, into every follower's: one INSERT ... SELECT over the
+    followee index, so an author with no followers costs one index probe.
+    Returns the number of timelines written. Caller commits.
+    """
+    _, _, follow_model, entry_model = models
+    entries = entry_model.__table__
+    row = {"post_id": post_id, "author_id": author_id, "created_at": created_at}
+    session.execute(insert(entries).values(user_id=author_id, **row))
+    if followers_count is not None and followers_count >= fanout_limit:
+        return 1
+    follows = follow_model.__table__
+    readers = select(
+        follows.c.follower_id, literal(post_id), literal(author_id), literal(created_at, entries.c.created_at.type),
+    ).where(follows.c.followee_id == author_id)
+    result = session.execute(insert(entries).from_select(["user_id", "post_id", "author_id", "created_at"], readers))
+    return 1 + max(result.rowcount or 0, 0)
+
+
+def trim(session, entry_model, keep=MAX_ENTRIES):
+    """Drop timeline rows past the newest `keep` per user. Returns rows deleted. Caller commits."""
+    entries = entry_model.__table__
+    # only users over the cap get ranked
+    crowded = select(entries.c.user_id).group_by(entries.c.user_id).having(func.count() > keep)
+    ranked = select(
+        entries.c.user_id, entries.c.post_id,
+        func.row_number().over(
+            partition_by=entries.c.user_id,
+            order_by=(entries.c.created_at.desc(), entries.c.post_id.desc()),
+        ).label("rank"),
+    ).where(entries.c.user_id.in_(crowded)).subquery()
+    stale = session.execute(select(ranked.c.user_id, ranked.c.post_id).where(ranked.c.rank > keep)).all()
+    if stale:
+        session.execute(
+            delete(entries).where(entries.c.user_id == bindparam("uid"), entries.c.post_id == bindparam("pid")),
+            [{"uid": user_id, "pid": post_id} for user_id, post_id in stale],
+        )
+    return len(stale)
+
+
+# -----------------------------
+# Home feed
+# -----------------------------
+def home(session, models, user_id, cursor=None, limit=DEFAULT_LIMIT, fanout_limit=FANOUT_LIMIT):
+    """
+    One page of `user_id`'s home feed as (post_ids, next_cursor, has_more).
+    The materialized rows are a single range read on
+    (user_id, created_at, post_id); posts by followed fan-out-on-read
+    authors come from the (user_id, created_at, id) index on posts and
+    are merged in. Load the posts themselves by id afterwards.
+    """
+    user_model, post_model, follow_model, entry_model = models
+    entries = entry_model.__table__
+    query = select(entries.c.created_at, entries.c.post_id).where(entries.c.user_id == user_id)
+    if cursor:
+        query = query.where(_older_than(entries.c.created_at, entries.c.post_id, cursor))
+    streams = [session.execute(
+        query.order_by(entries.c.created_at.desc(), entries.c.post_id.desc()).limit(limit + 1)
+    ).all()]
+
+    follows, users = follow_model.__table__, user_model.__table__
+    celebrities = select(follows.c.followee_id).join(users, users.c.id == follows.c.followee_id).where(
+        follows.c.follower_id == user_id, users.c.followers_count >= fanout_limit,
+    )
+    celebrity_ids = session.execute(celebrities).scalars().all()
+    if celebrity_ids:
+        posts = post_model.__table__
+        query = select(posts.c.created_at, posts.c.id).where(posts.c.user_id.in_(celebrity_ids))
+        if cursor:
+            query = query.where(_older_than(posts.c.created_at, posts.c.id, cursor))
+        streams.append(session.execute(
+            query.order_by(posts.c.created_at.desc(), posts.c.id.desc()).limit(limit + 1)
+        ).all())
+
+    # newest first across both sources; an author who crossed the limit can appear in both
+    merged, seen = [], set()
+    for created_at, post_id in heapq.merge(*streams, key=lambda r: (r[0] or datetime.min, r[1]), reverse=True):
+        if post_id not in seen:
+            seen.add(post_id)
+            merged.append((created_at, post_id))
+    has_more = len(merged) > limit
+    page = merged[:limit]
+    next_cursor = encode_cursor(*page[-1]) if has_more else None
+    return [post_id for _, post_id in page], next_cursor, has_more
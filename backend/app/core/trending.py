@@ -0,0 +1,117 @@
+# backend/app/core/trending.py
+import time
+from datetime import datetime
+
+from sqlalchemy import bindparam, func, insert, select, update
+
+from app.core.analytics import counters
+
+# points per event; comments weigh most since they mean people are talking
+WEIGHTS = {"posts": 1.0, "approvals": 1.0, "shares": 2.0, "comments": 3.0}
+HALF_LIFE_HOURS = 12.0
+FLOOR = 0.01  # scores below this are zeroed and drop out of the decay pass
+MAX_RANK = 200  # deepest trending position served
+DECAY_CLOCK = "_trending_decayed_at"  # analytics_counters row: unix time of the last decay
+
+
+def decay_factor(elapsed_seconds, half_life_hours=HALF_LIFE_HOURS):
+    return 0.5 ** (elapsed_seconds / (half_life_hours * 3600.0))
+
+
+def initial_score(approvals=0, shares=0, comments=0, created_at=None, now=None, half_life_hours=HALF_LIFE_HOURS):
+    """Score a post would have reached by `now`; used for backfills."""
+    raw = (WEIGHTS["posts"] + WEIGHTS["approvals"] * (approvals or 0)
+           + WEIGHTS["shares"] * (shares or 0) + WEIGHTS["comments"] * (comments or 0))
+    if created_at is None:
+        return raw
+    age = max(((now or datetime.utcnow()) - created_at).total_seconds(), 0)
+    score = raw * decay_factor(age, half_life_hours)
+    return score if score >= FLOOR else 0.0
+
+
+# -----------------------------
+# Incremental updates
+# -----------------------------
+def bump(session, model, row_id, event, n=1):
+    """
+    Add this event's weight to posts.hot_score in one UPDATE, inside the
+    caller's transaction. Decay is applied separately by decay(), so the
+    write path never reads the old score.
+    """
+    table = model.__table__
+    col = table.c.hot_score
+    session.execute(
+        update(table).where(table.c.id == row_id).values(hot_score=func.coalesce(col, 0) + WEIGHTS[event] * n)
+    )
+
+
+def bump_many(session, model, event, deltas):
+    """{row_id: count} for one event type, as a single executemany (write-behind flushes)."""
+    table = model.__table__
+    col = table.c.hot_score
+    stmt = update(table).where(table.c.id == bindparam("row_id")).values(hot_score=func.coalesce(col, 0) + bindparam("points"))
+    params = [{"row_id": row_id, "points": WEIGHTS[event] * n} for row_id, n in deltas.items() if n]
+    if params:
+        session.execute(stmt, params)
+    return len(params)
+
+
+# -----------------------------
+# Periodic decay
+# -----------------------------
+def decay(session, model, elapsed_seconds, half_life_hours=HALF_LIFE_HOURS):
+    """
+    Multiply every live score by the decay for `elapsed_seconds`, and zero
+    the ones that fall under FLOOR. Posts already at zero are not touched,
+    so each run costs the number of recently active posts, not the table.
+    updated_at is left alone: the feed ETag follows edits and engagement,
+    not the clock. Returns rows decayed. Caller commits.
+    """
+    table = model.__table__
+    col = table.c.hot_score
+    factor = decay_factor(elapsed_seconds, half_life_hours)
+    keep = {"updated_at": table.c.updated_at} if "updated_at" in table.c else {}
+    session.execute(update(table).where(col > 0, col * factor < FLOOR).values(hot_score=0, **keep))
+    return session.execute(update(table).where(col > 0).values(hot_score=col * factor, **keep)).rowcount
+
+
+def decay_since_last(session, model, half_life_hours=HALF_LIFE_HOURS, now=None):
+    """
+    decay() by the time since the previous run, read from the DECAY_CLOCK
+    row, so late, skipped or doubled cron runs still age scores by the real
+    elapsed time. The first run only starts the clock. The clock moves with
+    a compare-and-set in the same transaction as the decay, so of two
+    overlapping runs one decays and the other returns 0.
+    Returns (rows decayed, seconds elapsed). Caller commits.
+    """
+    now = int(now if now is not None else time.time())
+    last = session.execute(select(counters.c.value).where(counters.c.metric == DECAY_CLOCK)).scalar()
+    if last is None:
+        session.execute(insert(counters).values(metric=DECAY_CLOCK, value=now))
+        return 0, 0
+    elapsed = now - last
+    if elapsed <= 0:
+        return 0, 0
+    moved = session.execute(
+        update(counters).where(counters.c.metric == DECAY_CLOCK, counters.c.value == last).values(value=now)
+    ).rowcount
+    if not moved:
+        return 0, 0
+    return decay(session, model, elapsed, half_life_hours), elapsed
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+def top(query, model, offset=0, limit=20):
+    """
+    Posts ranked by hot_score, as (items, has_more). The order is the
+    (hot_score, id) index read backwards and stops after offset + limit
+    rows: a top-K read, never a sort of the whole table.
+    """
+    offset = max(0, min(offset, MAX_RANK))
+    limit = max(0, min(limit, MAX_RANK - offset))
+    rows = (query.filter(model.hot_score > 0)
+            .order_by(model.hot_score.desc(), model.id.desc())
+            .offset(offset).limit(limit + 1).all())
+    return rows[:limit], len(rows) > limit and offset + limit < MAX_RANK
@@ -0,0 +1,234 @@
+# backend/app/core/upload_stream.py
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from starlette.concurrency import run_in_threadpool
+
+CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, limit):
+        super().__init__(f"upload exceeds {limit} bytes")
+        self.limit = limit
+
+
+class UnknownUpload(Exception):
+    pass
+
+
+class UploadExpired(UnknownUpload):
+    """Session older than its ttl; its bytes are left for purge_stale()."""
+
+
+class OffsetMismatch(Exception):
+    def __init__(self, offset):
+        super().__init__(f"expected offset {offset}")
+        self.offset = offset
+
+
+# -----------------------------
+# Single-request streaming
+# -----------------------------
+async def iter_upload(upload, chunk_size=CHUNK_SIZE):
+    """Yield an UploadFile in fixed-size chunks instead of one read()."""
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _open_writer(path, mode, hasher):
+    fh = open(path, mode)
+
+    def write(chunk):
+        # hash + write together so the event loop never touches either
+        hasher.update(chunk)
+        fh.write(chunk)
+
+    return fh, write
+
+
+async def save_stream(chunks, dest, max_bytes):
+    """
+    Write an async iterator of byte chunks to `dest` through the thread pool,
+    enforcing `max_bytes` as data arrives and hashing on the fly.
+    The file only appears at `dest` once complete. Returns (size, sha256).
+    """
+    tmp = f"{dest}.part"
+    hasher = hashlib.sha256()
+    size = 0
+    fh, write = await run_in_threadpool(_open_writer, tmp, "wb", hasher)
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            await run_in_threadpool(write, chunk)
+    except BaseException:
+        await run_in_threadpool(fh.close)
+        await run_in_threadpool(_remove, tmp)
+        raise
+    await run_in_threadpool(fh.close)
+    await run_in_threadpool(os.replace, tmp, dest)
+    return size, hasher.hexdigest()
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _hash_file(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+# -----------------------------
+# Resumable uploads
+# -----------------------------
+class ResumableUploads:
+    """
+    Resumable uploads for flaky connections (tus-style offsets).
+
+    Session metadata lives next to the partial file under
+    `<root>/.partial/`, so any worker sharing the disk can resume a
+    session and the byte offset is simply the partial file's size.
+    """
+
+    def __init__(self, root, max_bytes, ttl=24 * 3600):
+        self.root = Path(root)
+        self.partial = self.root / ".partial"
+        self.partial.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._hashers = {}  # id -> (offset, sha256) while chunks arrive in order on this worker
+        self._locks = {}  # id -> [asyncio.Lock, requests holding or waiting]; dropped when unused
+
+    def _meta_path(self, upload_id):
+        return self.partial / f"{upload_id}.json"
+
+    def _data_path(self, upload_id):
+        return self.partial / f"{upload_id}.part"
+
+    def _load(self, upload_id):
+        if not upload_id.isalnum():
+            raise UnknownUpload(upload_id)
+        try:
+            meta = json.loads(self._meta_path(upload_id).read_text())
+        except FileNotFoundError:
+            raise UnknownUpload(upload_id)
+        if meta.get("created", 0) < time.time() - self.ttl:
+            raise UploadExpired(upload_id)
+        data = self._data_path(upload_id)
+        meta["offset"] = data.stat().st_size if data.exists() else 0
+        return meta
+
+    def create(self, name, total):
+        if total > self.max_bytes:
+            raise UploadTooLarge(self.max_bytes)
+        upload_id = uuid.uuid4().hex
+        meta = {"id": upload_id, "name": name, "total": total, "created": time.time()}
+        self._meta_path(upload_id).write_text(json.dumps(meta))
+        self._data_path(upload_id).touch()
+        meta["offset"] = 0
+        return meta
+
+    def status(self, upload_id):
+        return self._load(upload_id)
+
+    @asynccontextmanager
+    async def _locked(self, upload_id):
+        # no await between lookup and count, so the event loop makes this atomic
+        entry = self._locks.get(upload_id)
+        if entry is None:
+            entry = self._locks[upload_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1] and self._locks.get(upload_id) is entry:
+                del self._locks[upload_id]
+
+    async def append(self, upload_id, offset, chunks):
+        """
+        Append chunks at `offset` (must equal the bytes already stored).
+        Returns the updated session; when the last byte arrives the file is
+        moved into the upload root and "name"/"sha256" are final.
+        """
+        # unknown or expired ids are turned away before they get a lock
+        await run_in_threadpool(self._load, upload_id)
+        async with self._locked(upload_id):
+            meta = await run_in_threadpool(self._load, upload_id)
+            if offset != meta["offset"]:
+                raise OffsetMismatch(meta["offset"])
+
+            cached = self._hashers.pop(upload_id, None)
+            if cached and cached[0] == offset:
+                hasher = cached[1]
+            elif offset == 0:
+                hasher = hashlib.sha256()
+            else:
+                hasher = None  # resumed on another worker; hash the file once complete
+            fh, write = await run_in_threadpool(
+                _open_writer, self._data_path(upload_id), "ab", hasher or hashlib.sha256()
+            )
+            written = offset
+            try:
+                async for chunk in chunks:
+                    if written + len(chunk) > meta["total"]:
+                        raise UploadTooLarge(meta["total"])
+                    await run_in_threadpool(write, chunk)
+                    written += len(chunk)
+            finally:
+                await run_in_threadpool(fh.close)
+                # even a dropped connection leaves a valid prefix to resume from
+                if hasher is not None:
+                    self._hashers[upload_id] = (written, hasher)
+
+            meta["offset"] = written
+            if written == meta["total"]:
+                return await self._finish(meta)
+            return meta
+
+    async def _finish(self, meta):
+        upload_id = meta["id"]
+        cached = self._hashers.pop(upload_id, None)
+        if cached and cached[0] == meta["total"]:
+            digest = cached[1].hexdigest()
+        else:
+            digest = await run_in_threadpool(_hash_file, self._data_path(upload_id))
+        await run_in_threadpool(os.replace, self._data_path(upload_id), self.root / meta["name"])
+        await run_in_threadpool(_remove, self._meta_path(upload_id))
+        meta.update(sha256=digest, complete=True)
+        return meta
+
+    def purge_stale(self):
+        """Drop sessions older than `ttl` (run by `flask purge-uploads`); returns how many were removed."""
+        cutoff = time.time() - self.ttl
+        removed = 0
+        for meta_path in self.partial.glob("*.json"):
+            try:
+                created = json.loads(meta_path.read_text()).get("created", 0)
+            except (OSError, ValueError):
+                created = 0
+            if created < cutoff:
+                _remove(self.partial / f"{meta_path.stem}.part")
+                _remove(meta_path)
+                self._hashers.pop(meta_path.stem, None)
+                removed += 1
+        return removed
@@ -0,0 +1,108 @@
+# backend/app/core/user_index.py
+import json
+import re
+
+from sqlalchemy import and_, or_, func
+from app.models.user import User
+from app.models.user_term import UserTerm
+
+_WORD = re.compile(r"[\w+#.]+")  # keeps tokens like c++, c#, node.js intact
+
+
+def normalize(value):
+    if not value:
+        return None
+    value = " ".join(str(value).lower().split())
+    return value or None
+
+
+def terms_for(value):
+    """The normalized phrase plus each of its words, so 'Arc Welding' matches 'arc', 'weld', 'arc wel'."""
+    phrase = normalize(value)
+    if not phrase:
+        return set()
+    terms = {phrase[:200]}
+    terms.update(w[:200] for w in _WORD.findall(phrase))
+    return terms
+
+
+def parse_skills(raw):
+    """Skills as stored on the user row: JSON list or comma separated text."""
+    if not raw:
+        return []
+    if isinstance(raw, (list, tuple)):
+        return list(raw)
+    try:
+        val = json.loads(raw)
+        return val if isinstance(val, list) else [val]
+    except Exception:
+        return [s.strip() for s in str(raw).split(",") if s.strip()]
+
+
+# -----------------------------
+# Index maintenance
+# -----------------------------
+def index_user(db, user_id, skills=None, location=None):
+    """Replace a user's skill/location terms. Caller commits."""
+    db.query(UserTerm).filter(UserTerm.user_id == user_id).delete(synchronize_session=False)
+    rows = set()
+    for skill in skills or []:
+        rows.update(("skill", t) for t in terms_for(skill))
+    rows.update(("location", t) for t in terms_for(location))
+    db.bulk_insert_mappings(UserTerm, [{"user_id": user_id, "kind": k, "term": t} for k, t in rows])
+
+
+def rebuild(db, batch_size=500):
+    """Backfill the index from every user row."""
+    db.query(UserTerm).delete(synchronize_session=False)
+    last_id = 0
+    while True:
+        users = db.query(User).filter(User.id > last_id).order_by(User.id).limit(batch_size).all()
+        if not users:
+            break
+        for u in users:
+            index_user(db, u.id, parse_skills(getattr(u, "skills", None)), u.location)
+        last_id = users[-1].id
+        db.commit()
+
+
+# -----------------------------
+# Lookup
+# -----------------------------
+def _prefix(kind, q):
+    # range form of LIKE 'q%' that any b-tree index can serve
+    return and_(UserTerm.kind == kind, UserTerm.term >= q, UserTerm.term < q + "\uffff")
+
+
+def search(db, skill=None, location=None, offset=0, limit=20):
+    """
+    Ids of discoverable users matching skill OR location by term prefix,
+    ordered by id, plus the total number of matches.
+    """
+    skill_q, loc_q = normalize(skill), normalize(location)
+    clauses = []
+    if skill_q:
+        clauses.append(_prefix("skill", skill_q))
+    if loc_q:
+        clauses.append(_prefix("location", loc_q))
+
+    if clauses:
+        matched = db.query(UserTerm.user_id).filter(or_(*clauses)).distinct().subquery()
+        q = db.query(User.id).join(matched, matched.c.user_id == User.id)
+    else:
+        q = db.query(User.id)
+    q = q.filter(User.discoverable.isnot(False))
+
+    total = q.with_entities(func.count()).scalar()
+    ids = [row[0] for row in q.order_by(User.id).offset(offset).limit(limit).all()]
+    return ids, total
+
+
+if __name__ == "__main__":
+    from app.core.database import SessionLocal, engine, Base
+    Base.metadata.create_all(bind=engine, tables=[UserTerm.__table__])
+    session = SessionLocal()
+    try:
+        rebuild(session)
+    finally:
+        session.close()
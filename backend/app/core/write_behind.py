@@ -0,0 +1,175 @@
+# backend/app/core/write_behind.py
+import logging
+import threading
+import time
+from collections import defaultdict
+
+log = logging.getLogger(__name__)
+
+
+class CounterBuffer:
+    """
+    In-process write-behind buffer for hot counters (approvals, shares).
+
+    Deltas are coalesced per (row_id, column) and handed to `flush_fn` as
+    {column: {row_id: delta}} every `interval_ms` or once `max_events`
+    increments are pending, whichever comes first. `flush_fn` is expected
+    to apply the whole batch in one transaction. Deltas from a failed
+    flush are merged back and retried on the next cycle.
+    """
+
+    def __init__(self, flush_fn, interval_ms=250, max_events=500):
+        self._flush_fn = flush_fn
+        self._interval = interval_ms / 1000.0
+        self._max_events = max_events
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._pending = defaultdict(int)
+        self._inflight = defaultdict(int)
+        self._pending_events = 0
+        # a flush is between taking its batch and clearing it from _inflight;
+        # _generation counts finished ones so readers can spot a commit mid-read
+        self._flushing = False
+        self._generation = 0
+        self._stats = {"flushes": 0, "flushed_rows": 0, "flushed_events": 0, "flush_errors": 0, "last_flush_ms": 0.0}
+
+    # -----------------------------
+    # Producer side
+    # -----------------------------
+    def _enqueue(self, row_id, column, delta):
+        # caller holds self._lock
+        key = (row_id, column)
+        self._pending[key] += delta
+        self._pending_events += 1
+        return self._pending[key] + self._inflight.get(key, 0), self._pending_events >= self._max_events
+
+    def add(self, row_id, column, delta=1):
+        """Queue a delta; returns the total not yet visible in the database."""
+        with self._lock:
+            unflushed, full = self._enqueue(row_id, column, delta)
+        if full:
+            self._wake.set()
+        return unflushed
+
+    def add_and_read(self, row_id, column, read_stored, delta=1):
+        """
+        Queue a delta and return stored + unflushed as one consistent total.
+        `read_stored()` returns the committed value, or None when the row is
+        gone (nothing is queued then). A flush that commits while the value
+        is being read would make the sum skip or double its batch, so the
+        read is retried when one did, and taken under the flush lock if
+        flushes keep landing.
+        """
+        for _ in range(2):
+            with self._lock:
+                seen = self._generation
+            stored = read_stored()
+            if stored is None:
+                return None
+            with self._lock:
+                if self._generation == seen and not self._flushing:
+                    unflushed, full = self._enqueue(row_id, column, delta)
+                    break
+        else:
+            with self._flush_lock:
+                stored = read_stored()
+                if stored is None:
+                    return None
+                with self._lock:
+                    unflushed, full = self._enqueue(row_id, column, delta)
+        if full:
+            self._wake.set()
+        return stored + unflushed
+
+    def pending(self, row_id, column):
+        """Delta queued or mid-flush for one counter (for optimistic reads)."""
+        key = (row_id, column)
+        with self._lock:
+            return self._pending.get(key, 0) + self._inflight.get(key, 0)
+
+    # -----------------------------
+    # Flushing
+    # -----------------------------
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                taken, self._pending = self._pending, defaultdict(int)
+                events, self._pending_events = self._pending_events, 0
+                for key, delta in taken.items():
+                    self._inflight[key] += delta
+                self._flushing = True
+
+            batch = defaultdict(dict)
+            for (row_id, column), delta in taken.items():
+                if delta:
+                    batch[column][row_id] = delta
+
+            started = time.perf_counter()
+            try:
+                self._flush_fn(dict(batch))
+            except Exception:
+                log.exception("counter flush failed; retrying %d deltas next cycle", len(taken))
+                with self._lock:
+                    for key, delta in taken.items():
+                        self._pending[key] += delta
+                    self._pending_events += events
+                    self._stats["flush_errors"] += 1
+                ok = False
+            else:
+                ok = True
+            finally:
+                with self._lock:
+                    for key, delta in taken.items():
+                        self._inflight[key] -= delta
+                        if not self._inflight[key]:
+                            del self._inflight[key]
+                    self._flushing = False
+                    self._generation += 1
+
+            if not ok:
+                return 0
+            with self._lock:
+                self._stats["flushes"] += 1
+                self._stats["flushed_rows"] += len(taken)
+                self._stats["flushed_events"] += events
+                self._stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            return len(taken)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            self.flush()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="counter-write-behind", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the flusher and write out whatever is still pending."""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+    def metrics(self):
+        with self._lock:
+            return {
+                "pending_counters": len(self._pending),
+                "pending_events": self._pending_events,
+                "pending_delta": sum(self._pending.values()),
+                "inflight_counters": len(self._inflight),
+                **self._stats,
+            }
@@ -1,13 +1,13 @@
 # main.py
 import os
+import click
 from datetime import datetime, timedelta
 from pathlib import Path
 from urllib.parse import urljoin
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, abort
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import (
     JWTManager,
     create_access_token,
@@ -16,6 +16,22 @@ from flask_jwt_extended import (
 )
 from werkzeug.utils import secure_filename
 from config import Config
+from app.core.pagination import keyset_page, approximate_count, clamp_limit, InvalidCursor
+from app.core.counters import increment, reconcile_comment_counts
+from app.core.media_store import MediaStore, acquire, release, key_from_url, collect_garbage, digest_of
+from app.core.media_pipeline import shared_pipeline
+from app.core.media_serving import serve_upload
+from app.core import analytics
+from app.core.database import engine_options, pool_stats
+from app.core.replicas import RoutingSession, init_read_replicas
+from app.core.principal import current_principal, principals
+from app.core import response_cache
+from app.core.response_cache import cached_response, invalidate
+from app.core.serialization import Serializer, init_json, iso, or_zero
+from app.core.metrics import init_metrics
+from app.core.conditional import weak_etag, table_version, latest, not_modified, with_validators
+from app.core.hashing import HashPool, HasherBusy, WerkzeugBackend
+from sqlalchemy.orm import selectinload
 
 # Optional cloudinary
 try:
@@ -27,19 +43,34 @@ except Exception:
 
 basedir = Path(__file__).resolve().parent
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 jwt = JWTManager()
 
 
 def create_app(config_class=Config):
     app = Flask(__name__, static_folder="frontend", static_url_path="/")
     app.config.from_object(config_class)
+    # shared pool sizing; importing app.core.database also installs the SQLite pragmas
+    app.config.setdefault(
+        "SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config["SQLALCHEMY_DATABASE_URI"], config_class)
+    )
 
     # ensure upload folder exists
     os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 
+    # password hashing runs on a bounded pool so a login burst can't pin every worker
+    passwords = HashPool(
+        WerkzeugBackend(app.config["PASSWORD_HASH_METHOD"]),
+        workers=app.config["HASH_WORKERS"],
+        max_queue=app.config["HASH_QUEUE_MAX"],
+    )
+
     CORS(app, supports_credentials=True)
+    init_metrics(app)
+    init_json(app)
     db.init_app(app)
+    app.extensions["response_cache"] = response_cache.from_config(app.config)
+    init_read_replicas(app, lambda url: engine_options(url, config_class))
     jwt.init_app(app)
 
     @app.route("/")
@@ -47,6 +78,11 @@ def create_app(config_class=Config):
         return jsonify({"message": "VSXchangeZA backend running."})
 
     # --- Models ---
+    # These tables (user/post/comment/media_blobs) are not under the alembic
+    # migrations, which manage the users/posts schema of the blueprint app;
+    # they come only from db.create_all() (see __main__). create_all never
+    # alters an existing table, so a database created before a column was
+    # added here (e.g. *_variants) has to be recreated or altered by hand.
     class User(db.Model):
         id = db.Column(db.Integer, primary_key=True)
         username = db.Column(db.String(80), unique=True, nullable=False)
@@ -55,41 +91,34 @@ def create_app(config_class=Config):
         display_name = db.Column(db.String(120))
         bio = db.Column(db.Text)
         profile_picture = db.Column(db.String(300))
+        profile_picture_variants = db.Column(db.JSON)
         created_at = db.Column(db.DateTime, default=datetime.utcnow)
+        updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
         posts = db.relationship("Post", backref="author", lazy=True)
         comments = db.relationship("Comment", backref="author", lazy=True)
 
         def to_dict(self):
-            return {
-                "id": self.id,
-                "username": self.username,
-                "email": self.email,
-                "display_name": self.display_name,
-                "bio": self.bio,
-                "profile_picture": self.profile_picture,
-                "created_at": self.created_at.isoformat(),
-            }
+            return user_out.one(self)
 
     class Post(db.Model):
+        __table_args__ = (
+            db.Index("ix_post_created_at_id", "created_at", "id"),
+            db.Index("ix_post_updated_at", "updated_at"),
+        )
         id = db.Column(db.Integer, primary_key=True)
         user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
         content = db.Column(db.Text, nullable=False)
         image = db.Column(db.String(300))
+        image_variants = db.Column(db.JSON)
+        comments_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
         created_at = db.Column(db.DateTime, default=datetime.utcnow)
+        updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
         comments = db.relationship("Comment", backref="post", lazy=True)
 
         def to_dict(self):
-            return {
-                "id": self.id,
-                "user_id": self.user_id,
-                "author": self.author.to_dict() if self.author else None,
-                "content": self.content,
-                "image": self.image,
-                "created_at": self.created_at.isoformat(),
-                "comments_count": len(self.comments),
-            }
+            return post_out.one(self)
 
     class Comment(db.Model):
         id = db.Column(db.Integer, primary_key=True)
@@ -99,31 +128,61 @@ def create_app(config_class=Config):
         created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
         def to_dict(self):
-            return {
-                "id": self.id,
-                "post_id": self.post_id,
-                "user_id": self.user_id,
-                "author": self.author.to_dict() if self.author else None,
-                "content": self.content,
-                "created_at": self.created_at.isoformat(),
-            }
+            return comment_out.one(self)
+
+    class MediaBlob(db.Model):
+        # one row per stored upload file; ref_count = posts/users pointing at it
+        __tablename__ = "media_blobs"
+        __table_args__ = (db.Index("ix_media_blobs_ref_count_updated_at", "ref_count", "updated_at"),)
+        key = db.Column(db.String(80), primary_key=True)  # ab/cd/<sha256>.<ext>
+        size = db.Column(db.Integer)
+        ref_count = db.Column(db.Integer, nullable=False, default=0)
+        created_at = db.Column(db.DateTime, default=datetime.utcnow)
+        updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # response shapes, compiled once (app.core.serialization.Serializer)
+    user_out = Serializer(
+        "id", "username", "email", "display_name", "bio", "profile_picture", "profile_picture_variants",
+        ("created_at", "created_at", iso),
+    )
+    post_out = Serializer(
+        "id", "user_id", ("author", "author", user_out.one_or_none), "content", "image", "image_variants",
+        ("created_at", "created_at", iso), ("comments_count", "comments_count", or_zero),
+    )
+    comment_out = Serializer(
+        "id", "post_id", "user_id", ("author", "author", user_out.one_or_none), "content",
+        ("created_at", "created_at", iso),
+    )
+
+    media_store = MediaStore(app.config["UPLOAD_FOLDER"])
+    media_pipeline = shared_pipeline(workers=app.config["MEDIA_WORKERS"], max_pending=app.config["MEDIA_QUEUE_MAX"])
 
     # --- Helpers ---
     def allowed_file(filename):
         ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
         return ext in app.config["ALLOWED_IMAGE_EXTENSIONS"]
 
-    def save_file_locally(file_storage, subfolder=""):
-        filename = secure_filename(file_storage.filename)
-        if subfolder:
-            dest_folder = Path(app.config["UPLOAD_FOLDER"]) / subfolder
-            dest_folder.mkdir(parents=True, exist_ok=True)
-        else:
-            dest_folder = Path(app.config["UPLOAD_FOLDER"])
-        dest_path = dest_folder / f"{int(datetime.utcnow().timestamp())}_{filename}"
-        file_storage.save(dest_path)
-        # return a relative URL
-        return urljoin(request.host_url, f"uploads/{subfolder}/{dest_path.name}") if subfolder else urljoin(request.host_url, f"uploads/{dest_path.name}")
+    def save_file_locally(file_storage):
+        # content-addressed: identical files are stored once and reference-counted
+        ext = secure_filename(file_storage.filename).rsplit(".", 1)[-1].lower()
+        key, size, _ = media_store.save(file_storage.stream, ext)
+        acquire(db.session, MediaBlob, key, size)
+        return urljoin(request.host_url, f"uploads/{key}")
+
+    def process_media(url, model, row_id, column):
+        # thumbnails/widths are built off the request path; the row is updated when done
+        key = key_from_url(url)
+        if not key:
+            return
+
+        def record(manifest):
+            with app.app_context():
+                model.query.filter_by(id=row_id).update({column: manifest})
+                db.session.commit()
+                # post images and author avatars both show up in cached feed pages
+                invalidate("feed", *([f"post:{row_id}"] if model is Post else []))
+
+        media_pipeline.submit(key, digest_of(key), on_done=record, root=app.config["UPLOAD_FOLDER"])
 
     def upload_to_cloudinary(file_storage, folder="vsxchange"):
         if not CLOUDINARY_AVAILABLE or not app.config.get("CLOUDINARY_URL"):
@@ -152,9 +211,10 @@ def create_app(config_class=Config):
         if User.query.filter((User.username == username) | (User.email == email)).first():
             return jsonify({"error": "username or email already exists"}), 400
 
-        pw_hash = generate_password_hash(password)
+        pw_hash = passwords.hash(password)
         user = User(username=username, email=email, password_hash=pw_hash)
         db.session.add(user)
+        analytics.record(db.session, "users")
         db.session.commit()
 
         access_token = create_access_token(identity=user.id, expires_delta=timedelta(days=7))
@@ -170,8 +230,15 @@ def create_app(config_class=Config):
             return jsonify({"error": "Missing credentials"}), 400
 
         user = User.query.filter((User.email == email_or_username.lower()) | (User.username == email_or_username)).first()
-        if not user or not check_password_hash(user.password_hash, password):
+        if not user:
+            return jsonify({"error": "Invalid credentials"}), 401
+        ok, new_hash = passwords.verify_and_update(password, user.password_hash)
+        if not ok:
             return jsonify({"error": "Invalid credentials"}), 401
+        if new_hash:
+            # stored hash predates the current PASSWORD_HASH_METHOD; upgrade it now
+            user.password_hash = new_hash
+            db.session.commit()
 
         token = create_access_token(identity=user.id, expires_delta=timedelta(days=7))
         return jsonify({"access_token": token, "user": user.to_dict()}), 200
@@ -179,19 +246,22 @@ def create_app(config_class=Config):
     @app.route("/auth/me", methods=["GET"])
     @jwt_required()
     def me():
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_principal(db.session, User)
         if not user:
             return jsonify({"error": "User not found"}), 404
-        return jsonify({"user": user.to_dict()})
+        etag = weak_etag("me", user.id, user.updated_at)
+        unchanged = not_modified(etag, user.updated_at)
+        if unchanged:
+            return unchanged
+        # to_dict only reads columns, so it renders the cached snapshot as well
+        return with_validators(jsonify({"user": User.to_dict(user)}), etag, user.updated_at)
 
     # --- Upload routes ---
 
     @app.route("/upload/profile", methods=["POST"])
     @jwt_required()
     def upload_profile_picture():
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_principal(db.session, User)
         if not user:
             return jsonify({"error": "User not found"}), 404
 
@@ -208,21 +278,26 @@ def create_app(config_class=Config):
             if app.config.get("CLOUDINARY_URL") and CLOUDINARY_AVAILABLE:
                 url = upload_to_cloudinary(file, folder=f"vsxchange/profiles/{user.id}")
             else:
-                # local save in uploads/profiles/
-                url = save_file_locally(file, subfolder="profiles")
+                url = save_file_locally(file)
         except Exception as e:
             app.logger.exception("Upload error")
             return jsonify({"error": "Upload failed", "details": str(e)}), 500
 
+        # the row itself is being written, so load it fresh rather than trusting the cache
+        user = db.session.get(User, user.id)
+        release(db.session, MediaBlob, key_from_url(user.profile_picture))
         user.profile_picture = url
+        user.profile_picture_variants = None
         db.session.commit()
+        principals.invalidate(User, user.id)
+        invalidate("feed")  # avatar is embedded in every post's author
+        process_media(url, User, user.id, "profile_picture_variants")
         return jsonify({"message": "Profile picture uploaded", "profile_picture": url})
 
     @app.route("/upload/post", methods=["POST"])
     @jwt_required()
     def upload_post_image():
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_principal(db.session, User)
         if not user:
             return jsonify({"error": "User not found"}), 404
 
@@ -238,7 +313,7 @@ def create_app(config_class=Config):
             if app.config.get("CLOUDINARY_URL") and CLOUDINARY_AVAILABLE:
                 url = upload_to_cloudinary(file, folder=f"vsxchange/posts/{user.id}")
             else:
-                url = save_file_locally(file, subfolder="posts")
+                url = save_file_locally(file)
         except Exception as e:
             app.logger.exception("Upload error")
             return jsonify({"error": "Upload failed", "details": str(e)}), 500
@@ -246,36 +321,73 @@ def create_app(config_class=Config):
         # Optionally create a post record with only image (frontend can later call posts/create)
         post = Post(user_id=user.id, content=request.form.get("content", ""), image=url)
         db.session.add(post)
+        analytics.record(db.session, "posts")
         db.session.commit()
+        process_media(url, Post, post.id, "image_variants")
         return jsonify({"message": "Post created with image", "post": post.to_dict()}), 201
 
     # Serve uploaded files locally (only for local dev)
     @app.route("/uploads/<path:filename>")
     def uploaded_file(filename):
-        upload_dir = Path(app.config["UPLOAD_FOLDER"])
-        # Make sure path traversal can't be used
-        safe_path = upload_dir / Path(filename).name
-        if not safe_path.exists():
-            return jsonify({"error": "Not found"}), 404
-        return send_from_directory(app.config["UPLOAD_FOLDER"], safe_path.name)
+        # safe join, cache headers, ETag/304 and Range handled in serve_upload
+        return serve_upload(app.config["UPLOAD_FOLDER"], filename)
 
     # --- Posts endpoints (basic) ---
     @app.route("/posts", methods=["GET"])
+    @cached_response(tags=["feed"], vary=("per_page", "page", "cursor"))
     def list_posts():
-        page = int(request.args.get("page", 1))
-        per_page = min(int(request.args.get("per_page", 20)), 50)
-        posts = Post.query.order_by(Post.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
-        return jsonify({
-            "items": [p.to_dict() for p in posts.items],
-            "page": posts.page,
-            "total": posts.total,
-            "pages": posts.pages
-        })
+        # any new/updated post or author moves these; answer 304 before loading the page
+        posts_at, max_post_id = table_version(db.session, Post)
+        users_at, _ = table_version(db.session, User)
+        last_modified = latest(posts_at, users_at)
+        etag = weak_etag("feed", posts_at, max_post_id, users_at, request.query_string.decode())
+        unchanged = not_modified(etag, last_modified)
+        if unchanged:
+            return unchanged
+
+        per_page = clamp_limit(request.args.get("per_page", 20), default=20)
+        # total is approximate and cached, so no COUNT(*) runs per page
+        total = approximate_count("post", lambda: Post.query.count())
+        cursor = request.args.get("cursor")
+        if "page" in request.args and not cursor:
+            # legacy page-number mode
+            page = int(request.args.get("page", 1))
+            posts = Post.query.options(selectinload(Post.author)).order_by(Post.created_at.desc(), Post.id.desc()).paginate(
+                page=page, per_page=per_page, error_out=False, count=False
+            )
+            return with_validators(jsonify({
+                "items": post_out.many(posts.items),
+                "page": posts.page,
+                "total": total,
+                "pages": (total + per_page - 1) // per_page
+            }), etag, last_modified)
+        try:
+            items, next_cursor, has_more = keyset_page(Post.query.options(selectinload(Post.author)), Post, cursor=cursor, limit=per_page)
+        except InvalidCursor:
+            return jsonify({"error": "Invalid cursor"}), 400
+        return with_validators(jsonify({
+            "items": post_out.many(items),
+            "nextCursor": next_cursor,
+            "hasMore": has_more,
+            "total": total
+        }), etag, last_modified)
 
     @app.route("/posts/<int:post_id>", methods=["GET"])
+    @cached_response(tags=lambda post_id: [f"post:{post_id}"])
     def get_post(post_id):
-        p = Post.query.get_or_404(post_id)
-        return jsonify({"post": p.to_dict()})
+        # post row (counters included) and its author are the whole payload
+        version = db.session.execute(
+            db.select(Post.updated_at, User.updated_at).join(User, Post.user_id == User.id).where(Post.id == post_id)
+        ).first()
+        if version is None:
+            abort(404)
+        last_modified = latest(*version)
+        etag = weak_etag("post", post_id, *version)
+        unchanged = not_modified(etag, last_modified)
+        if unchanged:
+            return unchanged
+        p = Post.query.options(selectinload(Post.author)).filter_by(id=post_id).first_or_404()
+        return with_validators(jsonify({"post": p.to_dict()}), etag, last_modified)
 
     @app.route("/posts/create", methods=["POST"])
     @jwt_required()
@@ -286,9 +398,15 @@ def create_app(config_class=Config):
         if not content and not image:
             return jsonify({"error": "content or image is required"}), 400
         current_user_id = get_jwt_identity()
+        image_key = key_from_url(image)
+        if image_key:
+            acquire(db.session, MediaBlob, image_key)
         post = Post(user_id=current_user_id, content=content, image=image)
         db.session.add(post)
+        analytics.record(db.session, "posts")
         db.session.commit()
+        invalidate("feed")
+        process_media(image, Post, post.id, "image_variants")
         return jsonify({"message": "post created", "post": post.to_dict()}), 201
 
     # Comments
@@ -299,30 +417,79 @@ def create_app(config_class=Config):
         content = data.get("content", "").strip()
         if not content:
             return jsonify({"error": "content required"}), 400
-        post = Post.query.get(post_id)
-        if not post:
+        # bump the denormalized count in the same transaction as the insert
+        if increment(db.session, Post, post_id, "comments_count") is None:
+            db.session.rollback()
             return jsonify({"error": "post not found"}), 404
         current_user_id = get_jwt_identity()
         comment = Comment(post_id=post_id, user_id=current_user_id, content=content)
         db.session.add(comment)
+        analytics.record(db.session, "comments")
         db.session.commit()
+        invalidate("feed", f"post:{post_id}")
         return jsonify({"message": "comment created", "comment": comment.to_dict()}), 201
 
-    # Simple analytics endpoints (counts)
+    # Analytics: maintained counters + hourly/daily rollups (app.core.analytics).
+    # History is backfilled from the source tables by `flask backfill-analytics`.
+    analytics_sources = {"users": User, "posts": Post, "comments": Comment}
+
     @app.route("/analytics/summary", methods=["GET"])
     def analytics_summary():
-        total_users = User.query.count()
-        total_posts = Post.query.count()
-        total_comments = Comment.query.count()
-        recent_24h_posts = Post.query.filter(Post.created_at >= datetime.utcnow() - timedelta(days=1)).count()
+        return jsonify(analytics.summary(db.session))
+
+    @app.route("/analytics/timeseries", methods=["GET"])
+    def analytics_timeseries():
+        metric = request.args.get("metric", "posts")
+        granularity = request.args.get("granularity", "day")
+        if metric not in analytics.METRICS or granularity not in analytics.GRANULARITIES:
+            return jsonify({"error": "unknown metric or granularity"}), 400
+        try:
+            since = datetime.fromisoformat(request.args["since"]) if request.args.get("since") else None
+            until = datetime.fromisoformat(request.args["until"]) if request.args.get("until") else None
+        except ValueError:
+            return jsonify({"error": "since/until must be ISO-8601"}), 400
+        points = analytics.timeseries(db.session, metric, granularity, since, until)
         return jsonify({
-            "users": total_users,
-            "posts": total_posts,
-            "comments": total_comments,
-            "posts_last_24h": recent_24h_posts
+            "metric": metric,
+            "granularity": granularity,
+            "points": [{"bucket": b.isoformat(), "value": v} for b, v in points]
+        })
+
+    @app.cli.command("reconcile-counters")
+    def reconcile_counters():
+        """Repair drift in denormalized post counters."""
+        fixed = reconcile_comment_counts(db.session, Post, Comment)
+        db.session.commit()
+        click.echo(f"repaired comments_count on {fixed} posts")
+
+    @app.cli.command("backfill-analytics")
+    @click.option("--force", is_flag=True, help="Rebuild even if a backfill already ran.")
+    def backfill_analytics(force):
+        """Rebuild analytics totals and rollups from the source tables (full scan)."""
+        done = analytics.backfill(db.session, analytics_sources, force=force)
+        click.echo("analytics backfilled" if done else "analytics already backfilled; --force to rebuild")
+
+    @app.cli.command("gc-media")
+    def gc_media():
+        """Delete stored uploads that nothing references any more."""
+        removed = collect_garbage(db.session, MediaBlob, media_store)
+        db.session.commit()
+        click.echo(f"removed {removed} unreferenced files")
+
+    @app.route("/metrics/db", methods=["GET"])
+    def db_metrics():
+        replicas = app.extensions.get("replicas")
+        return jsonify({
+            "primary": pool_stats(db.engine),
+            "replicas": [pool_stats(e) for e in replicas.engines] if replicas else [],
+            "routing": replicas.stats if replicas else {},
         })
 
     # --- Error handlers ---
+    @app.errorhandler(HasherBusy)
+    def hasher_busy(e):
+        return jsonify({"error": "Server busy, retry shortly"}), 503, {"Retry-After": str(e.retry_after)}
+
     @app.errorhandler(404)
     def not_found(e):
         return jsonify({"error": "Not found"}), 404
@@ -337,6 +504,7 @@ def create_app(config_class=Config):
     app.User = User
     app.Post = Post
     app.Comment = Comment
+    app.MediaBlob = MediaBlob
 
     return app
 
@@ -346,4 +514,5 @@ if __name__ == "__main__":
     # create tables if not exist (dev convenience)
     with app.app_context():
         db.create_all()
+        analytics.metadata.create_all(db.engine)
     app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 5000)), debug=True)
\ No newline at end of file
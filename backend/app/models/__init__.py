@@ -1,9 +1,8 @@
 # backend/app/models/__init__.py
-from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-
-# initialize db
-db = SQLAlchemy()
+from app import db  # the instance create_app() initializes; the routes query through it too
+from app.core.serialization import Serializer, iso, or_zero
+from app.core.trending import WEIGHTS
 
 # --- User model ---
 class User(db.Model):
@@ -18,6 +17,10 @@ class User(db.Model):
     posts = db.relationship("Post", backref="author", lazy=True)
     comments = db.relationship("Comment", backref="author", lazy=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # maintained on follow/unfollow; decides fan-out on write vs on read (app.core.timeline)
+    followers_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    # bumped on every UPDATE (ORM or Core); ETag/Last-Modified source
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     def to_dict(self):
         return {
@@ -32,32 +35,46 @@ class User(db.Model):
 # --- Post model ---
 class Post(db.Model):
     __tablename__ = "posts"
+    __table_args__ = (
+        # keyset pagination walks this index newest-first
+        db.Index("ix_posts_created_at_id", "created_at", "id"),
+        # max(updated_at) is the feed's ETag; the index makes it a single lookup
+        db.Index("ix_posts_updated_at", "updated_at"),
+        # one author's posts newest-first: timeline backfill and fan-out on read
+        db.Index("ix_posts_user_id_created_at_id", "user_id", "created_at", "id"),
+        # ?sort=trending reads the top of this index
+        db.Index("ix_posts_hot_score_id", "hot_score", "id"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     text = db.Column(db.Text, nullable=True)
     media = db.Column(db.String(255), nullable=True)  # image/video URL
     media_type = db.Column(db.String(20), nullable=True)  # "image" or "video"
+    media_variants = db.Column(db.JSON, nullable=True)  # thumb/width manifest from app.core.media_pipeline
     approvals = db.Column(db.Integer, default=0)
     shares = db.Column(db.Integer, default=0)
+    # maintained by app.core.counters on comment create; repaired by `flask reconcile-counters`
+    comments_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    # decayed engagement score: bumped per event, shrunk by `flask decay-trending` (app.core.trending)
+    hot_score = db.Column(db.Float, default=WEIGHTS["posts"], server_default="0", nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # bumped by every UPDATE, counter increments included
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     comments = db.relationship("Comment", backref="post", lazy=True)
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "text": self.text,
-            "media": self.media,
-            "mediaType": self.media_type,
-            "approvals": self.approvals,
-            "shares": self.shares,
-            "createdAt": self.created_at.isoformat() if self.created_at else None,
-            "user": {
-                "id": self.author.id if self.author else None,
-                "firstName": self.author.first_name if self.author else None,
-                "lastName": self.author.last_name if self.author else None,
-                "avatarUrl": self.author.profile_picture if self.author else None
-            }
-        }
+        return POST_OUT.one(self)
+
+# --- Media blob model ---
+class MediaBlob(db.Model):
+    # one row per stored upload file; ref_count = posts/users pointing at it
+    __tablename__ = "media_blobs"
+    __table_args__ = (db.Index("ix_media_blobs_ref_count_updated_at", "ref_count", "updated_at"),)
+    key = db.Column(db.String(80), primary_key=True)  # ab/cd/<sha256>.<ext>
+    size = db.Column(db.Integer)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 # --- Comment model ---
 class Comment(db.Model):
@@ -69,13 +86,85 @@ class Comment(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "text": self.content,
-            "createdAt": self.created_at.isoformat() if self.created_at else None,
-            "user": {
-                "id": self.author.id if self.author else None,
-                "firstName": self.author.first_name if self.author else None,
-                "lastName": self.author.last_name if self.author else None
-            }
-        }
\ No newline at end of file
+        return COMMENT_OUT.one(self)
+
+# --- Follow graph / home timeline (app.core.timeline) ---
+class Follow(db.Model):
+    __tablename__ = "follows"
+    __table_args__ = (
+        # followers of one author, for fan-out
+        db.Index("ix_follows_followee_id_follower_id", "followee_id", "follower_id"),
+    )
+    follower_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    followee_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class TimelineEntry(db.Model):
+    # materialized home feed: one row per (reader, post) written at post time
+    __tablename__ = "timeline_entries"
+    __table_args__ = (
+        db.Index("ix_timeline_entries_user_id_created_at_post_id", "user_id", "created_at", "post_id"),
+    )
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    post_id = db.Column(db.Integer, db.ForeignKey("posts.id"), primary_key=True)
+    author_id = db.Column(db.Integer, nullable=False)  # lets unfollow drop entries without joining posts
+    created_at = db.Column(db.DateTime, nullable=False)  # copy of posts.created_at
+
+# --- Messaging models (app.core.messaging) ---
+class Conversation(db.Model):
+    __tablename__ = "conversations"
+    id = db.Column(db.Integer, primary_key=True)
+    # "<low id>:<high id>" for one-to-one threads, so each pair has exactly one
+    direct_key = db.Column(db.String(40), unique=True, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # denormalized from the newest message for the inbox row
+    last_message_id = db.Column(db.Integer, nullable=True)
+    last_message_at = db.Column(db.DateTime, nullable=True)
+    last_message_preview = db.Column(db.String(200), nullable=True)
+    last_sender_id = db.Column(db.Integer, nullable=True)
+
+class ConversationMember(db.Model):
+    __tablename__ = "conversation_members"
+    __table_args__ = (
+        # the inbox: one user's threads newest-first, keyset-paged off this index alone
+        db.Index("ix_conversation_members_inbox", "user_id", "last_message_at", "conversation_id"),
+    )
+    conversation_id = db.Column(db.Integer, db.ForeignKey("conversations.id"), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    peer_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)  # the other side of a direct thread
+    # maintained on send / mark-read; never recounted on read
+    unread_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    last_read_message_id = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    last_message_at = db.Column(db.DateTime, nullable=True)  # copy of conversations.last_message_at
+    conversation = db.relationship("Conversation", lazy=True)
+    peer = db.relationship("User", foreign_keys=[peer_id], lazy=True)
+
+class Message(db.Model):
+    __tablename__ = "messages"
+    __table_args__ = (
+        # history pages walk (conversation_id, id) backwards; unread recounts use it too
+        db.Index("ix_messages_conversation_id_id", "conversation_id", "id"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    conversation_id = db.Column(db.Integer, db.ForeignKey("conversations.id"), nullable=False)
+    sender_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# --- Response shapes (compiled once; see app.core.serialization.Serializer) ---
+AUTHOR_BRIEF = Serializer("id", ("firstName", "first_name"), ("lastName", "last_name"))
+AUTHOR_CARD = Serializer("id", ("firstName", "first_name"), ("lastName", "last_name"), ("avatarUrl", "profile_picture"))
+POST_OUT = Serializer(
+    "id", "text", "media",
+    ("mediaType", "media_type"),
+    ("mediaVariants", "media_variants"),
+    ("approvals", "approvals", or_zero),
+    ("shares", "shares", or_zero),
+    ("commentsCount", "comments_count", or_zero),
+    ("createdAt", "created_at", iso),
+    ("user", "author", AUTHOR_CARD),
+)
+COMMENT_OUT = Serializer("id", ("text", "content"), ("createdAt", "created_at", iso), ("user", "author", AUTHOR_BRIEF))
+MESSAGE_OUT = Serializer(
+    "id", ("conversationId", "conversation_id"), ("senderId", "sender_id"), "text", ("createdAt", "created_at", iso),
+)
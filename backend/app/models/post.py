@@ -1,17 +1,28 @@
 # backend/app/models/post.py
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, func
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, Text, DateTime, Index, JSON, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.core.trending import WEIGHTS
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        # keyset pagination walks this index newest-first
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        Index("ix_posts_updated_at", "updated_at"),
+        Index("ix_posts_hot_score_id", "hot_score", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     text = Column(Text, nullable=True)
     media = Column(String(1024), nullable=True)
     media_type = Column(String(32), nullable=True)
+    media_variants = Column(JSON, nullable=True)
     approvals = Column(Integer, default=0)
     shares = Column(Integer, default=0)
+    comments_count = Column(Integer, default=0, server_default="0", nullable=False)
+    hot_score = Column(Float, default=WEIGHTS["posts"], server_default="0", nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     user = relationship("User", lazy="joined")
\ No newline at end of file
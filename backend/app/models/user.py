@@ -1,9 +1,17 @@
 # backend/app/models/user.py
-from sqlalchemy import Column, Integer, String, Text, Boolean
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, JSON, Numeric, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
 from app.core.database import Base
 
+# JSON1 text on SQLite, binary JSONB on Postgres; the driver hands back lists either way
+JSONList = JSON().with_variant(JSONB(), "postgresql")
+
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # containment lookups (skills @> '["welding"]') on Postgres; prefix search goes through user_terms
+        Index("ix_users_skills_gin", "skills", postgresql_using="gin", postgresql_ops={"skills": "jsonb_path_ops"}),
+    )
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String(120), nullable=True)
     last_name = Column(String(120), nullable=True)
@@ -12,4 +20,13 @@ class User(Base):
     role = Column(String(50), default="client")
     location = Column(String(200), nullable=True)
     bio = Column(Text, nullable=True)
-    discoverable = Column(Boolean, default=True)
\ No newline at end of file
+    discoverable = Column(Boolean, default=True)
+    rate = Column(Numeric(10, 2), nullable=True)
+    availability = Column(String(120), nullable=True)
+    avatar_url = Column(String(500), nullable=True)
+    # profile lists, stored natively instead of json.dumps text
+    skills = Column(JSONList, nullable=True)
+    portfolio = Column(JSONList, nullable=True)
+    photos = Column(JSONList, nullable=True)
+    companies = Column(JSONList, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
\ No newline at end of file
@@ -0,0 +1,15 @@
+# backend/app/models/user_term.py
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.core.database import Base
+
+class UserTerm(Base):
+    """Inverted index row: one normalized skill/location term per user."""
+    __tablename__ = "user_terms"
+    __table_args__ = (
+        # prefix range scans: kind = ? AND term >= ? AND term < ?
+        Index("ix_user_terms_kind_term", "kind", "term", "user_id"),
+    )
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    kind = Column(String(16), nullable=False)  # "skill" or "location"
+    term = Column(String(200), nullable=False)
@@ -0,0 +1,33 @@
+# backend/app/routes/analytics.py
+from datetime import datetime
+from flask import Blueprint, request, jsonify
+from app import db
+from app.models import User, Post, Comment
+from app.core import analytics
+
+analytics_bp = Blueprint('analytics', __name__)
+
+# metric -> source table for the one-off history backfill (`flask backfill-analytics`)
+SOURCES = {"users": User, "posts": Post, "comments": Comment, "approvals": Post}
+
+@analytics_bp.route('/summary', methods=['GET'])
+def summary():
+    return jsonify(analytics.summary(db.session))
+
+@analytics_bp.route('/timeseries', methods=['GET'])
+def timeseries():
+    metric = request.args.get('metric', 'posts')
+    granularity = request.args.get('granularity', 'day')
+    if metric not in analytics.METRICS or granularity not in analytics.GRANULARITIES:
+        return jsonify({"error": "Unknown metric or granularity"}), 400
+    try:
+        since = datetime.fromisoformat(request.args['since']) if request.args.get('since') else None
+        until = datetime.fromisoformat(request.args['until']) if request.args.get('until') else None
+    except ValueError:
+        return jsonify({"error": "since/until must be ISO-8601"}), 400
+    points = analytics.timeseries(db.session, metric, granularity, since, until)
+    return jsonify({
+        "metric": metric,
+        "granularity": granularity,
+        "points": [{"bucket": b.isoformat(), "value": v} for b, v in points]
+    })
@@ -1,16 +1,23 @@
 # backend/app/routes/auth.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.user import User
-from app.core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
-from passlib.context import CryptContext
+from app.core import analytics
+from app.core.config import Config, SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.replicas import set_sticky
+from app.core.security import passwords
+from app.core.hashing import HasherBusy
+from app.core.serialization import fastapi_response_class
 from datetime import datetime, timedelta
 from jose import jwt
 
-pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
-router = APIRouter()
+router = APIRouter(default_response_class=fastapi_response_class())
+
+def _busy():
+    return HTTPException(status_code=503, detail="Server busy, retry shortly", headers={"Retry-After": str(HasherBusy.retry_after)})
 
 class RegisterIn(BaseModel):
     first_name: str | None = None
@@ -24,13 +31,17 @@ class LoginIn(BaseModel):
     password: str
 
 @router.post("/register")
-def register(payload: RegisterIn, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == payload.email).first()
+async def register(payload: RegisterIn, response: Response, db: AsyncSession = Depends(get_async_db)):
+    existing = (await db.execute(select(User.id).where(User.email == payload.email))).first()
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed = pwd.hash(payload.password)
+    try:
+        hashed = await passwords.hash_async(payload.password)
+    except HasherBusy:
+        raise _busy()
     u = User(first_name=payload.first_name, last_name=payload.last_name, email=payload.email, password_hash=hashed, role=payload.role)
-    db.add(u); db.commit(); db.refresh(u)
+    db.add(u); await db.run_sync(analytics.record, "users"); await db.commit(); await db.refresh(u)
+    set_sticky(response, Config.REPLICA_STICKY_SECONDS)  # the login that follows must find the new row
     return {"id": u.id, "email": u.email, "first_name": u.first_name, "role": u.role}
 
 def create_access_token(data: dict, expires_minutes: int = ACCESS_TOKEN_EXPIRE_MINUTES):
@@ -40,9 +51,20 @@ def create_access_token(data: dict, expires_minutes: int = ACCESS_TOKEN_EXPIRE_M
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 @router.post("/login")
-def login(payload: LoginIn, db: Session = Depends(get_db)):
-    u = db.query(User).filter(User.email == payload.email).first()
-    if not u or not pwd.verify(payload.password, u.password_hash):
+async def login(payload: LoginIn, response: Response, db: AsyncSession = Depends(get_async_db)):
+    u = (await db.execute(select(User).where(User.email == payload.email))).scalars().first()
+    if not u:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    try:
+        ok, new_hash = await passwords.verify_and_update_async(payload.password, u.password_hash)
+    except HasherBusy:
+        raise _busy()
+    if not ok:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # cost parameters changed since this hash was made; upgrade it transparently
+        u.password_hash = new_hash
+        await db.commit()
+        set_sticky(response, Config.REPLICA_STICKY_SECONDS)
     token = create_access_token({"sub": str(u.id)})
     return {"token": token, "user": {"id": u.id, "first_name": u.first_name, "last_name": u.last_name, "email": u.email, "role": u.role, "location": u.location}}
\ No newline at end of file
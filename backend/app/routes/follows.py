@@ -0,0 +1,70 @@
+# backend/app/routes/follows.py
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from app import db
+from app.models import User, Post, Follow, TimelineEntry, AUTHOR_CARD
+from app.core import timeline
+from app.core.pagination import clamp_limit
+from app.core.principal import current_principal, principals
+
+follows_bp = Blueprint('follows', __name__)
+
+TIMELINE_MODELS = (User, Post, Follow, TimelineEntry)
+
+# -----------------------------
+# Routes
+# -----------------------------
+@follows_bp.route('/<int:user_id>/follow', methods=['POST'])
+@jwt_required()
+def follow(user_id):
+    user = current_principal(db.session, User)
+    if not user:
+        return jsonify({"error": "Not authenticated"}), 401
+    if user_id == user.id:
+        return jsonify({"error": "Cannot follow yourself"}), 400
+    if db.session.get(User, user_id) is None:
+        return jsonify({"error": "User not found"}), 404
+    created = timeline.follow(
+        db.session, TIMELINE_MODELS, user.id, user_id,
+        fanout_limit=current_app.config["TIMELINE_FANOUT_LIMIT"],
+        backfill=current_app.config["TIMELINE_BACKFILL_POSTS"],
+    )
+    db.session.commit()
+    principals.invalidate(User, user_id)
+    return jsonify({"following": True, "created": created})
+
+@follows_bp.route('/<int:user_id>/follow', methods=['DELETE'])
+@jwt_required()
+def unfollow(user_id):
+    user = current_principal(db.session, User)
+    if not user:
+        return jsonify({"error": "Not authenticated"}), 401
+    removed = timeline.unfollow(db.session, TIMELINE_MODELS, user.id, user_id)
+    db.session.commit()
+    if removed:
+        principals.invalidate(User, user_id)
+    return jsonify({"following": False})
+
+@follows_bp.route('/<int:user_id>/following', methods=['GET'])
+def following(user_id):
+    # ?after=<user id> pages through the (follower_id, followee_id) primary key
+    after = request.args.get('after', 0, type=int)
+    limit = clamp_limit(request.args.get('limit', 50))
+    users = (User.query.join(Follow, Follow.followee_id == User.id)
+             .filter(Follow.follower_id == user_id, Follow.followee_id > after)
+             .order_by(Follow.followee_id).limit(limit + 1).all())
+    has_more = len(users) > limit
+    users = users[:limit]
+    return jsonify({"users": AUTHOR_CARD.many(users), "hasMore": has_more, "nextAfter": users[-1].id if has_more else None})
+
+@follows_bp.route('/<int:user_id>/followers', methods=['GET'])
+def followers(user_id):
+    # ?after=<user id> pages through the (followee_id, follower_id) index
+    after = request.args.get('after', 0, type=int)
+    limit = clamp_limit(request.args.get('limit', 50))
+    users = (User.query.join(Follow, Follow.follower_id == User.id)
+             .filter(Follow.followee_id == user_id, Follow.follower_id > after)
+             .order_by(Follow.follower_id).limit(limit + 1).all())
+    has_more = len(users) > limit
+    users = users[:limit]
+    return jsonify({"users": AUTHOR_CARD.many(users), "hasMore": has_more, "nextAfter": users[-1].id if has_more else None})
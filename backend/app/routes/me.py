@@ -1,93 +1,85 @@
 # backend/app/routes/me.py
-from fastapi import APIRouter, Depends, Request, HTTPException
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, Request, Response, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
 from app.models.user import User
-from app.routes.posts import _get_user_from_auth  # reuse JWT helper
-import json
+from app.core.principal import principal_from_request_async, principals
+from app.core.replicas import set_sticky
+from app.core.config import Config
+from app.core.conditional import weak_etag, is_not_modified, validator_headers
+from app.core import user_index
+from app.core.serialization import Serializer, fastapi_response_class, or_empty
 
-router = APIRouter()
+JSONResponse = fastapi_response_class()
+router = APIRouter(default_response_class=JSONResponse)
 
-def parse_json_field(val):
-    if not val:
-        return []
-    if isinstance(val, list):
-        return val
-    try:
-        return json.loads(val)
-    except Exception:
-        return []
+def _rate(val):
+    return float(val) if val is not None else None
+
+# list fields are native JSON columns; the driver already returns lists
+PROFILE = Serializer(
+    "id", ("firstName", "first_name"), ("lastName", "last_name"), "role", "location", "bio",
+    ("rate", "rate", _rate), "availability", ("avatarUrl", "avatar_url"), "discoverable",
+    ("skills", "skills", or_empty), ("portfolio", "portfolio", or_empty),
+    ("photos", "photos", or_empty), ("companies", "companies", or_empty),
+)
+LIST_FIELDS = ("skills", "portfolio", "photos", "companies")
+# request key -> column for the plain fields PUT /me accepts
+SIMPLE_FIELDS = {
+    "firstName": "first_name", "lastName": "last_name", "role": "role", "location": "location",
+    "bio": "bio", "availability": "availability", "avatarUrl": "avatar_url",
+}
 
 @router.get("/me")
-def get_profile(request: Request, db: Session = Depends(get_db)):
-    user = _get_user_from_auth(db, request)
+async def get_profile(request: Request, db: AsyncSession = Depends(get_async_db)):
+    user = await principal_from_request_async(db, User, request)
     if not user:
         raise HTTPException(status_code=401, detail="User not authenticated")
-    
-    # Convert JSON fields back to lists
-    return {
-        "id": user.id,
-        "firstName": user.first_name,
-        "lastName": user.last_name,
-        "role": user.role,
-        "location": user.location,
-        "bio": user.bio,
-        "rate": float(user.rate) if user.rate is not None else None,
-        "availability": user.availability,
-        "avatarUrl": user.avatarUrl,
-        "discoverable": user.discoverable,
-        "skills": parse_json_field(user.skills),
-        "portfolio": parse_json_field(user.portfolio),
-        "photos": parse_json_field(user.photos),
-        "companies": parse_json_field(user.companies)
-    }
+
+    # the principal snapshot carries updated_at, so revalidation costs no query
+    etag = weak_etag("me", user.id, user.updated_at)
+    if is_not_modified(request.headers, etag, user.updated_at):
+        return Response(status_code=304, headers=validator_headers(etag, user.updated_at))
+    return JSONResponse(PROFILE.one(user), headers=validator_headers(etag, user.updated_at))
 
 @router.put("/me")
-async def update_profile(request: Request, db: Session = Depends(get_db)):
-    user = _get_user_from_auth(db, request)
-    if not user:
+async def update_profile(request: Request, db: AsyncSession = Depends(get_async_db)):
+    principal = await principal_from_request_async(db, User, request)
+    if not principal:
         raise HTTPException(status_code=401, detail="User not authenticated")
+    user = await db.get(User, principal.id)
     
     data = await request.json()
 
     # Simple fields
-    for key in ["firstName", "lastName", "role", "location", "bio", "rate", "availability", "avatarUrl", "discoverable"]:
+    for key, column in SIMPLE_FIELDS.items():
         if key in data:
-            val = data[key]
-            if key == "discoverable":
-                setattr(user, "discoverable", bool(val))
-            elif key == "avatarUrl":
-                setattr(user, "avatarUrl", val)
-            elif key == "rate":
-                try:
-                    setattr(user, "rate", float(val))
-                except:
-                    pass
-            else:
-                setattr(user, key.lower(), val)
+            setattr(user, column, data[key])
+    if "discoverable" in data:
+        user.discoverable = bool(data["discoverable"])
+    if "rate" in data:
+        try:
+            user.rate = None if data["rate"] is None else float(data["rate"])
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="rate must be a number")
 
-    # JSON fields
-    for key in ["skills", "portfolio", "photos", "companies"]:
+    # JSON fields, stored as-is in their JSON columns
+    for key in LIST_FIELDS:
         if key in data:
-            setattr(user, key.lower(), json.dumps(data[key]))
+            val = data[key]
+            if val is not None and not isinstance(val, list):
+                raise HTTPException(status_code=400, detail=f"{key} must be a list")
+            setattr(user, key, val)
+
+    # keep the skill/location search index in step with the profile
+    if "skills" in data or "location" in data:
+        await db.run_sync(user_index.index_user, user.id, user.skills or [], user.location)
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    principals.invalidate(User, user.id)
+    await db.refresh(user)
 
     # return updated profile
-    return {
-        "id": user.id,
-        "firstName": user.first_name,
-        "lastName": user.last_name,
-        "role": user.role,
-        "location": user.location,
-        "bio": user.bio,
-        "rate": float(user.rate) if user.rate is not None else None,
-        "availability": user.availability,
-        "avatarUrl": user.avatarUrl,
-        "discoverable": user.discoverable,
-        "skills": parse_json_field(user.skills),
-        "portfolio": parse_json_field(user.portfolio),
-        "photos": parse_json_field(user.photos),
-        "companies": parse_json_field(user.companies)
-    }
\ No newline at end of file
+    out = JSONResponse(PROFILE.one(user))
+    set_sticky(out, Config.REPLICA_STICKY_SECONDS)  # read our own update back from the primary
+    return out
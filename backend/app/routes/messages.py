@@ -0,0 +1,149 @@
+# backend/app/routes/messages.py
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from app import db
+from app.models import User, Conversation, ConversationMember, Message, AUTHOR_CARD, MESSAGE_OUT
+from app.core import messaging
+from app.core.messaging import NotAMember
+from app.core.pagination import clamp_limit, InvalidCursor
+from app.core.principal import current_principal
+from app.core.serialization import iso
+
+messages_bp = Blueprint('messages', __name__)
+
+MODELS = (Conversation, ConversationMember, Message)
+MAX_READ_BATCH = 200
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _inbox_row(member, conversation, peer):
+    return {
+        "id": conversation.id,
+        "peer": AUTHOR_CARD.one_or_none(peer),
+        "unread": member.unread_count,
+        "lastMessage": conversation.last_message_preview,
+        "lastSenderId": conversation.last_sender_id,
+        "lastMessageAt": iso(conversation.last_message_at),
+    }
+
+@messages_bp.errorhandler(NotAMember)
+def not_a_member(_):
+    # same answer as a missing conversation; membership is not disclosed
+    return jsonify({"error": "Conversation not found"}), 404
+
+# -----------------------------
+# Routes
+# -----------------------------
+@messages_bp.route('/conversations', methods=['GET'])
+@jwt_required()
+def list_conversations():
+    user = current_principal(db.session, User)
+    if not user:
+        return jsonify({"error": "Not authenticated"}), 401
+    try:
+        rows, next_cursor, has_more = messaging.inbox(
+            db.session, MODELS, User, user.id,
+            cursor=request.args.get('cursor'), limit=clamp_limit(request.args.get('limit', 20)),
+        )
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
+    return jsonify({
+        "conversations": [_inbox_row(*row) for row in rows],
+        "hasMore": has_more,
+        "nextCursor": next_cursor,
+    })
+
+@messages_bp.route('/conversations', methods=['POST'])
+@jwt_required()
+def open_conversation():
+    user = current_principal(db.session, User)
+    if not user:
+        return jsonify({"error": "Not authenticated"}), 401
+    data = request.get_json() or {}
+    try:
+        peer_id = int(data.get("userId"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Missing 'userId' field"}), 400
+    if peer_id == user.id:
+        return jsonify({"error": "Cannot message yourself"}), 400
+    if db.session.get(User, peer_id) is None:
+        return jsonify({"error": "User not found"}), 404
+
+    conversation_id = messaging.get_or_create_direct(db.session, Conversation, ConversationMember, user.id, peer_id)
+    db.session.commit()
+    return jsonify({"id": conversation_id})
+
+@messages_bp.route('/conversations/<int:conversation_id>/messages', methods=['GET'])
+@jwt_required()
+def list_messages(conversation_id):
+    user = current_principal(db.session, User)
+    if not user:
+        return jsonify({"error": "Not authenticated"}), 401
+    messaging.membership(db.session, ConversationMember, conversation_id, user.id)
+    before = request.args.get('before', type=int)
+    messages, has_more = messaging.history(
+        db.session, Message, conversation_id, before=before, limit=clamp_limit(request.args.get('limit', 30)),
+    )
+    return jsonify({
+        "messages": MESSAGE_OUT.many(messages),
+        "hasMore": has_more,
+        # ?before= for the next (older) page
+        "nextBefore": messages[-1].id if has_more else None,
+    })
+
+@messages_bp.route('/conversations/<int:conversation_id>/messages', methods=['POST'])
+@jwt_required()
+def send_message(conversation_id):
+    user = current_principal(db.session, User)
+    if not user:
+        return jsonify({"error": "Not authenticated"}), 401
+    data = request.get_json() or {}
+    text_val = (data.get("text") or "").strip()
+    if not text_val:
+        return jsonify({"error": "Missing 'text' field"}), 400
+    if len(text_val) > messaging.MAX_MESSAGE_CHARS:
+        return jsonify({"error": f"Message longer than {messaging.MAX_MESSAGE_CHARS} characters"}), 400
+
+    messaging.membership(db.session, ConversationMember, conversation_id, user.id)
+    message_id, created_at = messaging.send(db.session, MODELS, conversation_id, user.id, text_val)
+    db.session.commit()
+    return jsonify({
+        "id": message_id,
+        "conversationId": conversation_id,
+        "senderId": user.id,
+        "text": text_val,
+        "createdAt": iso(created_at),
+    }), 201
+
+@messages_bp.route('/read', methods=['POST'])
+@jwt_required()
+def mark_read():
+    """
+    Body: {"conversations": {"<id>": <last seen message id or null>, ...}}.
+    One round trip (and one UPDATE batch) for every thread the client has
+    shown since the last call; conversations the caller is not in are ignored.
+    """
+    user = current_principal(db.session, User)
+    if not user:
+        return jsonify({"error": "Not authenticated"}), 401
+    data = request.get_json() or {}
+    batch = data.get("conversations")
+    if not isinstance(batch, dict) or len(batch) > MAX_READ_BATCH:
+        return jsonify({"error": f"'conversations' must map up to {MAX_READ_BATCH} ids to message ids"}), 400
+    try:
+        read_up_to = {int(cid): (None if up_to is None else int(up_to)) for cid, up_to in batch.items()}
+    except (TypeError, ValueError):
+        return jsonify({"error": "Conversation and message ids must be integers"}), 400
+
+    messaging.mark_read(db.session, MODELS, user.id, read_up_to)
+    db.session.commit()
+    return jsonify({"unread": messaging.unread_total(db.session, ConversationMember, user.id)})
+
+@messages_bp.route('/unread', methods=['GET'])
+@jwt_required()
+def unread():
+    user = current_principal(db.session, User)
+    if not user:
+        return jsonify({"error": "Not authenticated"}), 401
+    return jsonify({"unread": messaging.unread_total(db.session, ConversationMember, user.id)})
@@ -1,61 +1,190 @@
 # backend/app/routes/posts.py
 import os
-import uuid
 import json
-from flask import Blueprint, request, jsonify, current_app, send_from_directory
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, Response, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
 from app import db
-from app.models import User, Post, Comment
+from app.models import User, Post, Comment, MediaBlob, Follow, TimelineEntry, AUTHOR_BRIEF, POST_OUT, COMMENT_OUT
+from app.core.pagination import keyset_page, approximate_count, clamp_limit, InvalidCursor
+from app.core.counters import increment
+from app.core.media_store import MediaStore, acquire, digest_of
+from app.core.media_serving import serve_upload
+from app.core import analytics, timeline, trending
+from app.core.database import pool_stats
+from app.core.principal import current_principal
+from app.core.response_cache import cached_response, invalidate
+from app.core.conditional import weak_etag, table_version, row_version, latest, not_modified, with_validators
+from app.core.pubsub import publish, sse_stream
+from sqlalchemy.orm import selectinload
 from werkzeug.utils import secure_filename
 
 UPLOAD_DIR = os.path.join(current_app.root_path, 'uploads')
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+media_store = MediaStore(UPLOAD_DIR)
 
 posts_bp = Blueprint('posts', __name__)
 
+TIMELINE_MODELS = (User, Post, Follow, TimelineEntry)
+
 # -----------------------------
 # Helpers
 # -----------------------------
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in {'png','jpg','jpeg','gif','webp','mp4','mov','webm'}
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in {'png','jpg','jpeg','gif','webp','heic','heif','mp4','mov','webm'}
+
+def _process_media(key, post_id):
+    """Queue thumbnail/width variants; the post row is updated when the worker finishes."""
+    pipeline = current_app.extensions.get("media_pipeline")
+    if pipeline is None:
+        return
+    app = current_app._get_current_object()
+
+    def record(manifest):
+        with app.app_context():
+            Post.query.filter_by(id=post_id).update({"media_variants": manifest})
+            db.session.commit()
+            invalidate("feed", f"post:{post_id}")
+            publish("feed", {"type": "post.media", "id": post_id, "mediaVariants": manifest})
+
+    pipeline.submit(key, digest_of(key), on_done=record, root=UPLOAD_DIR)
+
+def _counter_buffer():
+    if current_app.config.get("COUNTER_WRITE_BEHIND"):
+        return current_app.extensions.get("counter_buffer")
+    return None
+
+def _page_out(posts):
+    out = POST_OUT.many(posts)
+    if _counter_buffer() is not None:
+        for item in out:
+            item["approvals"] += _pending(item["id"], "approvals")
+            item["shares"] += _pending(item["id"], "shares")
+    return out
+
+def _pending(post_id, column):
+    buffer = _counter_buffer()
+    return buffer.pending(post_id, column) if buffer else 0
+
+def _bump_counter(post_id, column):
+    """
+    Count one approval/share. With write-behind enabled the delta is queued
+    and the optimistic total (stored + unflushed) is returned without a
+    write; otherwise it is applied with an atomic UPDATE.
+    Returns None when the post does not exist.
+    """
+    buffer = _counter_buffer()
+    if buffer is None:
+        value = increment(db.session, Post, post_id, column)
+        if value is None:
+            db.session.rollback()
+            return None
+        if column == "approvals":
+            analytics.record(db.session, "approvals")
+        trending.bump(db.session, Post, post_id, column)
+        db.session.commit()
+        invalidate("feed", f"post:{post_id}")
+        publish("feed", {"type": "post.counters", "id": post_id, column: value})
+        return value
+    def stored():
+        row = db.session.query(getattr(Post, column)).filter(Post.id == post_id).first()
+        return None if row is None else row[0] or 0
+
+    # streams get the flushed totals from init_counter_buffer, not one event per click
+    return buffer.add_and_read(post_id, column, stored)
 
 # -----------------------------
 # Routes
 # -----------------------------
-@posts_bp.route('/uploads/<filename>')
+@posts_bp.route('/uploads/<path:filename>')
 def uploaded_file(filename):
-    return send_from_directory(UPLOAD_DIR, filename)
+    return serve_upload(UPLOAD_DIR, filename)
 
 @posts_bp.route('/posts', methods=['GET'])
+@cached_response(tags=["feed"], vary=("limit", "page", "cursor", "includeTotal", "sort"))
 def list_posts():
-    page = int(request.args.get('page', 1))
-    limit = int(request.args.get('limit', 12))
-    offset = (page - 1) * limit
-    posts = Post.query.order_by(Post.created_at.desc()).offset(offset).limit(limit).all()
-    out = []
-    for p in posts:
-        out.append({
-            "id": p.id,
-            "text": p.text,
-            "media": p.media,
-            "mediaType": p.media_type,
-            "approvals": p.approvals,
-            "shares": p.shares,
-            "createdAt": p.created_at.isoformat() if p.created_at else None,
-            "user": {
-                "id": p.user.id if p.user else None,
-                "firstName": getattr(p.user, "first_name", None),
-                "lastName": getattr(p.user, "last_name", None),
-                "avatarUrl": None
-            }
-        })
-    return jsonify({"posts": out, "hasMore": len(out) == limit})
+    # any new/updated post or author profile moves one of these; answer 304 before loading the page
+    posts_at, max_post_id = table_version(db.session, Post)
+    users_at, _ = table_version(db.session, User)
+    last_modified = latest(posts_at, users_at)
+    etag = weak_etag("feed", posts_at, max_post_id, users_at, request.query_string.decode())
+    unchanged = not_modified(etag, last_modified)
+    if unchanged:
+        return unchanged
+
+    limit = clamp_limit(request.args.get('limit', 12))
+    cursor = request.args.get('cursor')
+    next_cursor = None
+    if request.args.get('sort') == 'trending':
+        # top-K off the hot_score index; ?page= walks down to trending.MAX_RANK
+        page = max(request.args.get('page', 1, type=int) or 1, 1)
+        posts, has_more = trending.top(Post.query.options(selectinload(Post.author)), Post, offset=(page - 1) * limit, limit=limit)
+    elif 'page' in request.args and not cursor:
+        # legacy offset paging, kept for old clients; new clients send ?cursor=
+        page = max(int(request.args.get('page', 1)), 1)
+        posts = Post.query.options(selectinload(Post.author)).order_by(Post.created_at.desc(), Post.id.desc()).offset((page - 1) * limit).limit(limit + 1).all()
+        has_more = len(posts) > limit
+        posts = posts[:limit]
+    else:
+        try:
+            posts, next_cursor, has_more = keyset_page(Post.query.options(selectinload(Post.author)), Post, cursor=cursor, limit=limit)
+        except InvalidCursor:
+            return jsonify({"error": "Invalid cursor"}), 400
+    # authors come from one IN-load above; comment totals are a maintained column
+    body = {"posts": _page_out(posts), "hasMore": has_more, "nextCursor": next_cursor}
+    if request.args.get('includeTotal') in ('1', 'true'):
+        body["approxTotal"] = approximate_count("posts", lambda: Post.query.count())
+    return with_validators(jsonify(body), etag, last_modified)
+
+@posts_bp.route('/posts/home', methods=['GET'])
+@jwt_required()
+def home_feed():
+    """Personal feed: posts by the caller and everyone they follow, newest first."""
+    user = current_principal(db.session, User)
+    if not user:
+        return jsonify({"error": "Not authenticated"}), 401
+    try:
+        ids, next_cursor, has_more = timeline.home(
+            db.session, TIMELINE_MODELS, user.id,
+            cursor=request.args.get('cursor'), limit=clamp_limit(request.args.get('limit', 12)),
+            fanout_limit=current_app.config["TIMELINE_FANOUT_LIMIT"],
+        )
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
+    by_id = {p.id: p for p in Post.query.options(selectinload(Post.author)).filter(Post.id.in_(ids))} if ids else {}
+    posts = [by_id[i] for i in ids if i in by_id]
+    return jsonify({"posts": _page_out(posts), "hasMore": has_more, "nextCursor": next_cursor})
+
+@posts_bp.route('/posts/stream', methods=['GET'])
+def stream():
+    """
+    Server-Sent Events: new posts and counter changes on "feed", plus new
+    comments for the posts named in ?posts=1,2,3. Replaces polling /posts
+    and /posts/<id>/comments; after a resync event the client refetches.
+    """
+    hub = current_app.extensions.get("hub")
+    if hub is None:
+        return jsonify({"error": "Streaming disabled"}), 404
+    if not hub.max_subscribers:
+        # this worker class would give a whole worker to each stream (see Config.WEB_THREADS)
+        return jsonify({"error": "Streaming unavailable on this server"}), 503
+    post_ids = [p for p in request.args.get('posts', '').split(',') if p.isdigit()][:50]
+    sub = hub.subscribe(["feed", *(f"post:{p}" for p in post_ids)])
+    if sub is None:
+        return jsonify({"error": "Too many open streams"}), 503, {"Retry-After": "30"}
+    cfg = current_app.config
+    frames = sse_stream(sub, heartbeat=cfg["STREAM_HEARTBEAT_SECONDS"], max_seconds=cfg["STREAM_MAX_SECONDS"])
+    return Response(frames, mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@posts_bp.route('/stream/metrics', methods=['GET'])
+def stream_metrics():
+    hub = current_app.extensions.get("hub")
+    return jsonify(hub.metrics() if hub else {})
 
 @posts_bp.route('/posts', methods=['POST'])
 @jwt_required()
 def create_post():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = current_principal(db.session, User)
     if not user:
         return jsonify({"error": "User not found"}), 404
 
@@ -63,20 +192,32 @@ def create_post():
     media_file = request.files.get('media')
     media_url = None
     media_type = None
+    media_key = None
 
     if media_file and allowed_file(media_file.filename):
-        filename = f"{uuid.uuid4().hex}_{secure_filename(media_file.filename)}"
-        path = os.path.join(UPLOAD_DIR, filename)
-        media_file.save(path)
-        media_url = f"/uploads/{filename}"
+        # content-addressed: a repeat upload of the same bytes skips the disk write
+        # secure_filename drops a leading dot, so '.png' comes back as 'png'
+        ext = secure_filename(media_file.filename).rsplit('.', 1)[-1].lower()
+        media_key, size, _ = media_store.save(media_file.stream, ext)
+        acquire(db.session, MediaBlob, media_key, size)
+        media_url = f"/uploads/{media_key}"
         media_type = "video" if media_file.mimetype.startswith("video") else "image"
 
     post = Post(user_id=user.id, text=text, media=media_url, media_type=media_type)
     db.session.add(post)
+    db.session.flush()
+    # followers' home timelines get the row in the same transaction
+    timeline.fan_out(db.session, TIMELINE_MODELS, post.id, user.id, post.created_at,
+                     user.followers_count, fanout_limit=current_app.config["TIMELINE_FANOUT_LIMIT"])
+    analytics.record(db.session, "posts")
     db.session.commit()
+    invalidate("feed")
     db.session.refresh(post)
+    # respond as soon as the original is stored; variants show up on later reads
+    if media_key and media_type == "image":
+        _process_media(media_key, post.id)
 
-    return jsonify({
+    out = {
         "id": post.id,
         "text": post.text,
         "media": post.media,
@@ -84,51 +225,67 @@ def create_post():
         "approvals": post.approvals,
         "shares": post.shares,
         "createdAt": post.created_at.isoformat() if post.created_at else None,
-        "user": {
-            "id": user.id,
-            "firstName": user.first_name,
-            "lastName": user.last_name
-        }
-    })
+        "user": AUTHOR_BRIEF.one(user)
+    }
+    publish("feed", {"type": "post.created", "post": out})
+    return jsonify(out)
 
 @posts_bp.route('/posts/<int:post_id>/approve', methods=['POST'])
 @jwt_required()
 def approve_post(post_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = current_principal(db.session, User)
     if not user:
         return jsonify({"error": "Not authenticated"}), 401
 
-    post = Post.query.get(post_id)
-    if not post:
+    approvals = _bump_counter(post_id, "approvals")
+    if approvals is None:
         return jsonify({"error": "Post not found"}), 404
+    return jsonify({"approvals": approvals})
 
-    post.approvals = (post.approvals or 0) + 1
-    db.session.commit()
-    return jsonify({"approvals": post.approvals})
+@posts_bp.route('/posts/<int:post_id>/share', methods=['POST'])
+@jwt_required()
+def share_post(post_id):
+    shares = _bump_counter(post_id, "shares")
+    if shares is None:
+        return jsonify({"error": "Post not found"}), 404
+    return jsonify({"shares": shares})
+
+@posts_bp.route('/counters/metrics', methods=['GET'])
+def counter_metrics():
+    buffer = current_app.extensions.get("counter_buffer")
+    return jsonify(buffer.metrics() if buffer else {})
+
+@posts_bp.route('/db/metrics', methods=['GET'])
+def db_metrics():
+    replicas = current_app.extensions.get("replicas")
+    return jsonify({
+        "primary": pool_stats(db.engine),
+        "replicas": [pool_stats(e) for e in replicas.engines] if replicas else [],
+        "routing": replicas.stats if replicas else {},
+    })
 
 @posts_bp.route('/posts/<int:post_id>/comments', methods=['GET'])
 def get_comments(post_id):
-    comments = Comment.query.filter_by(post_id=post_id).order_by(Comment.created_at).all()
-    out = []
-    for c in comments:
-        out.append({
-            "id": c.id,
-            "text": c.text,
-            "createdAt": c.created_at.isoformat() if c.created_at else None,
-            "user": {
-                "id": c.user.id if c.user else None,
-                "firstName": getattr(c.user, "first_name", None),
-                "lastName": getattr(c.user, "last_name", None)
-            }
-        })
-    return jsonify(out)
+    # new comments bump posts.comments_count, which also moves posts.updated_at
+    version = row_version(db.session, Post, post_id, "comments_count")
+    if version is None:
+        return jsonify({"error": "Post not found"}), 404
+    users_at, _ = table_version(db.session, User)
+    last_modified = latest(version[0], users_at)
+    etag = weak_etag("comments", post_id, *version, users_at)
+    unchanged = not_modified(etag, last_modified)
+    if unchanged:
+        return unchanged
+
+    comments = (Comment.query.options(selectinload(Comment.author))
+                .filter_by(post_id=post_id).order_by(Comment.created_at).all())
+    out = COMMENT_OUT.many(comments)
+    return with_validators(jsonify(out), etag, last_modified)
 
 @posts_bp.route('/posts/<int:post_id>/comments', methods=['POST'])
 @jwt_required()
 def create_comment(post_id):
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = current_principal(db.session, User)
     if not user:
         return jsonify({"error": "Not authenticated"}), 401
 
@@ -137,18 +294,26 @@ def create_comment(post_id):
     if not text_val:
         return jsonify({"error": "Missing 'text' field"}), 400
 
-    comment = Comment(post_id=post_id, user_id=user.id, text=text_val)
+    # bump the denormalized count in the same transaction as the insert
+    comments_count = increment(db.session, Post, post_id, "comments_count")
+    if comments_count is None:
+        db.session.rollback()
+        return jsonify({"error": "Post not found"}), 404
+
+    comment = Comment(post_id=post_id, user_id=user.id, content=text_val)
     db.session.add(comment)
+    analytics.record(db.session, "comments")
+    trending.bump(db.session, Post, post_id, "comments")
     db.session.commit()
+    invalidate("feed", f"post:{post_id}")
     db.session.refresh(comment)
 
-    return jsonify({
+    out = {
         "id": comment.id,
-        "text": comment.text,
+        "text": comment.content,
         "createdAt": comment.created_at.isoformat() if comment.created_at else None,
-        "user": {
-            "id": user.id,
-            "firstName": user.first_name,
-            "lastName": user.last_name
-        }
-    })
\ No newline at end of file
+        "user": AUTHOR_BRIEF.one(user)
+    }
+    publish(f"post:{post_id}", {"type": "comment.created", "postId": post_id, "comment": out})
+    publish("feed", {"type": "post.counters", "id": post_id, "commentsCount": comments_count})
+    return jsonify(out)
\ No newline at end of file
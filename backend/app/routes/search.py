@@ -1,96 +1,71 @@
 # backend/app/routes/search.py
-from fastapi import APIRouter, Query, Depends
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from fastapi import APIRouter, Query, Depends, HTTPException
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_read_db
 from app.models.user import User   # ORM model (adjust import if your user model path differs)
-import json
+from app.core import user_index, fts
+from app.core.serialization import fastapi_response_class
 
-router = APIRouter(tags=["search"])
+router = APIRouter(tags=["search"], default_response_class=fastapi_response_class())
 
-def _normalize(v: Optional[str]):
-    if not v:
-        return None
-    return v.strip().lower()
+@router.get("/")
+async def search_content(
+    q: str = Query(..., min_length=1, description="Words to search for; each word matches as a prefix"),
+    type: Optional[str] = Query(None, description="posts, comments or users (default: all)"),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Ranked full-text search over post text, comments and profile names/bios.
+    Snippets are HTML-escaped with matched words wrapped in <mark>.
+    """
+    if type and type not in fts.SOURCES:
+        raise HTTPException(status_code=400, detail="type must be one of: " + ", ".join(fts.SOURCES))
+    hits = await db.run_sync(
+        lambda s: fts.search(s, q, kinds=[type] if type else None, limit=limit, offset=(page - 1) * limit)
+    )
+    return {"results": hits, "page": page, "limit": limit, "count": len(hits)}
 
 @router.get("/users")
-def search_users(
+async def search_users(
     skill: Optional[str] = Query(None, description="Skill to search for"),
     location: Optional[str] = Query(None, description="City or province"),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
     Return discoverable users matching skill/location.
-    Matches are case-insensitive and partial.
+    Matches are case-insensitive prefix matches on any word of a skill or
+    location, resolved through the user_terms index. When both filters are
+    given a user matching either one is included.
     """
-    skill_q = _normalize(skill)
-    loc_q = _normalize(location)
-
-    # load discoverable users (simple approach)
-    q = db.query(User).filter(getattr(User, "discoverable", True) == True)
-
-    # Basic fetch (we'll filter in python for skills array matching)
-    offset = (page - 1) * limit
-    users = q.offset(offset).limit(limit * 5).all()  # fetch a bit extra to allow filtering
+    ids, total = await db.run_sync(
+        lambda s: user_index.search(s, skill=skill, location=location, offset=(page - 1) * limit, limit=limit)
+    )
+    # only the card columns; list fields arrive already decoded from their JSON columns
+    cols = (User.id, User.first_name, User.last_name, User.role, User.location, User.avatar_url,
+            User.skills, User.photos, User.companies)
+    users = {u.id: u for u in (await db.execute(select(*cols).where(User.id.in_(ids))))} if ids else {}
 
     matched = []
-    for u in users:
-        # Read skills field — support JSON string or comma-separated string
-        raw_skills = []
-        if getattr(u, "skills", None):
-            try:
-                if isinstance(u.skills, (list, tuple)):
-                    raw_skills = u.skills
-                else:
-                    raw_skills = json.loads(u.skills)
-            except Exception:
-                # fallback: comma separated
-                raw_skills = [s.strip() for s in str(u.skills).split(",") if s.strip()]
-
-        user_location = (getattr(u, "location", "") or "").lower()
-
-        skill_match = False
-        loc_match = False
-
-        if skill_q:
-            for s in raw_skills:
-                if skill_q in str(s).lower():
-                    skill_match = True
-                    break
-
-        if loc_q:
-            if loc_q in user_location:
-                loc_match = True
-
-        # include user if:
-        # - both queries present: at least one must match (OR semantics)
-        # - only one present: must match that one
-        include = False
-        if skill_q and loc_q:
-            include = skill_match or loc_match
-        elif skill_q:
-            include = skill_match
-        elif loc_q:
-            include = loc_match
-        else:
-            include = True  # no filters -> include
-
-        if include:
-            matched.append({
-                "id": u.id,
-                "firstName": getattr(u, "first_name", "") or "",
-                "lastName": getattr(u, "last_name", "") or "",
-                "role": getattr(u, "role", "") or "",
-                "location": getattr(u, "location", "") or "",
-                "skills": raw_skills,
-                "avatarUrl": getattr(u, "avatar_url", None) or "",
-                "photos": json.loads(u.photos) if getattr(u, "photos", None) else [],
-                "companies": json.loads(u.companies) if getattr(u, "companies", None) else []
-            })
-
-        if len(matched) >= limit:
-            break
+    for uid in ids:
+        u = users.get(uid)
+        if u is None:
+            continue
+        matched.append({
+            "id": u.id,
+            "firstName": u.first_name or "",
+            "lastName": u.last_name or "",
+            "role": u.role or "",
+            "location": u.location or "",
+            "skills": u.skills or [],
+            "avatarUrl": u.avatar_url or "",
+            "photos": u.photos or [],
+            "companies": u.companies or []
+        })
 
-    return {"results": matched, "page": page, "limit": limit, "count": len(matched)}
\ No newline at end of file
+    return {"results": matched, "page": page, "limit": limit, "count": len(matched), "total": total}
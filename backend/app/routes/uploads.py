@@ -1,15 +1,33 @@
 # backend/app/routes/uploads.py
 import os, uuid
-from fastapi import APIRouter, File, UploadFile, Request, HTTPException
-from app.core.config import UPLOAD_DIR
+from fastapi import APIRouter, Request, HTTPException, Header
+from starlette.datastructures import UploadFile
+from app.core.config import Config, UPLOAD_DIR
+from app.core.upload_stream import (
+    iter_upload, save_stream, ResumableUploads, UploadTooLarge, UnknownUpload, UploadExpired, OffsetMismatch,
+)
+from app.core.media_pipeline import shared_pipeline
 from pathlib import Path
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 
 router = APIRouter()
 
 Path(UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
 
-ALLOWED_EXT = {"png","jpg","jpeg","gif","webp","mp4","mov","webm"}
+ALLOWED_EXT = {"png","jpg","jpeg","gif","webp","heic","heif","mp4","mov","webm"}
+MAX_UPLOAD_BYTES = Config.MAX_CONTENT_LENGTH
+MULTIPART_OVERHEAD = 64 * 1024  # boundaries and part headers around the file in POST /upload
+
+resumable = ResumableUploads(UPLOAD_DIR, MAX_UPLOAD_BYTES, ttl=Config.UPLOAD_SESSION_TTL)
+pipeline = shared_pipeline(workers=Config.MEDIA_WORKERS, max_pending=Config.MEDIA_QUEUE_MAX)
+
+def _variants_out(name, sha256):
+    # variants are built in the background; clients poll the manifest until it exists,
+    # so it is only advertised for files the pipeline accepted
+    if not pipeline.submit(name, sha256, root=UPLOAD_DIR):
+        return {}
+    return {"variants": f"/uploads/variants/{sha256}/manifest.json"}
 
 def _secure_filename(filename: str):
     if "." not in filename:
@@ -19,16 +37,90 @@ def _secure_filename(filename: str):
         raise HTTPException(status_code=400, detail="Invalid file type")
     return f"{uuid.uuid4().hex}.{ext}"
 
+def _too_large(limit):
+    return HTTPException(status_code=413, detail=f"File too large (max {limit} bytes)")
+
+def _gone_or_missing(e):
+    if isinstance(e, UploadExpired):
+        return HTTPException(status_code=410, detail="Upload session expired")
+    return HTTPException(status_code=404, detail="Upload session not found")
+
 @router.post("/upload")
-async def upload_file(request: Request, file: UploadFile = File(...)):
+async def upload_file(request: Request):
     # optional auth check (you can expand)
-    # save
-    name = _secure_filename(file.filename)
-    dest = os.path.join(UPLOAD_DIR, name)
+    # the form parser spools the body before a handler sees it, so an oversized
+    # request is refused on its declared length, before any of it is read
+    length = request.headers.get("content-length", "")
+    if not length.isdigit():
+        raise HTTPException(status_code=411, detail="Content-Length required")
+    if int(length) > MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD:
+        raise _too_large(MAX_UPLOAD_BYTES)
+    form = await request.form()
+    try:
+        file = form.get("file")
+        if not isinstance(file, UploadFile):
+            raise HTTPException(status_code=400, detail="Missing 'file' field")
+        # stream to disk in fixed-size chunks; nothing holds the whole file in memory
+        name = _secure_filename(file.filename)
+        dest = os.path.join(UPLOAD_DIR, name)
+        try:
+            size, sha256 = await save_stream(iter_upload(file), dest, MAX_UPLOAD_BYTES)
+        except UploadTooLarge as e:
+            raise _too_large(e.limit)
+        except Exception:
+            raise HTTPException(status_code=500, detail="Failed to save file")
+    finally:
+        await form.close()
+    return {"url": f"/uploads/{name}", "size": size, "sha256": sha256, **_variants_out(name, sha256)}
+
+# -----------------------------
+# Resumable uploads
+#   POST  /upload/sessions           {"filename", "size"} -> session
+#   HEAD  /upload/sessions/{id}      Upload-Offset header says where to resume
+#   PATCH /upload/sessions/{id}      raw bytes, Upload-Offset: <bytes already sent>
+# -----------------------------
+def _session_out(meta):
+    out = {"id": meta["id"], "offset": meta["offset"], "size": meta["total"]}
+    if meta.get("complete"):
+        out.update(url=f"/uploads/{meta['name']}", sha256=meta["sha256"])
+        out.update(_variants_out(meta["name"], meta["sha256"]))
+    return out
+
+def _offset_headers(meta):
+    return {"Upload-Offset": str(meta["offset"]), "Upload-Length": str(meta["total"])}
+
+@router.post("/upload/sessions", status_code=201)
+async def create_upload_session(request: Request):
+    data = await request.json()
+    name = _secure_filename(str(data.get("filename") or ""))
+    try:
+        size = int(data.get("size"))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="size is required")
+    if size <= 0:
+        raise HTTPException(status_code=400, detail="size must be positive")
+    try:
+        meta = await run_in_threadpool(resumable.create, name, size)
+    except UploadTooLarge as e:
+        raise _too_large(e.limit)
+    return _session_out(meta)
+
+@router.api_route("/upload/sessions/{upload_id}", methods=["GET", "HEAD"])
+def upload_session_status(upload_id: str):
+    try:
+        meta = resumable.status(upload_id)
+    except UnknownUpload as e:
+        raise _gone_or_missing(e)
+    return JSONResponse(_session_out(meta), headers=_offset_headers(meta))
+
+@router.patch("/upload/sessions/{upload_id}")
+async def append_upload_chunk(upload_id: str, request: Request, upload_offset: int = Header(..., alias="Upload-Offset")):
     try:
-        with open(dest, "wb") as f:
-            content = await file.read()
-            f.write(content)
-    except Exception:
-        raise HTTPException(status_code=500, detail="Failed to save file")
-    return {"url": f"/uploads/{name}"}
\ No newline at end of file
+        meta = await resumable.append(upload_id, upload_offset, request.stream())
+    except UnknownUpload as e:
+        raise _gone_or_missing(e)
+    except OffsetMismatch as e:
+        raise HTTPException(status_code=409, detail="Offset mismatch", headers={"Upload-Offset": str(e.offset)})
+    except UploadTooLarge as e:
+        raise _too_large(e.limit)
+    return JSONResponse(_session_out(meta), headers=_offset_headers(meta))
@@ -1,23 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from app.core.config import get_db, UPLOAD_DIR, engine
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile, File, Form
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import Config, UPLOAD_DIR
+from app.core.replicas import set_sticky
+from app.core.database import get_async_db
+from app.core.upload_stream import iter_upload, save_stream, UploadTooLarge
 from app.models.user import User
 from app.models.post import Post
 from app.models.comment import Comment
+from app.core.principal import principals
+from app.core.conditional import weak_etag, is_not_modified, validator_headers
+from app.core.serialization import fastapi_response_class
 import os
-import shutil
 
-router = APIRouter(prefix="/users", tags=["Users"])
+router = APIRouter(prefix="/users", tags=["Users"], default_response_class=fastapi_response_class())
 
 # ---------------------------
 # Get user profile
 # ---------------------------
 @router.get("/{user_id}")
-def get_user_profile(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+async def get_user_profile(user_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    etag = weak_etag("user", user.id, user.updated_at)
+    if is_not_modified(request.headers, etag, user.updated_at):
+        return Response(status_code=304, headers=validator_headers(etag, user.updated_at))
+    response.headers.update(validator_headers(etag, user.updated_at))
+
     return {
         "id": user.id,
         "name": user.name,
@@ -32,16 +42,17 @@ def get_user_profile(user_id: int, db: Session = Depends(get_db)):
 # Update user profile
 # ---------------------------
 @router.put("/{user_id}")
-def update_user_profile(
+async def update_user_profile(
     user_id: int,
+    response: Response,
     name: str = Form(...),
     skill: str = Form(...),
     location: str = Form(...),
     portfolio_url: str = Form(None),
     photo: UploadFile = File(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -53,16 +64,21 @@ def update_user_profile(
 
     # Handle photo upload
     if photo:
-        photo_filename = f"user_{user_id}_{photo.filename}"
+        photo_filename = f"user_{user_id}_{os.path.basename(photo.filename)}"
         file_path = os.path.join(UPLOAD_DIR, photo_filename)
 
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(photo.file, buffer)
+        # chunked writes run in the threadpool; the event loop never blocks on disk
+        try:
+            await save_stream(iter_upload(photo), file_path, Config.MAX_CONTENT_LENGTH)
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=f"File too large (max {e.limit} bytes)")
 
         user.photo = photo_filename
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    principals.invalidate(User, user.id)
+    await db.refresh(user)
+    set_sticky(response, Config.REPLICA_STICKY_SECONDS)  # read our own update back from the primary
 
     return {"message": "Profile updated successfully", "user": {
         "id": user.id,
@@ -1,10 +1,9 @@
 # backend/seed_user.py
 from app.core.database import SessionLocal, engine, Base
 from app.models.user import User
-from passlib.context import CryptContext
-
-# Setup password hasher
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.models.user_term import UserTerm  # noqa: F401 (registers the table for create_all)
+from app.core import user_index
+from app.core.security import get_password_hash
 
 # Ensure tables exist
 Base.metadata.create_all(bind=engine)
@@ -17,7 +16,7 @@ if user:
     print(f"User already exists: {user.id} - {user.first_name} {user.last_name}")
 else:
     # Create a test user with a hashed password
-    hashed_password = pwd_context.hash("password123")
+    hashed_password = get_password_hash("password123")
     test_user = User(
         first_name="Test",
         last_name="User",
@@ -29,6 +28,8 @@ else:
     db.add(test_user)
     db.commit()
     db.refresh(test_user)
+    user_index.index_user(db, test_user.id, [], test_user.location)
+    db.commit()
     print(f"✅ Created test user: {test_user.id} - {test_user.first_name} {test_user.last_name}")
 
 db.close()
\ No newline at end of file
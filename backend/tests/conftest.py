@@ -0,0 +1,98 @@
+# backend/tests/conftest.py
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# `app` is imported as a package from backend/; config.py is imported bare from app/core
+for path in (BACKEND, os.path.join(BACKEND, "app", "core")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from flask import Flask  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import db, jwt  # noqa: E402
+from app.core.analytics import metadata as analytics_metadata  # noqa: E402
+from app.core.principal import principals  # noqa: E402
+from app.core.serialization import init_json  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    """
+    The blueprint app's posts/follows routes on a throwaway SQLite file.
+    create_app() also imports app.routes.auth, which is a FastAPI router,
+    so the pieces the tests need are wired here the same way; write-behind, the response
+    cache and the stream hub stay off, leaving the synchronous paths.
+    """
+    app = Flask("app", root_path=str(tmp_path))
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'test.db'}",
+        JWT_SECRET_KEY="test-secret-" + "x" * 32,
+        COUNTER_WRITE_BEHIND=False,
+        TIMELINE_FANOUT_LIMIT=3,
+        TIMELINE_BACKFILL_POSTS=50,
+    )
+    init_json(app)
+    db.init_app(app)
+    jwt.init_app(app)
+    with app.app_context():
+        from app.routes.posts import posts_bp
+        from app.routes.follows import follows_bp
+
+        app.register_blueprint(posts_bp, url_prefix="/api/posts")
+        app.register_blueprint(follows_bp, url_prefix="/api/users")
+        db.create_all()
+        analytics_metadata.create_all(db.engine)
+        yield app
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+    principals.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def session(app):
+    return db.session
+
+
+@pytest.fixture
+def make_user(session):
+    from app.models import User
+
+    def make(name, **fields):
+        user = User(username=name, email=f"{name}@example.com", password_hash="x", first_name=name.title(), **fields)
+        session.add(user)
+        session.commit()
+        return user
+    return make
+
+
+@pytest.fixture
+def make_post(session):
+    from app.models import Post
+
+    start = datetime(2026, 1, 1)
+
+    def make(user, minutes=0, **fields):
+        post = Post(user_id=user.id, text=f"post by {user.username}", created_at=start + timedelta(minutes=minutes), **fields)
+        session.add(post)
+        session.commit()
+        return post
+    return make
+
+
+@pytest.fixture
+def auth(app):
+    def headers(user):
+        return {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+    return headers
@@ -0,0 +1,58 @@
+# backend/tests/test_media_pipeline.py
+import json
+
+import pytest
+
+from app.core import media_pipeline
+from app.core.media_pipeline import MediaPipeline, variants_dir
+
+pytest.importorskip("PIL")
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = MediaPipeline(workers=1)
+    yield pipeline
+    pipeline.shutdown()
+
+
+def _png(path):
+    from PIL import Image
+
+    Image.new("RGB", (400, 300), "red").save(path, "PNG")
+
+
+def _run(pipeline, root, name, digest):
+    accepted = pipeline.submit(name, digest, root=root)
+    pipeline.shutdown()  # waits for the job
+    return accepted
+
+
+@pytest.mark.parametrize("name", ["clip.mp4", "clip.mov", "clip.webm", "notes.txt"])
+def test_submit_refuses_files_without_variants(pipeline, tmp_path, name):
+    (tmp_path / name).write_bytes(b"\x00" * 16)
+    assert not pipeline.submit(name, "d" * 64, root=tmp_path)
+    assert pipeline.stats["submitted"] == 0
+
+
+def test_submit_refuses_heic_without_pillow_heif(pipeline, tmp_path, monkeypatch):
+    monkeypatch.setattr(media_pipeline, "HEIF_AVAILABLE", False)
+    assert not pipeline.submit("photo.heic", "d" * 64, root=tmp_path)
+
+
+def test_image_gets_manifest(pipeline, tmp_path):
+    _png(tmp_path / "a.png")
+    assert _run(pipeline, tmp_path, "a.png", "a" * 64)
+    manifest = json.loads((variants_dir(tmp_path, "a" * 64) / "manifest.json").read_text())
+    assert manifest["width"] == 400 and "320" in manifest["sizes"]
+    assert pipeline.stats["completed"] == 1
+
+
+def test_undecodable_image_still_ends_polling(pipeline, tmp_path):
+    (tmp_path / "b.png").write_bytes(b"not a png")
+    assert _run(pipeline, tmp_path, "b.png", "b" * 64)
+    manifest = json.loads((variants_dir(tmp_path, "b" * 64) / "manifest.json").read_text())
+    assert manifest == {"error": "unreadable image"}
+    assert pipeline.stats["failed"] == 1
+    # a retry of the same content reports nothing to record
+    assert media_pipeline.process_image(tmp_path, "b.png", "b" * 64) is None
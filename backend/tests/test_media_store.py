@@ -0,0 +1,67 @@
+# backend/tests/test_media_store.py
+import io
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.media_store import MediaStore, acquire, collect_garbage, release
+
+OLD = time.time() - 2 * 3600
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MediaStore(tmp_path / "uploads")
+
+
+def _released_blob(session, store, data=b"same bytes"):
+    """A blob whose only reference was dropped two hours ago."""
+    from app.models import MediaBlob
+
+    key, size, created = store.save(io.BytesIO(data), "png")
+    assert created
+    acquire(session, MediaBlob, key, size)
+    release(session, MediaBlob, key)
+    session.query(MediaBlob).filter_by(key=key).update({"updated_at": datetime.utcnow() - timedelta(hours=2)})
+    session.commit()
+    os.utime(store.path_for(key), (OLD, OLD))
+    return key
+
+
+def test_save_dedups_identical_bytes(store):
+    first = store.save(io.BytesIO(b"abc"), "jpg")
+    second = store.save(io.BytesIO(b"abc"), "jpg")
+    assert first[0] == second[0] and first[2] and not second[2]
+
+
+def test_collects_unreferenced_blobs(session, store):
+    from app.models import MediaBlob
+
+    key = _released_blob(session, store)
+    assert collect_garbage(session, MediaBlob, store) == 1
+    assert not store.path_for(key).exists()
+    assert session.get(MediaBlob, key) is None
+
+
+def test_reupload_during_collection_keeps_the_file(session, store):
+    from app.models import MediaBlob
+
+    key = _released_blob(session, store)
+    # the same bytes arrive after GC picked the row but before it unlinked
+    assert store.save(io.BytesIO(b"same bytes"), "png") == (key, 10, False)
+    assert collect_garbage(session, MediaBlob, store) == 0
+    acquire(session, MediaBlob, key, 10)
+    session.commit()
+    assert store.path_for(key).exists()
+    assert session.get(MediaBlob, key).ref_count == 1
+
+
+def test_collects_untracked_files(session, store):
+    from app.models import MediaBlob
+
+    key, _, _ = store.save(io.BytesIO(b"orphan"), "gif")
+    assert collect_garbage(session, MediaBlob, store) == 0
+    os.utime(store.path_for(key), (OLD, OLD))
+    assert collect_garbage(session, MediaBlob, store) == 1
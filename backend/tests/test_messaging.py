@@ -0,0 +1,66 @@
+# backend/tests/test_messaging.py
+import pytest
+
+from app.core import messaging
+
+
+@pytest.fixture
+def models():
+    from app.models import Conversation, ConversationMember, Message
+
+    return Conversation, ConversationMember, Message
+
+
+@pytest.fixture
+def thread(session, models, make_user):
+    """alice and bob's conversation with one message from alice, then three from bob."""
+    conversation_model, member_model, _ = models
+    alice, bob = make_user("alice"), make_user("bob")
+    cid = messaging.get_or_create_direct(session, conversation_model, member_model, alice.id, bob.id)
+    ids = [messaging.send(session, models, cid, sender.id, f"m{i}")[0]
+           for i, sender in enumerate((alice, bob, bob, bob))]
+    session.commit()
+    return alice, bob, cid, ids
+
+
+def _unread(session, models, user):
+    return messaging.unread_total(session, models[1], user.id)
+
+
+def test_send_counts_unread_for_the_other_side(session, models, thread):
+    alice, bob, _, _ = thread
+    assert _unread(session, models, alice) == 3
+    assert _unread(session, models, bob) == 0
+
+
+def test_mark_read_up_to_a_message(session, models, thread):
+    alice, _, cid, ids = thread
+    assert messaging.mark_read(session, models, alice.id, {cid: ids[2]}) == 1
+    session.commit()
+    assert _unread(session, models, alice) == 1
+    # markers never move backwards
+    messaging.mark_read(session, models, alice.id, {cid: ids[1]})
+    session.commit()
+    assert _unread(session, models, alice) == 1
+
+
+def test_mark_read_everything(session, models, thread):
+    alice, _, cid, _ = thread
+    messaging.mark_read(session, models, alice.id, {str(cid): None})
+    session.commit()
+    assert _unread(session, models, alice) == 0
+
+
+def test_mark_read_ignores_other_conversations(session, models, thread, make_user):
+    conversation_model, member_model, _ = models
+    alice, bob, cid, _ = thread
+    carol = make_user("carol")
+    other = messaging.get_or_create_direct(session, conversation_model, member_model, bob.id, carol.id)
+    messaging.send(session, models, other, bob.id, "hi carol")
+    session.commit()
+
+    messaging.mark_read(session, models, alice.id, {other: None, cid: None})
+    session.commit()
+    assert _unread(session, models, alice) == 0
+    assert _unread(session, models, carol) == 1
+    assert messaging.mark_read(session, models, alice.id, {}) == 0
@@ -0,0 +1,60 @@
+# backend/tests/test_pagination.py
+from datetime import datetime
+
+import pytest
+
+from app.core.pagination import InvalidCursor, clamp_limit, decode_cursor, encode_cursor, keyset_page
+
+
+def test_cursor_round_trip():
+    at = datetime(2026, 1, 1, 12, 30, 5, 123456)
+    assert decode_cursor(encode_cursor(at, 42)) == (at, 42)
+    assert decode_cursor(encode_cursor(None, 7)) == (None, 7)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", encode_cursor(datetime(2026, 1, 1), 1)[:-3], "W10"])
+def test_bad_cursor_raises(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_clamp_limit():
+    assert clamp_limit("7") == 7
+    assert clamp_limit("junk") == 12
+    assert clamp_limit(0) == 1
+    assert clamp_limit(10_000) == 50
+
+
+def test_keyset_page_walks_without_gaps(session, make_user, make_post):
+    from app.models import Post
+
+    user = make_user("author")
+    # several posts share a timestamp, so the id tiebreak has to hold
+    posts = [make_post(user, minutes=i // 3) for i in range(11)]
+    seen, cursor = [], None
+    while True:
+        items, cursor, has_more = keyset_page(Post.query, Post, cursor=cursor, limit=4)
+        seen.extend(items)
+        assert has_more == (cursor is not None)
+        if not has_more:
+            break
+    assert [p.id for p in seen] == [p.id for p in sorted(posts, key=lambda p: (p.created_at, p.id), reverse=True)]
+
+
+def test_keyset_page_with_null_timestamps(session, make_user, make_post):
+    from app.models import Post
+
+    user = make_user("author")
+    posts = [make_post(user, minutes=i) for i in range(4)]
+    undated = [make_post(user) for _ in range(3)]
+    Post.query.filter(Post.id.in_([p.id for p in undated])).update({"created_at": None}, synchronize_session=False)
+    session.commit()
+
+    seen, cursor = [], None
+    while True:
+        items, cursor, has_more = keyset_page(Post.query, Post, cursor=cursor, limit=2)
+        seen.extend(p.id for p in items)
+        if not has_more:
+            break
+    # SQLite sorts NULL created_at last under DESC
+    assert seen == [p.id for p in reversed(posts)] + [p.id for p in reversed(undated)]
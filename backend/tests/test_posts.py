@@ -0,0 +1,34 @@
+# backend/tests/test_posts.py
+import io
+
+
+def test_create_post_with_dot_only_filename(client, auth, make_user):
+    user = make_user("author")
+    data = {"text": "hello", "media": (io.BytesIO(b"\x89PNG not really"), ".png", "image/png")}
+    resp = client.post("/api/posts/posts", data=data, headers=auth(user), content_type="multipart/form-data")
+    assert resp.status_code == 200
+    assert resp.get_json()["media"].endswith(".png")
+
+
+def test_create_comment(client, session, auth, make_user, make_post):
+    from app.core.analytics import summary
+    from app.models import Post
+
+    user = make_user("reader")
+    post = make_post(make_user("author"))
+    post_id, score = post.id, post.hot_score
+    resp = client.post(f"/api/posts/posts/{post_id}/comments", json={"text": "nice"}, headers=auth(user))
+    assert resp.status_code == 200
+    assert resp.get_json()["text"] == "nice"
+
+    session.expire_all()
+    post = session.get(Post, post_id)
+    assert post.comments_count == 1
+    assert post.hot_score > score
+    assert summary(session)["comments"] == 1
+    assert [c["text"] for c in client.get(f"/api/posts/posts/{post_id}/comments").get_json()] == ["nice"]
+
+
+def test_create_comment_on_missing_post(client, auth, make_user):
+    resp = client.post("/api/posts/posts/999/comments", json={"text": "nice"}, headers=auth(make_user("reader")))
+    assert resp.status_code == 404
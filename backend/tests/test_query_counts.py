@@ -0,0 +1,73 @@
+# backend/tests/test_query_counts.py
+"""Statement budgets for the list endpoints; they must not grow with the page size."""
+import pytest
+
+from app import db
+from app.core.querycount import assert_max_queries, count_queries
+
+
+@pytest.fixture
+def feed(make_user, make_post):
+    authors = [make_user(f"author{i}") for i in range(5)]
+    posts = [make_post(authors[i % 5], minutes=i) for i in range(30)]
+    return authors, posts
+
+
+def test_feed_page_is_constant_queries(client, feed):
+    # posts + users versions for the ETag, the page, its authors in one IN
+    with assert_max_queries(db.engine, 4):
+        resp = client.get("/api/posts/posts?limit=5")
+    assert resp.status_code == 200
+    with assert_max_queries(db.engine, 4):
+        resp = client.get("/api/posts/posts?limit=25")
+    assert len(resp.get_json()["posts"]) == 25
+
+
+def test_feed_next_page_same_budget(client, feed):
+    first = client.get("/api/posts/posts?limit=10").get_json()
+    with assert_max_queries(db.engine, 4):
+        resp = client.get(f"/api/posts/posts?limit=10&cursor={first['nextCursor']}")
+    ids = [p["id"] for p in first["posts"]] + [p["id"] for p in resp.get_json()["posts"]]
+    assert len(ids) == len(set(ids)) == 20
+
+
+def test_trending_feed_budget(client, feed):
+    with assert_max_queries(db.engine, 4):
+        resp = client.get("/api/posts/posts?sort=trending&limit=20")
+    assert resp.status_code == 200
+
+
+def test_comments_constant_queries(client, session, feed):
+    from app.models import Comment
+
+    authors, posts = feed
+    post_id = posts[0].id
+    for i in range(12):
+        session.add(Comment(post_id=post_id, user_id=authors[i % 5].id, content=f"comment {i}"))
+    session.commit()
+    # post version, users version, comments, their authors
+    with assert_max_queries(db.engine, 4):
+        resp = client.get(f"/api/posts/posts/{post_id}/comments")
+    assert resp.status_code == 200
+    assert len(resp.get_json()) == 12
+
+
+def test_home_feed_constant_queries(client, auth, feed, make_user):
+    authors, _ = feed
+    reader = make_user("reader")
+    for author in authors[:4]:
+        assert client.post(f"/api/users/{author.id}/follow", headers=auth(reader)).status_code == 200
+    # principal, timeline range, celebrity lookup (+ their posts), posts by id, authors
+    with assert_max_queries(db.engine, 6):
+        resp = client.get("/api/posts/posts/home?limit=20", headers=auth(reader))
+    assert resp.status_code == 200
+    assert len(resp.get_json()["posts"]) == 20
+
+
+def test_assert_max_queries_lists_statements(app):
+    with pytest.raises(AssertionError, match="expected at most 0 queries, ran 1"):
+        with assert_max_queries(db.engine, 0):
+            db.session.execute(db.text("SELECT 1"))
+    with count_queries(db.engine) as counter:
+        db.session.execute(db.text("SELECT 1"))
+    assert counter.count == 1
@@ -0,0 +1,82 @@
+# backend/tests/test_response_cache.py
+import pickle
+
+import pytest
+from flask import Flask
+
+from app.core.response_cache import MemoryBackend, RedisBackend, ResponseCache, cached_response, invalidate
+
+
+class FakeRedis:
+    """The handful of commands RedisBackend uses, storing bytes like the real server."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def incr(self, key):
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return MemoryBackend()
+    return RedisBackend(None, client=FakeRedis())
+
+
+@pytest.fixture
+def client(backend):
+    app = Flask("cache_test")
+    app.extensions["response_cache"] = ResponseCache(backend, ttl=60)
+    state = {"calls": 0}
+
+    @app.route("/feed")
+    @cached_response(["feed"])
+    def feed():
+        state["calls"] += 1
+        return {"calls": state["calls"]}
+
+    @app.route("/write", methods=["POST"])
+    def write():
+        invalidate("feed")
+        return {}
+
+    return app.test_client()
+
+
+def test_invalidate_orphans_cached_pages(client):
+    assert client.get("/feed").headers["X-Cache"] == "MISS"
+    assert client.get("/feed").get_json() == {"calls": 1}
+    client.post("/write")
+    # the version key now holds a counter; reading it must not break the next GET
+    resp = client.get("/feed")
+    assert resp.status_code == 200
+    assert resp.headers["X-Cache"] == "MISS" and resp.get_json() == {"calls": 2}
+    client.post("/write")
+    assert client.get("/feed").get_json() == {"calls": 3}
+
+
+def test_redis_versions_are_raw_integers():
+    fake = FakeRedis()
+    backend = RedisBackend(None, client=fake)
+    assert backend.version("v:feed") == 0
+    backend.incr("v:feed")
+    backend.incr("v:feed")
+    assert fake.data["respcache:v:feed"] == b"2"
+    assert backend.version("v:feed") == 2
+    backend.set("entry", {"body": b"x"}, ttl=5)
+    assert pickle.loads(fake.data["respcache:entry"]) == {"body": b"x"}
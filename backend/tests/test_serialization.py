@@ -0,0 +1,48 @@
+# backend/tests/test_serialization.py
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.serialization import Serializer, iso
+
+AUTHOR = Serializer("id", ("firstName", "first_name"))
+POST = Serializer("id", ("createdAt", "created_at", iso), ("user", "author", AUTHOR), ("owner", "author.id"))
+
+
+def _post(author=None):
+    return SimpleNamespace(id=3, created_at=datetime(2026, 1, 1, 9), author=author)
+
+
+def test_fields_renames_and_transforms():
+    author = SimpleNamespace(id=1, first_name="Ada")
+    assert POST.one(_post(author)) == {
+        "id": 3, "createdAt": iso(datetime(2026, 1, 1, 9)), "user": {"id": 1, "firstName": "Ada"}, "owner": 1,
+    }
+
+
+def test_none_objects():
+    assert AUTHOR.one(None) == {"id": None, "firstName": None}
+    assert AUTHOR.one_or_none(None) is None
+    # the empty dict is copied, never shared between results
+    AUTHOR.one(None)["id"] = 5
+    assert AUTHOR.one(None)["id"] is None
+
+
+def test_nested_none_becomes_dict_of_nones():
+    card = Serializer("id", ("user", "author", AUTHOR))
+    assert card.one(_post()) == {"id": 3, "user": {"id": None, "firstName": None}}
+    nullable = Serializer("id", ("user", "author", AUTHOR.one_or_none))
+    assert nullable.one(_post()) == {"id": 3, "user": None}
+
+
+def test_many():
+    authors = [SimpleNamespace(id=i, first_name=f"n{i}") for i in range(3)]
+    assert AUTHOR.many(authors) == [{"id": i, "firstName": f"n{i}"} for i in range(3)]
+    assert AUTHOR.many([]) == []
+
+
+@pytest.mark.parametrize("attr", ["a b", "x; import os", "a..b", ""])
+def test_bad_attribute_path(attr):
+    with pytest.raises(ValueError):
+        Serializer(("out", attr))
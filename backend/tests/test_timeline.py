@@ -0,0 +1,61 @@
+# backend/tests/test_timeline.py
+import pytest
+
+from app.core import timeline
+
+FANOUT_LIMIT = 3
+
+
+@pytest.fixture
+def models():
+    from app.models import Follow, Post, TimelineEntry, User
+
+    return User, Post, Follow, TimelineEntry
+
+
+def _follow(session, models, reader, author):
+    assert timeline.follow(session, models, reader.id, author.id, fanout_limit=FANOUT_LIMIT)
+    session.commit()
+
+
+def test_home_merges_celebrities_without_duplicates(session, models, make_user, make_post):
+    reader, friend, star = make_user("reader"), make_user("friend"), make_user("star")
+    posts = [make_post(friend if i % 2 else star, minutes=i) for i in range(10)]
+    # star's posts are backfilled into the timeline while under the limit...
+    _follow(session, models, reader, friend)
+    _follow(session, models, reader, star)
+    # ...then star crosses it and is also merged in at read time
+    star.followers_count = FANOUT_LIMIT + 5
+    session.commit()
+
+    seen, cursor = [], None
+    while True:
+        ids, cursor, has_more = timeline.home(session, models, reader.id, cursor=cursor, limit=3, fanout_limit=FANOUT_LIMIT)
+        seen.extend(ids)
+        if not has_more:
+            break
+    assert seen == [p.id for p in reversed(posts)]
+
+
+def test_home_reads_celebrity_posts_never_fanned_out(session, models, make_user, make_post):
+    reader, star = make_user("reader"), make_user("star", followers_count=FANOUT_LIMIT)
+    _follow(session, models, reader, star)
+    posts = [make_post(star, minutes=i) for i in range(4)]
+    for post in posts:
+        timeline.fan_out(session, models, post.id, star.id, post.created_at, star.followers_count, fanout_limit=FANOUT_LIMIT)
+    session.commit()
+
+    ids, cursor, has_more = timeline.home(session, models, reader.id, limit=3, fanout_limit=FANOUT_LIMIT)
+    assert ids == [p.id for p in reversed(posts)][:3] and has_more
+    ids, cursor, has_more = timeline.home(session, models, reader.id, cursor=cursor, limit=3, fanout_limit=FANOUT_LIMIT)
+    assert ids == [posts[0].id] and cursor is None and not has_more
+
+
+def test_unfollow_drops_author_entries(session, models, make_user, make_post):
+    reader, friend = make_user("reader"), make_user("friend")
+    make_post(friend)
+    _follow(session, models, reader, friend)
+    assert not timeline.follow(session, models, reader.id, friend.id, fanout_limit=FANOUT_LIMIT)
+    assert timeline.unfollow(session, models, reader.id, friend.id)
+    session.commit()
+    assert timeline.home(session, models, reader.id, fanout_limit=FANOUT_LIMIT) == ([], None, False)
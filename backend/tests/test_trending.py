@@ -0,0 +1,49 @@
+# backend/tests/test_trending.py
+import pytest
+
+from app.core import trending
+
+
+@pytest.fixture
+def scored(make_user, make_post):
+    user = make_user("author")
+    return [make_post(user, minutes=i, hot_score=score) for i, score in enumerate([5.0, 0.0, 9.0, 1.0, 9.0, 0.0, 3.0])]
+
+
+def test_top_orders_by_score_then_id(session, scored):
+    from app.models import Post
+
+    items, has_more = trending.top(Post.query, Post, limit=10)
+    # ties break newest id first; zero scores have decayed out
+    assert [p.id for p in items] == [scored[i].id for i in (4, 2, 0, 6, 3)]
+    assert not has_more
+
+
+def test_top_pages(session, scored):
+    from app.models import Post
+
+    first, has_more = trending.top(Post.query, Post, offset=0, limit=2)
+    assert has_more
+    second, has_more = trending.top(Post.query, Post, offset=2, limit=2)
+    third, has_more_after = trending.top(Post.query, Post, offset=4, limit=2)
+    assert has_more and not has_more_after
+    assert [p.id for p in first + second + third] == [scored[i].id for i in (4, 2, 0, 6, 3)]
+
+
+def test_top_stops_at_max_rank(session, scored, monkeypatch):
+    from app.models import Post
+
+    monkeypatch.setattr(trending, "MAX_RANK", 3)
+    items, has_more = trending.top(Post.query, Post, offset=2, limit=10)
+    assert [p.id for p in items] == [scored[0].id] and not has_more
+    assert trending.top(Post.query, Post, offset=50, limit=10) == ([], False)
+
+
+def test_decay_since_last(session, scored):
+    from app.models import Post
+
+    assert trending.decay_since_last(session, Post, half_life_hours=1, now=1000) == (0, 0)
+    decayed, elapsed = trending.decay_since_last(session, Post, half_life_hours=1, now=1000 + 3600)
+    session.commit()
+    assert (decayed, elapsed) == (5, 3600)
+    assert sorted(p.hot_score for p in Post.query) == [0.0, 0.0, 0.5, 1.5, 2.5, 4.5, 4.5]
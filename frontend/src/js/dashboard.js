@@ -13,7 +13,7 @@ const H = window.helpers;
 // =======================
 // STATE
 // =======================
-let page = 1, size = 12, loading = false, hasMore = true;
+let cursor = null, size = 12, loading = false, hasMore = true;
 let skillsChart = null, farmChart = null;
 
 // =======================
@@ -88,14 +88,15 @@ async function loadFeed() {
   loading = true;
   $('loader').classList.remove('hidden');
   try {
-    const payload = await safeJson(`/posts?page=${page}&limit=${size}`, { method: 'GET' });
+    const qs = `limit=${size}` + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : '');
+    const payload = await safeJson(`/posts?${qs}`, { method: 'GET' });
     const posts = Array.isArray(payload.posts) ? payload.posts : (Array.isArray(payload) ? payload : []);
     posts.forEach(p => $('feed').appendChild(renderPostCard(p)));
-    page++;
-    hasMore = posts.length === size;
+    cursor = payload.nextCursor || null;
+    hasMore = typeof payload.hasMore === 'boolean' ? payload.hasMore && !!cursor : posts.length === size;
   } catch (err) {
     console.warn('loadFeed error', err);
-    if (page === 1) {
+    if (!cursor) {
       const msg = create('div','card'); msg.textContent = 'Unable to load feed right now.';
       $('feed').appendChild(msg);
     }
@@ -196,7 +197,7 @@ $('feed').addEventListener('click', async (ev) => {
         if (r.ok) {
           const comments = await r.json();
           comments.forEach(c => {
-            const p = create('p'); p.className = 'muted'; p.textContent = `${c.user?.name || 'User'}: ${c.text}`;
+            const p = create('p'); p.className = 'muted'; p.dataset.commentId = c.id; p.textContent = `${c.user?.name || 'User'}: ${c.text}`;
             box.appendChild(p);
           });
           const ta = create('textarea'); ta.rows=2; ta.placeholder='Write a comment...';
@@ -211,8 +212,12 @@ $('feed').addEventListener('click', async (ev) => {
               });
               if (rr.ok) {
                 const created = await rr.json();
-                const p = create('p'); p.className='muted'; p.textContent = `${created.user?.name || 'User'}: ${created.text}`;
-                box.insertBefore(p, ta);
+                // the stream may have delivered it already
+                if (!box.querySelector(`p[data-comment-id="${created.id}"]`)) {
+                  const p = create('p'); p.className='muted'; p.dataset.commentId = created.id;
+                  p.textContent = `${created.user?.name || 'User'}: ${created.text}`;
+                  box.insertBefore(p, ta.parentNode);
+                }
                 ta.value = '';
               }
             } catch { alert('Could not post comment'); }
@@ -228,6 +233,10 @@ $('feed').addEventListener('click', async (ev) => {
   const shareBtn = ev.target.closest('.share-btn');
   if (shareBtn) {
     const id = shareBtn.dataset.id;
+    API.request(`/posts/${id}/share`, { method: 'POST' })
+      .then(r => r.ok ? r.json() : null)
+      .then(updated => { if (updated) shareBtn.textContent = `🔁 ${updated.shares || 0}`; })
+      .catch(err => console.warn('share count failed', err));
     try {
       await navigator.clipboard.writeText(`${location.origin}/posts/${id}`);
       alert('Post link copied.');
@@ -279,13 +288,18 @@ const doSearch = H.debounce(async () => {
   try {
     const r = await API.request(`/search?q=${encodeURIComponent(q)}`, { method: 'GET' });
     if (!r.ok) throw new Error('search failed');
-    const hits = await r.json();
-    if (!Array.isArray(hits) || hits.length === 0) { resultsEl.innerHTML = '<li class="muted">No results</li>'; return; }
+    const payload = await r.json();
+    const hits = Array.isArray(payload) ? payload : (payload?.results || []);
+    if (hits.length === 0) { resultsEl.innerHTML = '<li class="muted">No results</li>'; return; }
     resultsEl.innerHTML = '';
     hits.forEach(h => {
       const li = create('li'); li.tabIndex = 0;
-      li.textContent = `${h.name || h.title} • ${h.type || h.skill || ''}`;
-      li.addEventListener('click', () => { location.href = `./profile.html?id=${encodeURIComponent(h.id)}`; });
+      // snippets arrive HTML-escaped with <mark> around matches; show them as plain text
+      const label = h.name || h.title || new DOMParser().parseFromString(h.snippet || '', 'text/html').body.textContent;
+      li.textContent = `${label} • ${h.type || h.skill || ''}`;
+      if (!h.type || h.type === 'users') {
+        li.addEventListener('click', () => { location.href = `./profile.html?id=${encodeURIComponent(h.id)}`; });
+      }
       resultsEl.appendChild(li);
     });
   } catch {
@@ -370,12 +384,69 @@ $('fab').addEventListener('click', () => { $('composeText').focus(); });
   });
 })();
 
+// =======================
+// LIVE UPDATES (SSE)
+// =======================
+// One stream replaces polling /posts and /posts/<id>/comments. Open comment
+// boxes are passed as ?posts= so their new comments arrive too.
+let liveStream = null;
+
+function openComments() {
+  return [...document.querySelectorAll('.comments-section:not([hidden])')]
+    .map(box => box.id.replace('comments-', '')).filter(Boolean);
+}
+
+function connectLive() {
+  if (!window.EventSource) return;
+  if (liveStream) liveStream.close();
+  const ids = openComments();
+  liveStream = new EventSource(`${API_URL}/posts/stream` + (ids.length ? `?posts=${ids.join(',')}` : ''));
+
+  liveStream.addEventListener('post.created', ev => {
+    const { post } = JSON.parse(ev.data);
+    if (!post || document.querySelector(`.post-card[data-id="${post.id}"]`)) return;
+    $('feed').prepend(renderPostCard(post));
+  });
+
+  liveStream.addEventListener('post.counters', ev => {
+    const d = JSON.parse(ev.data);
+    const card = document.querySelector(`.post-card[data-id="${d.id}"]`);
+    if (!card) return;
+    if (d.approvals != null) card.querySelector('.approve-btn').textContent = `❤️ ${d.approvals}`;
+    if (d.shares != null) card.querySelector('.share-btn').textContent = `🔁 ${d.shares}`;
+    if (d.commentsCount != null) card.querySelector('.comment-btn').textContent = `💬 ${d.commentsCount}`;
+  });
+
+  liveStream.addEventListener('comment.created', ev => {
+    const { postId, comment } = JSON.parse(ev.data);
+    const box = $(`comments-${postId}`);
+    const ta = box && box.querySelector('textarea');
+    if (!ta || box.querySelector(`p[data-comment-id="${comment.id}"]`)) return;
+    const p = create('p'); p.className = 'muted'; p.dataset.commentId = comment.id;
+    p.textContent = `${comment.user?.name || 'User'}: ${comment.text}`;
+    ta.parentNode.parentNode.insertBefore(p, ta.parentNode);
+  });
+
+  // the server dropped events for us (slow connection): start the feed over
+  liveStream.addEventListener('resync', () => {
+    cursor = null; hasMore = true;
+    $('feed').innerHTML = '';
+    loadFeed();
+  });
+}
+
+// comment boxes opening/closing change which posts we follow
+$('feed').addEventListener('click', ev => {
+  if (ev.target.closest('.comment-btn')) setTimeout(connectLive, 0);
+});
+
 // =======================
 // Init
 // =======================
 (async function init() {
   if (!auth.getToken()) { location.href = './login.html'; return; }
   await Promise.allSettled([loadProfile(), loadFeed()]);
+  connectLive();
 })();
 const authUser = auth.getUser();
 